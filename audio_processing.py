@@ -0,0 +1,435 @@
+import os
+import csv
+import json
+import tempfile
+import subprocess
+from pathlib import Path
+
+# Configuration
+CHUNK_DURATION_SECONDS = 600  # 10-minute chunks
+MAX_CHUNK_SIZE_MB = 25  # Transcription API upload limit
+CHUNK_MANIFEST = "chunks.json"  # Written next to the chunks: index, filename, path, start, duration, source
+
+# Speech-optimized encoding for transcription (Whisper resamples to 16 kHz mono anyway)
+TRANSCRIPTION_SAMPLE_RATE = 16000
+TRANSCRIPTION_BITRATE_KBPS = 32
+TRANSCRIPTION_CODEC_ARGS = [
+    '-ac', '1',
+    '-ar', str(TRANSCRIPTION_SAMPLE_RATE),
+    '-c:a', 'libmp3lame',
+    '-b:a', f'{TRANSCRIPTION_BITRATE_KBPS}k'
+]
+
+# Silence-aligned chunk boundaries: cut at the quietest moment shortly before each target length
+SILENCE_ALIGNED_CHUNKS = os.getenv("SILENCE_ALIGNED_CHUNKS", "true").lower() == "true"
+SILENCE_SCAN_SAMPLE_RATE = 4000  # Downsampled mono stream the RMS scan runs on
+SILENCE_FRAME_SECONDS = 0.05  # RMS frame length
+SILENCE_SMOOTHING_SECONDS = 0.5  # Pauses shorter than this are not treated as boundaries
+SILENCE_SEARCH_SECONDS = 60  # How far before the target length to look for a pause
+SILENCE_TOLERANCE_DB = 3  # Frames this close to the quietest one count as equally quiet
+
+# Voice-activity trimming: long non-speech spans are cut out of each chunk before it is sent to Whisper
+VAD_TRIMMING = os.getenv("VAD_TRIMMING", "true").lower() == "true"
+VAD_MIN_SILENCE_SECONDS = 3.0  # Shorter pauses are kept, they carry sentence rhythm
+VAD_PADDING_SECONDS = 0.3  # Kept around speech so word onsets and tails survive the cut
+VAD_THRESHOLD_RATIO = 0.25  # Speech threshold between the noise floor and speech level (in dB)
+VAD_MIN_CONTRAST_DB = 10  # Below this floor-to-speech contrast everything is kept
+VAD_MIN_SAVED_SECONDS = 10  # Chunks that would lose less than this are sent untrimmed
+WHISPER_PRICE_PER_MINUTE = 0.006  # USD, for the benchmark report
+
+# Inputs read over HTTP (e.g. presigned S3 URLs) are fetched with range requests; reconnect on dropped connections
+HTTP_INPUT_ARGS = [
+    '-reconnect', '1',
+    '-reconnect_streamed', '1',
+    '-reconnect_on_network_error', '1',
+    '-reconnect_delay_max', '30'
+]
+
+def media_input_args(source):
+    """ffmpeg input arguments for a local path or an http(s) URL"""
+    source = str(source)
+    if source.startswith(('http://', 'https://')):
+        return [*HTTP_INPUT_ARGS, '-i', source]
+    return ['-i', source]
+
+def probe_duration(media_path):
+    """Return the duration of a media file in seconds using ffprobe"""
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        str(media_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFprobe error: {result.stderr}")
+    return float(result.stdout.strip())
+
+def _describe_source(source):
+    """Source recorded in the chunk manifest (query strings such as presigned signatures are dropped)"""
+    source = str(source)
+    if source.startswith(('http://', 'https://')):
+        return source.split('?', 1)[0]
+    return source
+
+def write_chunk_manifest(chunks, output_dir):
+    """Atomically write the chunk manifest into output_dir"""
+    manifest_path = Path(output_dir) / CHUNK_MANIFEST
+    tmp_path = Path(f"{manifest_path}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(chunks, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def read_chunk_manifest(output_dir):
+    """Return the chunk manifest of output_dir keyed by chunk filename ({} if there is none)"""
+    try:
+        with open(Path(output_dir) / CHUNK_MANIFEST, "r") as f:
+            return {chunk["filename"]: chunk for chunk in json.load(f)}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+def _read_segment_list(segment_list_path, output_dir, source=None):
+    """Parse an ffmpeg CSV segment list into chunk descriptors"""
+    chunks = []
+    with open(segment_list_path, newline='') as f:
+        for index, row in enumerate(csv.reader(f), 1):
+            if len(row) < 3:
+                continue
+            filename, start, end = row[0], float(row[1]), float(row[2])
+            chunks.append({
+                "index": index,
+                "filename": filename,
+                "path": str(Path(output_dir) / filename),
+                "start": start,
+                "duration": end - start,
+                "source": source
+            })
+    return chunks
+
+def _numpy_available():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def silence_alignment_enabled():
+    """Whether chunk boundaries are aligned to silence (SILENCE_ALIGNED_CHUNKS and NumPy installed)"""
+    if not SILENCE_ALIGNED_CHUNKS:
+        return False
+    if not _numpy_available():
+        print("NumPy is not installed; using fixed-length chunk boundaries")
+        return False
+    return True
+
+def vad_trimming_enabled():
+    """Whether non-speech spans are trimmed before transcription (VAD_TRIMMING and NumPy installed)"""
+    return VAD_TRIMMING and _numpy_available()
+
+def _scan_rms(cmd):
+    """Run ffmpeg writing raw s16le mono audio to stdout and return the RMS energy of every frame"""
+    import numpy as np
+    frame_samples = int(SILENCE_SCAN_SAMPLE_RATE * SILENCE_FRAME_SECONDS)
+    frame_bytes = frame_samples * 2
+    frames = []
+    remainder = b""
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        # Read in blocks so memory stays constant; only the per-frame energies are kept
+        while True:
+            block = process.stdout.read(frame_bytes * 1024)
+            if not block:
+                break
+            data = remainder + block
+            usable = len(data) - len(data) % frame_bytes
+            remainder = data[usable:]
+            samples = np.frombuffer(data[:usable], dtype='<i2').astype(np.float32).reshape(-1, frame_samples)
+            frames.append(np.sqrt(np.mean(samples * samples, axis=1)))
+        process.stdout.close()
+        if process.wait() != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"FFmpeg silence scan error: {stderr.read().decode(errors='replace')}")
+    return np.concatenate(frames) if frames else np.zeros(0, dtype=np.float32)
+
+def plan_chunk_boundaries(rms, frame_seconds, target_seconds, search_seconds=SILENCE_SEARCH_SECONDS):
+    """
+    Return cut points (seconds) placed at the quietest moment within search_seconds before every
+    target_seconds boundary, so no chunk is longer than target_seconds.
+    """
+    import numpy as np
+    total_seconds = len(rms) * frame_seconds
+    smoothing = max(1, int(round(SILENCE_SMOOTHING_SECONDS / frame_seconds)))
+    kernel = np.ones(smoothing)
+    # Moving average normalised by the frames actually covered, so the edges do not look quiet
+    energy = np.convolve(rms, kernel, mode='same') / np.convolve(np.ones_like(rms), kernel, mode='same') if len(rms) else rms
+
+    cuts = []
+    position = 0.0
+    while total_seconds - position > target_seconds:
+        end = int((position + target_seconds) / frame_seconds)
+        start = max(int((position + target_seconds - search_seconds) / frame_seconds), int(position / frame_seconds) + 1)
+        if start >= end:
+            cut = position + target_seconds
+        else:
+            # Latest of the quietest frames keeps chunks close to the target length
+            window_db = 20 * np.log10(energy[start:end] + 1e-9)
+            quietest = start + int(np.flatnonzero(window_db <= window_db.min() + SILENCE_TOLERANCE_DB)[-1])
+            cut = (quietest + 0.5) * frame_seconds
+        cuts.append(round(cut, 3))
+        position = cut
+    return cuts
+
+def scan_rms(input_args, output_args=None):
+    """
+    Decode the input once into a downsampled mono stream and return its per-frame RMS energy
+    (SILENCE_FRAME_SECONDS frames). output_args adds further ffmpeg outputs written by the same decode.
+    """
+    cmd = [
+        'ffmpeg',
+        '-v', 'error',
+        *input_args,
+        *(output_args or []),
+        '-vn',
+        '-map', '0:a:0',
+        '-ac', '1',
+        '-ar', str(SILENCE_SCAN_SAMPLE_RATE),
+        '-f', 's16le',
+        'pipe:1'
+    ]
+    return _scan_rms(cmd)
+
+def scan_silence_cuts(input_args, target_seconds, output_args=None):
+    """Return silence-aligned cut points for chunks of at most target_seconds (see scan_rms)"""
+    rms = scan_rms(input_args, output_args)
+    cuts = plan_chunk_boundaries(rms, SILENCE_FRAME_SECONDS, target_seconds)
+    print(f"Silence scan: {len(rms) * SILENCE_FRAME_SECONDS:.1f}s of audio, {len(cuts)} cut points")
+    return cuts
+
+def detect_speech_spans(rms, frame_seconds=SILENCE_FRAME_SECONDS, min_silence_seconds=VAD_MIN_SILENCE_SECONDS, padding_seconds=VAD_PADDING_SECONDS):
+    """
+    Energy-based voice activity detection. Returns the (start, end) spans in seconds to keep:
+    everything except non-speech runs of at least min_silence_seconds. The speech threshold adapts
+    to the recording: it sits between the noise floor (10th percentile) and speech level (95th) in dB.
+    """
+    import numpy as np
+    if not len(rms):
+        return []
+    total_frames = len(rms)
+    db = 20 * np.log10(rms + 1e-9)
+    floor, peak = np.percentile(db, [10, 95])
+    if peak - floor < VAD_MIN_CONTRAST_DB:
+        # Continuous speech (or continuous noise): nothing to trim
+        return [(0.0, round(total_frames * frame_seconds, 3))]
+    speech = db > floor + VAD_THRESHOLD_RATIO * (peak - floor)
+
+    pad = int(round(padding_seconds / frame_seconds))
+    if pad:
+        speech = np.convolve(speech.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode='same') > 0
+
+    # Runs of non-speech frames, and the long ones among them
+    edges = np.diff(np.concatenate(([0], (~speech).astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    long_runs = (run_ends - run_starts) >= int(np.ceil(min_silence_seconds / frame_seconds))
+
+    keep_starts = np.concatenate(([0], run_ends[long_runs]))
+    keep_ends = np.concatenate((run_starts[long_runs], [total_frames]))
+    non_empty = keep_ends > keep_starts
+    return [
+        (round(float(start) * frame_seconds, 3), round(float(end) * frame_seconds, 3))
+        for start, end in zip(keep_starts[non_empty], keep_ends[non_empty])
+    ]
+
+def build_time_map(spans):
+    """Time map of trimmed audio: where each kept span starts in the trimmed and in the original audio"""
+    time_map = []
+    trimmed_start = 0.0
+    for start, end in spans:
+        time_map.append({"trimmed_start": round(trimmed_start, 3), "original_start": start, "duration": round(end - start, 3)})
+        trimmed_start += end - start
+    return time_map
+
+def to_original_time(seconds, time_map, is_end=False):
+    """Translate a timestamp in trimmed audio back to the original audio (ends stay in the span they close)"""
+    for entry in reversed(time_map):
+        if seconds > entry["trimmed_start"] or (seconds == entry["trimmed_start"] and not is_end):
+            return round(entry["original_start"] + min(seconds - entry["trimmed_start"], entry["duration"]), 3)
+    return round(time_map[0]["original_start"] + seconds, 3) if time_map else seconds
+
+def trim_silence(audio_path, output_path, min_saved_seconds=VAD_MIN_SAVED_SECONDS):
+    """
+    Write audio_path without its long non-speech spans to output_path (transcription-ready MP3) and
+    return the time map, or None when less than min_saved_seconds would be removed.
+    """
+    rms = scan_rms(['-i', str(audio_path)])
+    spans = detect_speech_spans(rms)
+    total_seconds = len(rms) * SILENCE_FRAME_SECONDS
+    kept_seconds = sum(end - start for start, end in spans)
+    if not spans or total_seconds - kept_seconds < min_saved_seconds:
+        return None
+
+    select = '+'.join(f"between(t,{start:.3f},{end:.3f})" for start, end in spans)
+    cmd = [
+        'ffmpeg',
+        '-v', 'error',
+        '-i', str(audio_path),
+        '-vn',
+        '-map', '0:a:0',
+        '-af', f"aselect='{select}',asetpts=N/SR/TB",
+        '-ac', '1',
+        '-ar', str(TRANSCRIPTION_SAMPLE_RATE),
+        '-c:a', 'libmp3lame',
+        '-b:a', f'{TRANSCRIPTION_BITRATE_KBPS}k',
+        '-y',
+        str(output_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg VAD trimming error: {result.stderr}")
+    print(f"VAD: kept {kept_seconds:.1f}s of {total_seconds:.1f}s ({total_seconds - kept_seconds:.1f}s of non-speech removed)")
+    return build_time_map(spans)
+
+def run_segmenter(input_args, output_dir, stem, extension, chunk_duration_seconds=CHUNK_DURATION_SECONDS, codec_args=None, source=None, segment_times=None):
+    """
+    Run a single ffmpeg invocation that writes its audio output through the segment muxer.
+    Chunks are named chunk_001_<stem>.<extension>, ... and the exact start offset and
+    duration of every chunk is read back from the muxer's segment list and written to the
+    chunk manifest (CHUNK_MANIFEST) in output_dir. ffmpeg streams the input, so memory use
+    is constant regardless of the input length. segment_times (seconds) replaces the fixed
+    chunk_duration_seconds split with explicit cut points.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # The segment muxer expands printf patterns, so escape any '%' in the stem
+    pattern = output_dir / f"chunk_%03d_{stem.replace('%', '%%')}.{extension}"
+    fd, segment_list = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+
+    if segment_times:
+        split_args = ['-segment_times', ','.join(f"{cut:.3f}" for cut in segment_times)]
+    else:
+        split_args = ['-segment_time', str(chunk_duration_seconds)]
+
+    cmd = [
+        'ffmpeg',
+        '-v', 'error',
+        *input_args,
+        '-vn',
+        '-map', '0:a:0',
+        *(codec_args or ['-c', 'copy']),
+        '-f', 'segment',
+        *split_args,
+        '-segment_start_number', '1',
+        '-reset_timestamps', '1',
+        '-segment_list', segment_list,
+        '-segment_list_type', 'csv',
+        '-y',
+        str(pattern)
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"FFmpeg segmenting error: {result.stderr}")
+        chunks = _read_segment_list(segment_list, output_dir, _describe_source(source) if source is not None else None)
+    finally:
+        os.remove(segment_list)
+
+    if not chunks:
+        raise RuntimeError("FFmpeg produced no audio chunks")
+    write_chunk_manifest(chunks, output_dir)
+    return chunks
+
+def segment_audio(audio_path, output_dir, chunk_duration_seconds=CHUNK_DURATION_SECONDS, max_size_mb=MAX_CHUNK_SIZE_MB):
+    """
+    Split an audio file into transcription-ready chunks (16 kHz mono MP3, like extract_audio_chunks)
+    of at most chunk_duration_seconds, shortened so every chunk stays under max_size_mb whatever the
+    source codec. Cuts at pauses in speech when silence alignment is enabled.
+    Returns a list of dicts with index, filename, path, start and duration (seconds) and source.
+    """
+    audio_path = Path(audio_path)
+    chunk_seconds = min(chunk_duration_seconds, max_chunk_seconds(TRANSCRIPTION_BITRATE_KBPS, max_size_mb))
+    input_args = ['-i', str(audio_path)]
+    segment_times = scan_silence_cuts(input_args, chunk_seconds) if silence_alignment_enabled() else None
+    return run_segmenter(input_args, output_dir, audio_path.stem, 'mp3', chunk_seconds, TRANSCRIPTION_CODEC_ARGS,
+                         source=audio_path, segment_times=segment_times)
+
+def max_chunk_seconds(bitrate_kbps=TRANSCRIPTION_BITRATE_KBPS, max_size_mb=MAX_CHUNK_SIZE_MB):
+    """Longest chunk that stays under max_size_mb at a constant bitrate (10% headroom for framing)"""
+    return int(max_size_mb * 1024 * 1024 * 8 * 0.9 / (bitrate_kbps * 1000))
+
+def extract_audio_chunks(video_path, output_dir, stem, chunk_duration_seconds=CHUNK_DURATION_SECONDS, max_size_mb=MAX_CHUNK_SIZE_MB):
+    """
+    Extract audio from a video straight into transcription-ready chunks with one ffmpeg pass:
+    16 kHz mono MP3 at a low constant bitrate, split so every chunk stays under max_size_mb.
+    video_path can also be an http(s) URL, in which case only the bytes ffmpeg needs are read.
+    With silence alignment the same pass also feeds the RMS scan, and the encoded audio is then
+    split at the planned cut points with a stream copy. Returns the same chunk descriptors as segment_audio.
+    """
+    chunk_seconds = min(chunk_duration_seconds, max_chunk_seconds(TRANSCRIPTION_BITRATE_KBPS, max_size_mb))
+    codec_args = TRANSCRIPTION_CODEC_ARGS
+    if not silence_alignment_enabled():
+        return run_segmenter(media_input_args(video_path), output_dir, stem, 'mp3', chunk_seconds, codec_args, source=video_path)
+
+    fd, full_audio = tempfile.mkstemp(suffix=".mp3")
+    os.close(fd)
+    try:
+        audio_output = ['-vn', '-map', '0:a:0', *codec_args, '-y', full_audio]
+        segment_times = scan_silence_cuts(media_input_args(video_path), chunk_seconds, audio_output)
+        return run_segmenter(['-i', full_audio], output_dir, stem, 'mp3', chunk_seconds, source=video_path, segment_times=segment_times)
+    finally:
+        os.remove(full_audio)
+
+def benchmark_vad(source, chunk_duration_seconds=CHUNK_DURATION_SECONDS):
+    """
+    Measure the audio seconds voice-activity trimming saves on one lecture, chunked and trimmed
+    the way the pipeline does it (silence-aligned chunks, per-chunk thresholds, VAD_MIN_SAVED_SECONDS).
+    """
+    import time
+    started = time.perf_counter()
+    rms = scan_rms(media_input_args(source))
+    frames_per_second = 1 / SILENCE_FRAME_SECONDS
+    cuts = plan_chunk_boundaries(rms, SILENCE_FRAME_SECONDS, chunk_duration_seconds)
+    bounds = [0, *(int(round(cut * frames_per_second)) for cut in cuts), len(rms)]
+
+    total_seconds = len(rms) * SILENCE_FRAME_SECONDS
+    transcribed_seconds = 0.0
+    for start, end in zip(bounds, bounds[1:]):
+        chunk_seconds = (end - start) * SILENCE_FRAME_SECONDS
+        kept_seconds = sum(span_end - span_start for span_start, span_end in detect_speech_spans(rms[start:end]))
+        transcribed_seconds += kept_seconds if chunk_seconds - kept_seconds >= VAD_MIN_SAVED_SECONDS else chunk_seconds
+    return {
+        "source": _describe_source(source),
+        "chunks": len(bounds) - 1,
+        "audio_seconds": round(total_seconds, 1),
+        "transcribed_seconds": round(transcribed_seconds, 1),
+        "saved_seconds": round(total_seconds - transcribed_seconds, 1),
+        "scan_seconds": round(time.perf_counter() - started, 2)
+    }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark voice-activity trimming: audio seconds saved per lecture")
+    parser.add_argument("inputs", nargs="+", help="Lecture video/audio files or http(s) URLs")
+    parser.add_argument("--chunk-seconds", type=int, default=CHUNK_DURATION_SECONDS, help="Target chunk length")
+    args = parser.parse_args()
+
+    if not _numpy_available():
+        raise SystemExit("NumPy is required for the VAD benchmark")
+
+    total_audio = total_saved = 0.0
+    for source in args.inputs:
+        report = benchmark_vad(source, args.chunk_seconds)
+        total_audio += report["audio_seconds"]
+        total_saved += report["saved_seconds"]
+        saved_percent = 100 * report["saved_seconds"] / report["audio_seconds"] if report["audio_seconds"] else 0
+        print(f"{report['source']}: {report['audio_seconds']:.0f}s audio in {report['chunks']} chunks, "
+              f"{report['transcribed_seconds']:.0f}s transcribed, {report['saved_seconds']:.0f}s saved "
+              f"({saved_percent:.1f}%, ${report['saved_seconds'] / 60 * WHISPER_PRICE_PER_MINUTE:.3f}), "
+              f"scanned in {report['scan_seconds']:.1f}s")
+    if len(args.inputs) > 1:
+        saved_percent = 100 * total_saved / total_audio if total_audio else 0
+        print(f"Total: {total_saved:.0f}s of {total_audio:.0f}s saved ({saved_percent:.1f}%), "
+              f"{total_saved / len(args.inputs):.0f}s per lecture")
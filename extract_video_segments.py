@@ -2,6 +2,8 @@ import os
 import json
 import subprocess
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Configuration
@@ -9,7 +11,7 @@ SEGMENTS_JSON = "segments.json"
 INTERACTION_SEGMENTS_JSON = "interaction_segments.json"
 OUTPUT_DIR = "video_segments"
 INTERACTION_OUTPUT_DIR = "video_segments/interactions"  # Subfolder for interactions
-ORIGINAL_VIDEO = None  # Will be auto-detected
+EXTRACTION_WORKERS = int(os.getenv("VIDEO_EXTRACTION_WORKERS", os.cpu_count() or 1))  # Concurrent ffmpeg processes
 
 def sanitize_filename(filename):
     """Convert topic title to a valid filename"""
@@ -60,11 +62,12 @@ def extract_video_segment(video_path, start_time, duration, output_path, topic_t
     print(f"  Output: {output_path}")
     
     try:
-        # Use proper quoting for file paths with spaces
+        # -ss before -i seeks the input to the nearest keyframe instead of
+        # decoding and discarding everything from the start of the file
         cmd = [
             'ffmpeg',
-            '-i', video_path,  # ffmpeg handles spaces automatically
             '-ss', start_str,
+            '-i', video_path,  # ffmpeg handles spaces automatically
             '-t', duration_str,
             '-c', 'copy',
             '-avoid_negative_ts', 'make_zero',
@@ -79,36 +82,117 @@ def extract_video_segment(video_path, start_time, duration, output_path, topic_t
         print(f"  ❌ Error extracting {output_path}: {e}")
         return False, e.stderr
 
-def create_video_segments(video_path=None):
-    """Main function to create video segments from segments.json"""
+def _timed_extraction(video_path, job):
+    """Run one extraction job and return its outcome with the elapsed wall-clock time"""
+    segment_type, start_time, end_time, output_path, title = job
+    started = time.perf_counter()
+    success, error = extract_video_segment(video_path, start_time, end_time - start_time, output_path, title)
+    return {
+        "segment_type": segment_type,
+        "output_path": output_path,
+        "title": title,
+        "success": success,
+        "error": error,
+        "elapsed": time.perf_counter() - started
+    }
+
+def extract_clips_parallel(video_path, jobs, max_workers=EXTRACTION_WORKERS):
+    """
+    Extract clips concurrently. Each job is (segment_type, start_time, end_time, output_path, title).
+    Every worker drives its own ffmpeg process, so the pool size bounds the number of
+    concurrent ffmpeg processes. Results are returned in job order with per-clip timings.
+    """
+    if not jobs:
+        return []
+    
+    workers = max(1, min(max_workers, len(jobs)))
+    print(f"🚀 Extracting {len(jobs)} clips with {workers} parallel ffmpeg workers")
+    
+    results = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_timed_extraction, video_path, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if result["success"]:
+                print(f"  ⏱️  {result['title']}: {result['elapsed']:.2f}s")
+            elif result["error"]:
+                print(f"  Error output: {result['error']}")
+    
+    return results
+
+def build_clip_job(segment, index, output_dir=OUTPUT_DIR, interaction_output_dir=INTERACTION_OUTPUT_DIR):
+    """
+    Build the extraction job for a segment, the index-th of its type (clips are numbered per type).
+    Returns None when the segment's timestamps are invalid.
+    """
+    start_time = segment.get('start_time', 0)
+    end_time = segment.get('end_time', 0)
+    
+    if segment.get('segment_type') == 'interaction':
+        topic_title = segment.get('title', f'Unknown_Interaction_{index}')
+        interaction_type = segment.get('interaction_type', 'Unknown')
+        
+        # Validate timestamps
+        if start_time >= end_time:
+            print(f"⚠️  Skipping interaction segment {index}: Invalid timestamps ({start_time} >= {end_time})")
+            return None
+        
+        # Create filename with interaction type
+        output_filename = f"{index:02d}_{interaction_type}_{sanitize_filename(topic_title)}.mp4"
+        output_path = os.path.join(interaction_output_dir, output_filename)
+        return ("interaction", start_time, end_time, output_path, f"{topic_title} ({interaction_type})")
+    
+    topic_title = segment.get('title', f'Unknown_Topic_{index}')
+    
+    # Validate timestamps
+    if start_time >= end_time:
+        print(f"⚠️  Skipping regular segment {index}: Invalid timestamps ({start_time} >= {end_time})")
+        return None
+    
+    # Create filename
+    output_filename = f"{index:02d}_{sanitize_filename(topic_title)}.mp4"
+    output_path = os.path.join(output_dir, output_filename)
+    return ("topic", start_time, end_time, output_path, topic_title)
+
+def extract_segment_clip(video_path, segment, index, output_dir=OUTPUT_DIR, interaction_output_dir=INTERACTION_OUTPUT_DIR):
+    """
+    Cut a single segment as soon as it is known, without waiting for segments.json.
+    Returns the same outcome dict as extract_clips_parallel, or None if the segment was skipped.
+    """
+    job = build_clip_job(segment, index, output_dir, interaction_output_dir)
+    if not job:
+        return None
+    os.makedirs(os.path.dirname(job[3]) or '.', exist_ok=True)
+    return _timed_extraction(video_path, job)
+
+def create_video_segments(video_path=None, max_workers=EXTRACTION_WORKERS, segments_json=SEGMENTS_JSON,
+                          output_dir=OUTPUT_DIR, interaction_output_dir=INTERACTION_OUTPUT_DIR):
+    """Main function to create video segments from segments.json (paths can point into a job workspace)"""
     
     # Check if segments.json exists
-    if not os.path.exists(SEGMENTS_JSON):
-        print(f"❌ {SEGMENTS_JSON} not found!")
+    if not os.path.exists(segments_json):
+        print(f"❌ {segments_json} not found!")
         return False
     
-    # Find original video
-    global ORIGINAL_VIDEO
-    if video_path:
-        ORIGINAL_VIDEO = video_path
-    else:
-        ORIGINAL_VIDEO = find_original_video()
+    # Find original video (auto-detected when not given)
+    original_video = video_path or find_original_video()
     
-    if not ORIGINAL_VIDEO:
+    if not original_video:
         print("❌ No video file found in uploads/ directory or current directory!")
         print("Supported formats: .mp4, .avi, .mov, .mkv, .webm, .flv, .wmv")
         return False
     
-    print(f"📹 Found original video: {ORIGINAL_VIDEO}")
+    print(f"📹 Found original video: {original_video}")
     
     # Create output directories
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    os.makedirs(INTERACTION_OUTPUT_DIR, exist_ok=True)
-    print(f"📁 Output directory: {OUTPUT_DIR}")
-    print(f"💬 Interaction directory: {INTERACTION_OUTPUT_DIR}")
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(interaction_output_dir, exist_ok=True)
+    print(f"📁 Output directory: {output_dir}")
+    print(f"💬 Interaction directory: {interaction_output_dir}")
     
     # Load segments
-    with open(SEGMENTS_JSON, 'r') as f:
+    with open(segments_json, 'r') as f:
         segments = json.load(f)
     
     print(f"📋 Found {len(segments)} segments to extract")
@@ -126,68 +210,32 @@ def create_video_segments(video_path=None):
     print(f"📚 Regular topic segments: {len(regular_segments)}")
     print(f"💬 Interaction segments: {len(interaction_segments)}")
     
-    # Extract regular segments
-    successful_extractions = 0
+    # Build one extraction job per valid segment
+    jobs = []
     failed_extractions = 0
-    interaction_extractions = 0
     interaction_failures = 0
     
-    # Process regular segments
     for i, segment in enumerate(regular_segments, 1):
-        topic_title = segment.get('title', f'Unknown_Topic_{i}')
-        start_time = segment.get('start_time', 0)
-        end_time = segment.get('end_time', 0)
-        
-        # Validate timestamps
-        if start_time >= end_time:
-            print(f"⚠️  Skipping regular segment {i}: Invalid timestamps ({start_time} >= {end_time})")
-            failed_extractions += 1
-            continue
-        
-        # Create filename
-        sanitized_title = sanitize_filename(topic_title)
-        output_filename = f"{i:02d}_{sanitized_title}.mp4"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-        
-        # Extract segment
-        success, error = extract_video_segment(ORIGINAL_VIDEO, start_time, end_time - start_time, output_path, topic_title)
-        if success:
-            successful_extractions += 1
+        job = build_clip_job(segment, i, output_dir, interaction_output_dir)
+        if job:
+            jobs.append(job)
         else:
             failed_extractions += 1
-            if error:
-                print(f"  Error output: {error}")
-        
-        print()  # Empty line for readability
     
-    # Process interaction segments
     for i, segment in enumerate(interaction_segments, 1):
-        topic_title = segment.get('title', f'Unknown_Interaction_{i}')
-        start_time = segment.get('start_time', 0)
-        end_time = segment.get('end_time', 0)
-        interaction_type = segment.get('interaction_type', 'Unknown')
-        
-        # Validate timestamps
-        if start_time >= end_time:
-            print(f"⚠️  Skipping interaction segment {i}: Invalid timestamps ({start_time} >= {end_time})")
-            interaction_failures += 1
-            continue
-        
-        # Create filename with interaction type
-        sanitized_title = sanitize_filename(topic_title)
-        output_filename = f"{i:02d}_{interaction_type}_{sanitized_title}.mp4"
-        output_path = os.path.join(INTERACTION_OUTPUT_DIR, output_filename)
-        
-        # Extract segment
-        success, error = extract_video_segment(ORIGINAL_VIDEO, start_time, end_time - start_time, output_path, f"{topic_title} ({interaction_type})")
-        if success:
-            interaction_extractions += 1
+        job = build_clip_job(segment, i, output_dir, interaction_output_dir)
+        if job:
+            jobs.append(job)
         else:
             interaction_failures += 1
-            if error:
-                print(f"  Error output: {error}")
-        
-        print()  # Empty line for readability
+    
+    # Extract all clips in parallel
+    results = extract_clips_parallel(original_video, jobs, max_workers)
+    
+    successful_extractions = sum(1 for r in results if r["success"] and r["segment_type"] == "topic")
+    failed_extractions += sum(1 for r in results if not r["success"] and r["segment_type"] == "topic")
+    interaction_extractions = sum(1 for r in results if r["success"] and r["segment_type"] == "interaction")
+    interaction_failures += sum(1 for r in results if not r["success"] and r["segment_type"] == "interaction")
     
     # Summary
     print("=" * 50)
@@ -197,14 +245,19 @@ def create_video_segments(video_path=None):
     print(f"❌ Failed regular extractions: {failed_extractions}")
     print(f"💬 Successful interaction extractions: {interaction_extractions}")
     print(f"❌ Failed interaction extractions: {interaction_failures}")
-    print(f"📁 Output directory: {OUTPUT_DIR}")
-    print(f"💬 Interaction directory: {INTERACTION_OUTPUT_DIR}")
+    print(f"📁 Output directory: {output_dir}")
+    print(f"💬 Interaction directory: {interaction_output_dir}")
+    if results:
+        print("⏱️  Per-clip extraction times:")
+        for result in results:
+            status = "✅" if result["success"] else "❌"
+            print(f"  {status} {result['elapsed']:6.2f}s  {os.path.basename(result['output_path'])}")
     
     total_successful = successful_extractions + interaction_extractions
     if total_successful > 0:
         print(f"\n🎉 Successfully extracted {total_successful} video segments!")
-        print(f"📂 Check the '{OUTPUT_DIR}' folder for regular topic segments.")
-        print(f"💬 Check the '{INTERACTION_OUTPUT_DIR}' folder for interaction segments.")
+        print(f"📂 Check the '{output_dir}' folder for regular topic segments.")
+        print(f"💬 Check the '{interaction_output_dir}' folder for interaction segments.")
         return True
     else:
         print("❌ No video segments were successfully extracted.")
@@ -0,0 +1,169 @@
+import uuid
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Configuration
+JOB_EVENT_HISTORY = 50  # Progress events kept per job for SSE replay
+FINISHED_JOBS_LIMIT = 200  # Finished jobs kept in memory before the oldest are dropped
+TERMINAL_STATUSES = ("completed", "failed")
+
+# (manager, job_id) of the job running in the current worker thread
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity"""
+
+class JobManager:
+    """
+    Runs pipeline jobs on a bounded worker pool with a bounded queue, and tracks each job's
+    status, stage timings and progress events in memory (nothing survives a restart).
+    """
+
+    def __init__(self, max_workers=2, max_queued=10):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _queued_count(self):
+        return sum(1 for job in self._jobs.values() if job["status"] == "queued")
+
+    def has_capacity(self):
+        """Whether a new job would be accepted right now"""
+        with self._lock:
+            return self._queued_count() < self.max_queued
+
+    def submit(self, job_type, fn, *args, job_id=None):
+        """Queue fn(*args) as a job and return a snapshot of it; raises JobQueueFull when the queue is full"""
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock:
+            if self._queued_count() >= self.max_queued:
+                raise JobQueueFull(f"{self.max_queued} jobs are already waiting")
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "job_type": job_type,
+                "status": "queued",
+                "stage": None,
+                "progress": 0.0,
+                "message": "Waiting for a free worker",
+                "created_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "stages": [],
+                "result": None,
+                "error": None,
+                "events": [],
+                "seq": 0
+            }
+            self._emit(self._jobs[job_id])
+            self._prune()
+        self._executor.submit(self._run, job_id, fn, args)
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """Return a snapshot of a job without its event history, or None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = {key: value for key, value in job.items() if key not in ("events", "seq")}
+            snapshot["stages"] = [dict(stage) for stage in job["stages"]]
+            return snapshot
+
+    def events_since(self, job_id, seq=0):
+        """Return the job's progress events newer than seq (None if the job is unknown)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return [event for event in job["events"] if event["seq"] > seq]
+
+    def report(self, job_id, stage=None, message=None, progress=None):
+        """Record progress of a running job; a new stage closes the timing of the previous one"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if stage and stage != job["stage"]:
+                self._close_stage(job)
+                job["stage"] = stage
+                job["stages"].append({
+                    "name": stage,
+                    "started_at": datetime.now().isoformat(),
+                    "finished_at": None,
+                    "duration_seconds": None
+                })
+            if message is not None:
+                job["message"] = message
+            if progress is not None:
+                job["progress"] = progress
+            self._emit(job)
+
+    def _run(self, job_id, fn, args):
+        """Worker entry point: run a job and record its result or error"""
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+            job["message"] = "Processing started"
+            self._emit(job)
+
+        token = _current_job.set((self, job_id))
+        try:
+            result = fn(*args)
+            self._finish(job_id, "completed", "Processing completed successfully", result=result)
+        except Exception as e:
+            # HTTPException-style errors carry their message in .detail
+            error = str(getattr(e, "detail", None) or e)
+            self._finish(job_id, "failed", f"Processing failed: {error}", error=error)
+        finally:
+            _current_job.reset(token)
+
+    def _finish(self, job_id, status, message, result=None, error=None):
+        with self._lock:
+            job = self._jobs[job_id]
+            self._close_stage(job)
+            job.update(status=status, message=message, result=result, error=error, finished_at=datetime.now().isoformat())
+            if status == "completed":
+                job["progress"] = 100.0
+            self._emit(job)
+
+    def _close_stage(self, job):
+        if job["stages"] and job["stages"][-1]["finished_at"] is None:
+            stage = job["stages"][-1]
+            finished_at = datetime.now()
+            stage["finished_at"] = finished_at.isoformat()
+            stage["duration_seconds"] = round((finished_at - datetime.fromisoformat(stage["started_at"])).total_seconds(), 3)
+
+    def _emit(self, job):
+        """Append the job's current state to its event history (lock held)"""
+        job["seq"] += 1
+        event = {
+            "seq": job["seq"],
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "stage": job["stage"],
+            "message": job["message"],
+            "progress": job["progress"],
+            "timestamp": datetime.now().isoformat()
+        }
+        if job["status"] in TERMINAL_STATUSES:
+            event["result"] = job["result"]
+            event["error"] = job["error"]
+        job["events"] = (job["events"] + [event])[-JOB_EVENT_HISTORY:]
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond FINISHED_JOBS_LIMIT (lock held)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in TERMINAL_STATUSES]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_LIMIT)]:
+            del self._jobs[job_id]
+
+def report_progress(stage=None, message=None, progress=None):
+    """Report progress of the job running in the current thread (no-op outside a job)"""
+    current = _current_job.get()
+    if current:
+        manager, job_id = current
+        manager.report(job_id, stage, message, progress)
@@ -0,0 +1,92 @@
+import os
+import json
+import shutil
+import uuid
+from pathlib import Path
+
+# Files every job writes into its workspace
+TRANSCRIPTIONS_JSON = "transcriptions.json"
+SEGMENTS_JSON = "segments.json"
+INTERACTION_SEGMENTS_JSON = "interaction_segments.json"
+CHECKPOINT_JSON = "processing_checkpoint.json"
+
+class JobWorkspace:
+    """
+    Job-scoped working directory. Every file of one processing run (source video,
+    audio chunks, transcriptions, segment JSON, checkpoint and extracted clips)
+    lives under <root>/<job_id>, so concurrent jobs never share or delete each
+    other's files.
+    """
+
+    def __init__(self, root, job_id=None):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.root = Path(root) / self.job_id
+        self.input_dir = self.root / "input"
+        self.audio_dir = self.root / "output"
+        self.video_segments_dir = self.root / "video_segments"
+        self.interaction_segments_dir = self.video_segments_dir / "interactions"
+        self.transcriptions_json = self.root / TRANSCRIPTIONS_JSON
+        self.segments_json = self.root / SEGMENTS_JSON
+        self.interaction_segments_json = self.root / INTERACTION_SEGMENTS_JSON
+        self.checkpoint_json = self.root / CHECKPOINT_JSON
+
+    def __repr__(self):
+        return f"JobWorkspace({str(self.root)!r})"
+
+    def create(self):
+        """Create the workspace directories and return the workspace"""
+        for directory in (self.input_dir, self.audio_dir, self.video_segments_dir, self.interaction_segments_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def reset(self):
+        """Remove leftovers of a previous run of this job (the checkpoint is kept so the job can resume)"""
+        self.cleanup_intermediate()
+        shutil.rmtree(self.input_dir, ignore_errors=True)
+        shutil.rmtree(self.video_segments_dir, ignore_errors=True)
+        return self.create()
+
+    def cleanup_intermediate(self):
+        """Delete audio chunks and intermediate JSON files, keeping extracted clips. Returns the number of files removed"""
+        removed = 0
+        for path in (self.transcriptions_json, self.segments_json, self.interaction_segments_json):
+            if path.exists():
+                path.unlink()
+                removed += 1
+        if self.audio_dir.exists():
+            for path in self.audio_dir.iterdir():
+                if path.is_file():
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def cleanup(self):
+        """Delete the whole workspace"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def list_video_segments(self):
+        """Return extracted topic clips followed by interaction clips"""
+        video_extensions = ['.mp4', '.avi', '.mov', '.mkv']
+        segments = []
+        for directory in (self.video_segments_dir, self.interaction_segments_dir):
+            if directory.exists():
+                segments.extend(
+                    str(path) for path in sorted(directory.iterdir())
+                    if path.is_file() and path.suffix.lower() in video_extensions
+                )
+        return segments
+
+    def write_json(self, path, data):
+        """Atomically write JSON into the workspace"""
+        tmp_path = Path(f"{path}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def read_json(self, path, default=None):
+        """Read JSON from the workspace, returning default if it is missing or invalid"""
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
@@ -4,21 +4,31 @@ import subprocess
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import aiofiles
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, BackgroundTasks
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from pydub import AudioSegment
 import tempfile
 import uuid
 import sys
+import hashlib
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 import yt_dlp
 import re
 from dotenv import load_dotenv
 sys.path.append(str(Path(__file__).parent))
+from job_workspace import JobWorkspace
+from job_manager import JobManager, JobQueueFull, report_progress, TERMINAL_STATUSES
 
 # Load environment variables from .env file
 load_dotenv()
@@ -40,13 +50,22 @@ app = FastAPI(title="Audio Extraction API", description="Extract audio from vide
 UPLOAD_DIR = Path("uploads")
 OUTPUT_DIR = Path("output")
 VIDEO_SEGMENTS_DIR = Path("video_segments")
+JOBS_DIR = Path("jobs")  # One JobWorkspace per processing run
+UNTRACKED_WORKSPACE_GRACE_SECONDS = 3600  # Workspaces of unknown jobs (e.g. still uploading) are kept this long
 MAX_AUDIO_SIZE_MB = 25
 CHUNK_DURATION_MINUTES = 10  # Duration of each chunk in minutes
+MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10240"))  # Uploads above this are rejected with 413
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Uploads are streamed to disk in 1MB chunks
+UPLOAD_SHA256 = os.getenv("UPLOAD_SHA256", "true").lower() == "true"  # Hash uploads while streaming (for dedup)
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))  # Videos processed concurrently, off the event loop
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "10"))  # Jobs waiting for a worker before new ones get 429
+JOB_EVENTS_POLL_INTERVAL = 0.5  # Seconds between job state reads in the SSE progress stream
 
 # Create directories if they don't exist
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 VIDEO_SEGMENTS_DIR.mkdir(exist_ok=True)
+JOBS_DIR.mkdir(exist_ok=True)
 
 # S3 Configuration
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "lisa-research")
@@ -54,23 +73,45 @@ S3_REGION = os.getenv("S3_REGION", "ap-south-1")
 S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
 S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
 
+# Concurrent S3 uploads
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "8"))  # Clips uploaded in parallel
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,  # Clips above 16MB are sent as parallel multipart uploads
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=4,  # Transfer threads per file
+    use_threads=True
+)
+
+# Shared S3 client: boto3 clients are thread-safe, so one connection-pooled client serves every upload
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
 def get_s3_client():
-    """Get S3 client with credentials from environment variables"""
+    """Return the process-wide S3 client, creating it on first use (None without credentials)"""
+    global _s3_client
     if not S3_ACCESS_KEY or not S3_SECRET_KEY:
         logger.warning("⚠️  S3 credentials not found in environment variables")
         return None
     
-    try:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=S3_ACCESS_KEY,
-            aws_secret_access_key=S3_SECRET_KEY,
-            region_name=S3_REGION
-        )
-        return s3_client
-    except Exception as e:
-        logger.error(f"❌ Failed to create S3 client: {e}")
-        return None
+    with _s3_client_lock:
+        if _s3_client is None:
+            try:
+                _s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=S3_ACCESS_KEY,
+                    aws_secret_access_key=S3_SECRET_KEY,
+                    region_name=S3_REGION,
+                    # Enough pooled connections for every concurrent clip upload and its transfer threads
+                    config=BotoConfig(
+                        max_pool_connections=S3_UPLOAD_CONCURRENCY * S3_TRANSFER_CONFIG.max_concurrency,
+                        retries={"max_attempts": 5, "mode": "standard"}
+                    )
+                )
+                logger.info(f"✅ S3 client created (bucket: {S3_BUCKET_NAME}, region: {S3_REGION})")
+            except Exception as e:
+                logger.error(f"❌ Failed to create S3 client: {e}")
+                return None
+        return _s3_client
 
 def upload_file_to_s3(file_path: Path, s3_key: str) -> Optional[str]:
     """Upload a file to S3 and return the URL"""
@@ -85,7 +126,8 @@ def upload_file_to_s3(file_path: Path, s3_key: str) -> Optional[str]:
             str(file_path),
             S3_BUCKET_NAME,
             s3_key,
-            ExtraArgs={'ContentType': 'video/mp4'}
+            ExtraArgs={'ContentType': 'video/mp4'},
+            Config=S3_TRANSFER_CONFIG
         )
         
         # Generate the S3 URL
@@ -134,57 +176,81 @@ def cleanup_video_segments_after_s3_upload(video_segments: List[str]) -> int:
     logger.info(f"✅ Local video segment cleanup completed: {cleaned_count}/{len(video_segments)} segments deleted")
     return cleaned_count
 
-def upload_video_segments_to_s3(video_segments: List[str]) -> List[dict]:
-    """Upload all video segments to S3 and return their URLs"""
+def upload_video_segment_to_s3(segment_path: str) -> dict:
+    """Upload one video segment to S3 and return its upload info, with success/error telling whether it made it"""
+    segment_file = Path(segment_path)
+    
+    # Create S3 key with timestamp to avoid conflicts
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # Determine if this is an interaction segment based on path
+    if "interactions" in str(segment_file):
+        s3_key = f"video-segments/interactions/{timestamp}_{segment_file.name}"
+        segment_type = "interaction"
+    else:
+        s3_key = f"video-segments/topics/{timestamp}_{segment_file.name}"
+        segment_type = "topic"
+    
+    upload = {
+        "filename": segment_file.name,
+        "s3_url": None,
+        "s3_key": s3_key,
+        "size_mb": None,
+        "segment_type": segment_type,
+        "success": False,
+        "error": None
+    }
+    if not segment_file.exists():
+        logger.warning(f"⚠️  Video segment not found: {segment_path}")
+        upload["error"] = "Segment file not found"
+        return upload
+    
+    upload["size_mb"] = get_file_size_mb(segment_file)
+    s3_url = upload_file_to_s3(segment_file, s3_key)
+    if not s3_url:
+        logger.error(f"❌ Failed to upload {segment_file.name} to S3")
+        upload["error"] = "S3 upload failed"
+        return upload
+    
+    logger.info(f"✅ Uploaded {segment_type} segment: {segment_file.name}")
+    upload.update(s3_url=s3_url, success=True)
+    return upload
+
+def upload_video_segments_to_s3(video_segments: List[str], max_workers: int = S3_UPLOAD_CONCURRENCY) -> List[dict]:
+    """
+    Upload video segments to S3 concurrently and return one upload info per segment, in segment order.
+    Failed uploads are included with success=False and an error, so callers decide what to do with them.
+    """
     s3_urls = []
     
     if not video_segments:
         logger.warning("⚠️  No video segments to upload")
         return s3_urls
     
-    logger.info(f"🚀 Starting S3 upload for {len(video_segments)} video segments...")
+    workers = max(1, min(max_workers, len(video_segments)))
+    logger.info(f"🚀 Starting S3 upload for {len(video_segments)} video segments ({workers} in parallel)...")
     
-    for segment_path in video_segments:
-        segment_file = Path(segment_path)
-        if not segment_file.exists():
-            logger.warning(f"⚠️  Video segment not found: {segment_path}")
-            continue
-        
-        # Create S3 key with timestamp to avoid conflicts
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Determine if this is an interaction segment based on path
-        if "interactions" in str(segment_file):
-            s3_key = f"video-segments/interactions/{timestamp}_{segment_file.name}"
-            segment_type = "interaction"
-        else:
-            s3_key = f"video-segments/topics/{timestamp}_{segment_file.name}"
-            segment_type = "topic"
-        
-        s3_url = upload_file_to_s3(segment_file, s3_key)
-        if s3_url:
-            s3_urls.append({
-                "filename": segment_file.name,
-                "s3_url": s3_url,
-                "s3_key": s3_key,
-                "size_mb": get_file_size_mb(segment_file),
-                "segment_type": segment_type
-            })
-            logger.info(f"✅ Uploaded {segment_type} segment: {segment_file.name}")
-        else:
-            logger.error(f"❌ Failed to upload {segment_file.name} to S3")
+    # executor.map keeps the outcomes in segment order
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-upload") as executor:
+        outcomes = list(executor.map(upload_video_segment_to_s3, video_segments))
+    s3_urls = list(outcomes)
+    uploaded = [path for path, upload in zip(video_segments, s3_urls) if upload["success"]]
     
-    logger.info(f"✅ S3 upload completed: {len(s3_urls)}/{len(video_segments)} segments uploaded")
+    logger.info(f"✅ S3 upload completed: {len(uploaded)}/{len(video_segments)} segments uploaded")
     
-    # Clean up local video segments after successful S3 upload
-    if s3_urls:
-        cleaned_count = cleanup_video_segments_after_s3_upload(video_segments)
+    # Clean up the local copies of the segments that made it to S3; failed ones are kept for a retry
+    if uploaded:
+        cleaned_count = cleanup_video_segments_after_s3_upload(uploaded)
         logger.info(f"🎯 Final cleanup: {cleaned_count} local video segments removed after S3 upload")
     else:
         logger.warning("⚠️  No S3 uploads successful, keeping local video segments for debugging")
     
     return s3_urls
 
+def count_uploaded(s3_urls: List[dict]) -> int:
+    """Number of segments in an upload_video_segments_to_s3 result that made it to S3"""
+    return sum(1 for upload in s3_urls if upload["success"])
+
 def is_valid_youtube_url(url: str) -> bool:
     """Check if the URL is a valid YouTube URL"""
     youtube_patterns = [
@@ -493,7 +559,7 @@ def download_youtube_video(youtube_url: str, output_dir: Path) -> Optional[Path]
         logger.error(f"❌ Error downloading YouTube video: {str(e)}")
         return None
 
-def process_youtube_video(youtube_url: str) -> dict:
+def process_youtube_video(youtube_url: str, job_id: Optional[str] = None, combined_analysis: Optional[bool] = None) -> dict:
     """Process YouTube video through the complete pipeline"""
     import transcribe_segments
     
@@ -504,8 +570,9 @@ def process_youtube_video(youtube_url: str) -> dict:
     logger.info(f"📺 YouTube URL: {youtube_url}")
     logger.info(f"🆔 Request ID: {start_time.strftime('%Y%m%d_%H%M%S')}")
     
-    # Clean up remnant files from previous runs
-    cleanup_previous_files()
+    # Every request gets its own workspace so concurrent jobs never share files
+    workspace = JobWorkspace(JOBS_DIR, job_id).create()
+    logger.info(f"📂 Job workspace: {workspace.root}")
     
     # Validate YouTube URL
     if not is_valid_youtube_url(youtube_url):
@@ -513,6 +580,7 @@ def process_youtube_video(youtube_url: str) -> dict:
     
     try:
         # Download YouTube video
+        report_progress("download", "Downloading YouTube video...", 5.0)
         video_path = download_youtube_video(youtube_url, UPLOAD_DIR)
         if not video_path:
             raise HTTPException(status_code=500, detail="Failed to download YouTube video - download returned None")
@@ -524,6 +592,7 @@ def process_youtube_video(youtube_url: str) -> dict:
         logger.info(f"✅ Video file ready: {video_size_mb:.2f}MB")
         
         # Extract audio using ffmpeg
+        report_progress("audio_extraction", "Extracting audio...", 10.0)
         logger.info("🎵 Starting audio extraction from YouTube video...")
         try:
             # First, probe the input file to get the audio codec
@@ -545,7 +614,7 @@ def process_youtube_video(youtube_url: str) -> dict:
             out_ext = codec_ext.get(audio_codec, 'audio')
             file_id = str(uuid.uuid4())
             audio_filename = f"{file_id}_youtube_audio.{out_ext}"
-            audio_path = OUTPUT_DIR / audio_filename
+            audio_path = workspace.audio_dir / audio_filename
             logger.info(f"📄 Audio will be saved as: {audio_filename}")
             
             # Extract audio using FFmpeg
@@ -579,9 +648,10 @@ def process_youtube_video(youtube_url: str) -> dict:
         logger.info(f"📊 Audio file size: {audio_size_mb:.2f}MB (max before chunking: {MAX_AUDIO_SIZE_MB}MB)")
         
         if audio_size_mb > MAX_AUDIO_SIZE_MB:
+            report_progress("chunking", "Chunking audio...", 20.0)
             logger.info(f"✂️  Audio file exceeds {MAX_AUDIO_SIZE_MB}MB, starting chunking process...")
             # Create chunks
-            chunk_files = chunk_audio(audio_path, OUTPUT_DIR, CHUNK_DURATION_MINUTES)
+            chunk_files = chunk_audio(audio_path, workspace.audio_dir, CHUNK_DURATION_MINUTES)
             
             # Clean up original large audio file
             logger.info("🗑️  Cleaning up original large audio file...")
@@ -589,12 +659,17 @@ def process_youtube_video(youtube_url: str) -> dict:
             logger.info("✅ Original audio file deleted")
             
             # After chunking, run transcription and topic analysis
+            # Transcription and analysis run as one pipeline, so they share a single stage
+            report_progress("transcription", "Transcribing and analysing audio...", 30.0)
             logger.info("📝 Starting transcription and topic analysis...")
             try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
+                audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                    output_dir=str(workspace.audio_dir),
+                    transcriptions_path=str(workspace.transcriptions_json),
+                    interaction_segments_path=str(workspace.interaction_segments_json),
+                    combined_analysis=combined_analysis
+                )
+                with open(workspace.segments_json, "w") as f:
                     import json
                     json.dump(segment_json, f, indent=2)
                 logger.info("✅ Topic analysis and segment creation completed!")
@@ -602,9 +677,10 @@ def process_youtube_video(youtube_url: str) -> dict:
                 logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
             
             # Run video segment extraction after transcription
+            report_progress("video_segments", "Extracting video segments...", 75.0)
             logger.info("🎬 Starting video segment extraction after transcription...")
             try:
-                all_segments = run_video_segment_extraction(video_path)
+                all_segments = run_video_segment_extraction(video_path, workspace)
                 logger.info("✅ Video segment extraction completed!")
                 
                 # Separate regular segments from interaction segments
@@ -620,7 +696,7 @@ def process_youtube_video(youtube_url: str) -> dict:
                 
                 # Clean up intermediate files after successful video segment extraction
                 if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
+                    cleanup_intermediate_files(video_path, audio_path, workspace)
                 else:
                     logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
                     
@@ -632,9 +708,13 @@ def process_youtube_video(youtube_url: str) -> dict:
             # Upload video segments to S3
             s3_urls = []
             if all_segments:
+                report_progress("s3_upload", "Uploading segments to S3...", 90.0)
                 logger.info("☁️  Starting S3 upload for video segments...")
                 s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
+                logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(s3_urls)} segments uploaded")
+                # Drop the workspace once every clip is safely on S3
+                if all(upload["success"] for upload in s3_urls):
+                    workspace.cleanup()
             
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds()
@@ -647,7 +727,7 @@ def process_youtube_video(youtube_url: str) -> dict:
             logger.info(f"✂️  Created {len(chunk_files)} chunks")
             logger.info(f"🎬 Created {len(video_segments)} regular video segments")
             logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
+            logger.info(f"☁️  Uploaded {count_uploaded(s3_urls)}/{len(s3_urls)} segments to S3")
             logger.info("=" * 60)
             
             return {
@@ -659,7 +739,7 @@ def process_youtube_video(youtube_url: str) -> dict:
                 "total_video_segments": len(video_segments),
                 "interaction_segments": interaction_segments,
                 "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
+                "segments_json_path": str(workspace.segments_json),
                 "s3_urls": s3_urls,
                 "processing_time_seconds": processing_time
             }
@@ -667,12 +747,17 @@ def process_youtube_video(youtube_url: str) -> dict:
             logger.info(f"✅ Audio file is under {MAX_AUDIO_SIZE_MB}MB, no chunking needed")
             
             # After chunking, run transcription and topic analysis
+            # Transcription and analysis run as one pipeline, so they share a single stage
+            report_progress("transcription", "Transcribing and analysing audio...", 30.0)
             logger.info("📝 Starting transcription and topic analysis...")
             try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
+                audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                    output_dir=str(workspace.audio_dir),
+                    transcriptions_path=str(workspace.transcriptions_json),
+                    interaction_segments_path=str(workspace.interaction_segments_json),
+                    combined_analysis=combined_analysis
+                )
+                with open(workspace.segments_json, "w") as f:
                     import json
                     json.dump(segment_json, f, indent=2)
                 logger.info("✅ Topic analysis and segment creation completed!")
@@ -680,9 +765,10 @@ def process_youtube_video(youtube_url: str) -> dict:
                 logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
 
             # Run video segment extraction after transcription
+            report_progress("video_segments", "Extracting video segments...", 75.0)
             logger.info("🎬 Starting video segment extraction after transcription...")
             try:
-                all_segments = run_video_segment_extraction(video_path)
+                all_segments = run_video_segment_extraction(video_path, workspace)
                 logger.info("✅ Video segment extraction completed!")
                 
                 # Separate regular segments from interaction segments
@@ -698,7 +784,7 @@ def process_youtube_video(youtube_url: str) -> dict:
                 
                 # Clean up intermediate files after successful video segment extraction
                 if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
+                    cleanup_intermediate_files(video_path, audio_path, workspace)
                 else:
                     logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
                     
@@ -710,9 +796,13 @@ def process_youtube_video(youtube_url: str) -> dict:
             # Upload video segments to S3
             s3_urls = []
             if all_segments:
+                report_progress("s3_upload", "Uploading segments to S3...", 90.0)
                 logger.info("☁️  Starting S3 upload for video segments...")
                 s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
+                logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(s3_urls)} segments uploaded")
+                # Drop the workspace once every clip is safely on S3
+                if all(upload["success"] for upload in s3_urls):
+                    workspace.cleanup()
             
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds()
@@ -724,7 +814,7 @@ def process_youtube_video(youtube_url: str) -> dict:
             logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
             logger.info(f"🎬 Created {len(video_segments)} regular video segments")
             logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
+            logger.info(f"☁️  Uploaded {count_uploaded(s3_urls)}/{len(s3_urls)} segments to S3")
             logger.info("=" * 60)
             
             return {
@@ -735,7 +825,7 @@ def process_youtube_video(youtube_url: str) -> dict:
                 "total_video_segments": len(video_segments),
                 "interaction_segments": interaction_segments,
                 "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
+                "segments_json_path": str(workspace.segments_json),
                 "s3_urls": s3_urls,
                 "processing_time_seconds": processing_time
             }
@@ -765,6 +855,8 @@ async def root():
                     "list_video_segments": "/video-segments",
         "download_video_segment": "/download-video/{filename}",
         "process_youtube": "/process-youtube",
+        "job_status": "/jobs/{job_id}",
+        "job_events": "/jobs/{job_id}/events",
         "cleanup": "/cleanup",
         "logs": "/logs",
         "docs": "/docs"
@@ -798,6 +890,21 @@ class AudioExtractionResponse(BaseModel):
     total_interaction_segments: Optional[int] = None
     segments_json_path: Optional[str] = None
     s3_urls: Optional[List[dict]] = None
+    file_sha256: Optional[str] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    job_type: str
+    status: str  # queued, running, completed or failed
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    stage: Optional[str] = None
+    progress: float = 0.0
+    message: Optional[str] = None
+    stages: List[dict] = []  # name, started_at, finished_at, duration_seconds
+    result: Optional[dict] = None
+    error: Optional[str] = None
 
 class VideoSegmentResponse(BaseModel):
     filename: str
@@ -809,6 +916,7 @@ class VideoSegmentResponse(BaseModel):
 
 class YouTubeProcessRequest(BaseModel):
     youtube_url: str
+    combined_analysis: Optional[bool] = None  # One analysis call per chunk (None uses the server default)
 
 class YouTubeProcessResponse(BaseModel):
     message: str
@@ -828,6 +936,39 @@ def get_file_size_mb(file_path: Path) -> float:
     """Get file size in MB"""
     return file_path.stat().st_size / (1024 * 1024)
 
+async def save_upload_streaming(upload: UploadFile, destination: Path, max_size_mb: int = MAX_UPLOAD_SIZE_MB, compute_sha256: bool = UPLOAD_SHA256) -> Tuple[int, Optional[str]]:
+    """
+    Stream an upload to disk in UPLOAD_CHUNK_SIZE pieces, so memory use stays bounded regardless of
+    the file size. Rejects the upload with 413 as soon as it exceeds max_size_mb and removes the partial
+    file on any failure. Returns the number of bytes written and the SHA-256 hex digest (if computed).
+    """
+    max_bytes = max_size_mb * 1024 * 1024
+    sha256 = hashlib.sha256() if compute_sha256 else None
+    total_bytes = 0
+    
+    try:
+        async with aiofiles.open(destination, 'wb') as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                total_bytes += len(chunk)
+                if total_bytes > max_bytes:
+                    logger.error(f"❌ Upload exceeds {max_size_mb}MB limit, aborting")
+                    raise HTTPException(status_code=413, detail=f"File too large. Maximum upload size is {max_size_mb}MB")
+                if sha256:
+                    sha256.update(chunk)
+                await f.write(chunk)
+        
+        if total_bytes == 0:
+            logger.error("❌ Empty file uploaded")
+            raise HTTPException(status_code=400, detail="Empty file uploaded")
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+    
+    return total_bytes, sha256.hexdigest() if sha256 else None
+
 def cleanup_previous_files():
     """Clean up remnant files from previous processing runs"""
     logger.info("🧹 Cleaning up remnant files from previous runs...")
@@ -870,34 +1011,42 @@ def cleanup_previous_files():
     
     return cleaned_count
 
-def cleanup_intermediate_files(video_path: Path, audio_path: Path = None):
+def cleanup_intermediate_files(video_path: Path, audio_path: Path = None, workspace: Optional[JobWorkspace] = None):
     """Clean up intermediate files after video segment extraction is complete"""
     logger.info("🧹 Cleaning up intermediate files after video segment extraction...")
     
     cleaned_count = 0
     
-    # Clean up intermediate JSON files
-    intermediate_files = ["transcriptions.json", "segments.json"]
-    for filename in intermediate_files:
-        file_path = Path(filename)
-        if file_path.exists():
-            try:
-                file_path.unlink()
-                logger.info(f"🗑️  Deleted intermediate file: {filename}")
-                cleaned_count += 1
-            except Exception as e:
-                logger.warning(f"⚠️  Could not delete {filename}: {e}")
-    
-    # Clean up audio chunks in output directory
-    if OUTPUT_DIR.exists():
+    if workspace:
+        # Clean up intermediate JSON files and audio chunks in the job workspace
         try:
-            for file_path in OUTPUT_DIR.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in ['.mp3', '.aac', '.wav']:
+            cleaned_count += workspace.cleanup_intermediate()
+            logger.info(f"🗑️  Deleted intermediate files in {workspace.root}")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not clean workspace {workspace.root}: {e}")
+    else:
+        # Clean up intermediate JSON files
+        intermediate_files = ["transcriptions.json", "segments.json"]
+        for filename in intermediate_files:
+            file_path = Path(filename)
+            if file_path.exists():
+                try:
                     file_path.unlink()
-                    logger.info(f"🗑️  Deleted audio file: {file_path.name}")
+                    logger.info(f"🗑️  Deleted intermediate file: {filename}")
                     cleaned_count += 1
-        except Exception as e:
-            logger.warning(f"⚠️  Could not clean audio files: {e}")
+                except Exception as e:
+                    logger.warning(f"⚠️  Could not delete {filename}: {e}")
+        
+        # Clean up audio chunks in output directory
+        if OUTPUT_DIR.exists():
+            try:
+                for file_path in OUTPUT_DIR.iterdir():
+                    if file_path.is_file() and file_path.suffix.lower() in ['.mp3', '.aac', '.wav']:
+                        file_path.unlink()
+                        logger.info(f"🗑️  Deleted audio file: {file_path.name}")
+                        cleaned_count += 1
+            except Exception as e:
+                logger.warning(f"⚠️  Could not clean audio files: {e}")
     
     # Clean up original video file
     if video_path.exists():
@@ -920,15 +1069,25 @@ def cleanup_intermediate_files(video_path: Path, audio_path: Path = None):
     logger.info(f"✅ Cleaned up {cleaned_count} intermediate files")
     return cleaned_count
 
-def run_video_segment_extraction(video_path: Path) -> List[str]:
+def run_video_segment_extraction(video_path: Path, workspace: Optional[JobWorkspace] = None) -> List[str]:
     """Run video segment extraction and return list of created video segments"""
     import extract_video_segments
     
     logger.info("🎬 Starting video segment extraction...")
     
     try:
-        # Run video segment extraction with the provided video path
-        success = extract_video_segments.create_video_segments(str(video_path))
+        # Run video segment extraction with the provided video path (inside the job workspace if given)
+        if workspace:
+            success = extract_video_segments.create_video_segments(
+                str(video_path),
+                segments_json=str(workspace.segments_json),
+                output_dir=str(workspace.video_segments_dir),
+                interaction_output_dir=str(workspace.interaction_segments_dir)
+            )
+            segments_dir = workspace.video_segments_dir
+        else:
+            success = extract_video_segments.create_video_segments(str(video_path))
+            segments_dir = VIDEO_SEGMENTS_DIR
         
         if not success:
             logger.error("❌ Video segment extraction failed")
@@ -939,13 +1098,13 @@ def run_video_segment_extraction(video_path: Path) -> List[str]:
         interaction_segments = []
         
         # Get regular segments from main video_segments directory
-        if VIDEO_SEGMENTS_DIR.exists():
-            for file_path in VIDEO_SEGMENTS_DIR.iterdir():
+        if segments_dir.exists():
+            for file_path in segments_dir.iterdir():
                 if file_path.is_file() and file_path.suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
                     video_segments.append(str(file_path))
         
         # Get interaction segments from interactions subdirectory
-        interaction_dir = VIDEO_SEGMENTS_DIR / "interactions"
+        interaction_dir = segments_dir / "interactions"
         if interaction_dir.exists():
             for file_path in interaction_dir.iterdir():
                 if file_path.is_file() and file_path.suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
@@ -965,43 +1124,54 @@ def run_video_segment_extraction(video_path: Path) -> List[str]:
         logger.error(f"❌ Error during video segment extraction: {str(e)}")
         return []
 
+def list_job_workspaces() -> List[JobWorkspace]:
+    """Return the workspaces of all jobs on disk, most recent first"""
+    if not JOBS_DIR.exists():
+        return []
+    job_dirs = sorted((d for d in JOBS_DIR.iterdir() if d.is_dir()), key=lambda d: d.stat().st_mtime, reverse=True)
+    return [JobWorkspace(JOBS_DIR, d.name) for d in job_dirs]
+
+def cleanup_job_workspaces() -> int:
+    """Delete the workspaces of finished jobs (queued and running jobs are kept). Returns the number removed"""
+    removed = 0
+    for workspace in list_job_workspaces():
+        job = job_manager.get(workspace.job_id)
+        if job and job["status"] not in TERMINAL_STATUSES:
+            continue
+        # Unknown to the job manager: either left over from before a restart or not submitted yet (upload in progress)
+        if not job and time.time() - workspace.root.stat().st_mtime < UNTRACKED_WORKSPACE_GRACE_SECONDS:
+            continue
+        workspace.cleanup()
+        logger.info(f"🗑️  Deleted job workspace: {workspace.root}")
+        removed += 1
+    return removed
+
+def find_job_file(filename: str, directory: str) -> Optional[Path]:
+    """Find a file in the given workspace directory (e.g. "audio_dir") of any job"""
+    for workspace in list_job_workspaces():
+        file_path = getattr(workspace, directory) / filename
+        if file_path.is_file():
+            return file_path
+    return None
+
 def chunk_audio(audio_path: Path, output_dir: Path, chunk_duration_minutes: int = 10) -> List[str]:
-    """Split audio file into chunks"""
+    """Split audio file into transcription-ready MP3 chunks with ffmpeg's segment muxer (constant memory)"""
+    import audio_processing
+    
     logger.info(f"🎵 Starting audio chunking process for: {audio_path}")
+    logger.info(f"📏 Chunk duration set to: {chunk_duration_minutes} minutes")
     
     try:
-        audio = AudioSegment.from_file(str(audio_path))
-        logger.info(f"✅ Audio file loaded successfully. Duration: {len(audio)/1000/60:.2f} minutes")
-        
-        # Convert minutes to milliseconds
-        chunk_duration_ms = chunk_duration_minutes * 60 * 1000
-        logger.info(f"📏 Chunk duration set to: {chunk_duration_minutes} minutes ({chunk_duration_ms}ms)")
+        chunks = audio_processing.segment_audio(audio_path, output_dir, chunk_duration_minutes * 60, MAX_AUDIO_SIZE_MB)
         
-        chunk_files = []
-        total_duration = len(audio)
-        total_chunks = (total_duration + chunk_duration_ms - 1) // chunk_duration_ms
-        
-        logger.info(f"📊 Total duration: {total_duration/1000/60:.2f} minutes")
-        logger.info(f"🔢 Expected chunks: {total_chunks}")
-        
-        for i, start_time in enumerate(range(0, total_duration, chunk_duration_ms)):
-            end_time = min(start_time + chunk_duration_ms, total_duration)
-            chunk = audio[start_time:end_time]
-            
-            chunk_filename = f"chunk_{i+1:03d}_{audio_path.stem}.mp3"
-            chunk_path = output_dir / chunk_filename
-            
-            logger.info(f"✂️  Creating chunk {i+1}/{total_chunks}: {chunk_filename}")
-            logger.info(f"   ⏱️  Time range: {start_time/1000/60:.2f} - {end_time/1000/60:.2f} minutes")
-            
-            chunk.export(str(chunk_path), format="mp3")
-            
-            # Get chunk file size
-            chunk_size_mb = chunk_path.stat().st_size / (1024 * 1024)
-            logger.info(f"   💾 Chunk size: {chunk_size_mb:.2f}MB")
-            
-            chunk_files.append(str(chunk_path))
+        for chunk in chunks:
+            chunk_start = chunk["start"]
+            chunk_end = chunk["start"] + chunk["duration"]
+            logger.info(f"✂️  Created chunk {chunk['index']}/{len(chunks)}: {chunk['filename']}")
+            logger.info(f"   ⏱️  Time range: {chunk_start/60:.2f} - {chunk_end/60:.2f} minutes")
+            logger.info(f"   💾 Chunk size: {get_file_size_mb(Path(chunk['path'])):.2f}MB")
         
+        chunk_files = [chunk["path"] for chunk in chunks]
         logger.info(f"✅ Audio chunking completed successfully! Created {len(chunk_files)} chunks")
         return chunk_files
         
@@ -1009,17 +1179,69 @@ def chunk_audio(audio_path: Path, output_dir: Path, chunk_duration_minutes: int
         logger.error(f"❌ Error during audio chunking: {str(e)}")
         raise
 
-@app.post("/extract-audio", response_model=AudioExtractionResponse)
-@app.post("/extract-audio/", response_model=AudioExtractionResponse)
+# Background pipeline jobs: bounded worker pool and queue, tracked in memory
+job_manager = JobManager(max_workers=PIPELINE_WORKERS, max_queued=MAX_QUEUED_JOBS)
+
+def submit_pipeline_job(job_type: str, fn, *args, job_id: Optional[str] = None) -> dict:
+    """Queue a pipeline function on the job manager; raises 429 when the queue is full"""
+    def run():
+        return jsonable_encoder(fn(*args))
+    
+    try:
+        job = job_manager.submit(job_type, run, job_id=job_id)
+    except JobQueueFull as e:
+        logger.warning(f"⚠️  Job queue full, rejecting {job_type}: {e}")
+        raise HTTPException(status_code=429, detail=f"Too many jobs in progress, try again later ({e})")
+    logger.info(f"📥 Job {job['job_id']} queued ({job_type})")
+    return job
+
+def ensure_job_capacity():
+    """Reject a request with 429 before doing any work if the job queue is full"""
+    if not job_manager.has_capacity():
+        raise HTTPException(status_code=429, detail="Too many jobs in progress, try again later")
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get the status, stage timings and (once finished) the result of a background job"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Stream a job's progress as Server-Sent Events (history is replayed first) until it finishes"""
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def generate_events():
+        last_seq = 0
+        while True:
+            events = job_manager.events_since(job_id, last_seq)
+            if events is None:
+                # The job was pruned (or the server restarted) while streaming; there is nothing left to wait for
+                yield f"data: {json.dumps({'job_id': job_id, 'status': 'expired', 'message': 'Job is no longer tracked'})}\n\n"
+                return
+            for event in events:
+                last_seq = event["seq"]
+                yield f"id: {event['seq']}\ndata: {json.dumps(event)}\n\n"
+                if event["status"] in ("completed", "failed"):
+                    return
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+    
+    return StreamingResponse(generate_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/extract-audio", response_model=JobResponse, status_code=202)
+@app.post("/extract-audio/", response_model=JobResponse, status_code=202)
 async def extract_audio(
     background_tasks: BackgroundTasks,
-    video_file: UploadFile = File(...)
+    video_file: UploadFile = File(...),
+    combined_analysis: Optional[bool] = Form(None)
 ):
     """
-    Extract audio from uploaded video file and chunk if necessary
+    Save the uploaded video and process it in the background (audio extraction, transcription,
+    video segments, S3 upload). Returns a job id; poll /jobs/{job_id} for the result.
     """
-    import transcribe_segments
-    
     start_time = datetime.now()
     logger.info("=" * 60)
     logger.info("🚀 NEW VIDEO UPLOAD REQUEST RECEIVED")
@@ -1028,8 +1250,12 @@ async def extract_audio(
     logger.info(f"📋 Content type: {video_file.content_type}")
     logger.info(f"🆔 Request ID: {start_time.strftime('%Y%m%d_%H%M%S')}")
     
-    # Clean up remnant files from previous runs
-    cleanup_previous_files()
+    # Don't accept the upload if it can't be queued
+    ensure_job_capacity()
+    
+    # Every request gets its own workspace so concurrent jobs never share files
+    workspace = JobWorkspace(JOBS_DIR).create()
+    logger.info(f"📂 Job workspace: {workspace.root}")
     
     # Validate file upload
     if not video_file:
@@ -1058,22 +1284,38 @@ async def extract_audio(
     logger.info(f"🆔 Generated file ID: {file_id}")
     logger.info(f"📂 Video will be saved as: {video_filename}")
     
+    # Save uploaded video file (streamed to disk in bounded chunks, never held in memory)
+    logger.info("💾 Starting video file upload...")
+    try:
+        video_bytes, file_sha256 = await save_upload_streaming(video_file, video_path)
+    except BaseException:
+        workspace.cleanup()
+        raise
+    
+    # The pipeline blocks (ffmpeg, transcription, S3), so it runs on the job manager's worker pool
+    try:
+        job = submit_pipeline_job("extract-audio", process_uploaded_video, video_path, workspace, file_id, video_bytes, file_sha256, start_time, combined_analysis, job_id=workspace.job_id)
+    except HTTPException:
+        video_path.unlink(missing_ok=True)
+        workspace.cleanup()
+        raise
+    return JobResponse(**job)
+
+def process_uploaded_video(video_path: Path, workspace: JobWorkspace, file_id: str, video_bytes: int, file_sha256: Optional[str], start_time: datetime,
+                           combined_analysis: Optional[bool] = None) -> AudioExtractionResponse:
+    """Extract audio from an uploaded video, chunk if necessary, then transcribe, segment and upload"""
+    import transcribe_segments
+    
     try:
-        # Save uploaded video file
-        logger.info("💾 Starting video file upload...")
-        async with aiofiles.open(video_path, 'wb') as f:
-            content = await video_file.read()
-            if not content:
-                logger.error("❌ Empty file uploaded")
-                raise HTTPException(status_code=400, detail="Empty file uploaded")
-            await f.write(content)
-        
         # Get video file size
-        video_size_mb = video_path.stat().st_size / (1024 * 1024)
+        video_size_mb = video_bytes / (1024 * 1024)
         logger.info(f"✅ Video file saved successfully: {video_size_mb:.2f}MB")
         logger.info(f"📂 Video path: {video_path}")
+        if file_sha256:
+            logger.info(f"🔐 SHA-256: {file_sha256}")
         
         # Extract audio using ffmpeg (stream copy only, no fallback)
+        report_progress("audio_extraction", "Extracting audio...", 10.0)
         logger.info("🎵 Starting audio extraction process...")
         try:
             # First, probe the input file to get the audio codec
@@ -1094,7 +1336,7 @@ async def extract_audio(
             codec_ext = {'aac': 'aac', 'mp3': 'mp3', 'wav': 'wav', 'flac': 'flac', 'opus': 'opus', 'm4a': 'm4a', 'ogg': 'ogg'}
             out_ext = codec_ext.get(audio_codec, 'audio')
             audio_filename = f"{file_id}_audio.{out_ext}"
-            audio_path = OUTPUT_DIR / audio_filename
+            audio_path = workspace.audio_dir / audio_filename
             logger.info(f"📄 Audio will be saved as: {audio_filename}")
             
             # Try stream copy only
@@ -1128,9 +1370,10 @@ async def extract_audio(
         logger.info(f"📊 Audio file size: {audio_size_mb:.2f}MB (max before chunking: {MAX_AUDIO_SIZE_MB}MB)")
         
         if audio_size_mb > MAX_AUDIO_SIZE_MB:
+            report_progress("chunking", "Chunking audio...", 20.0)
             logger.info(f"✂️  Audio file exceeds {MAX_AUDIO_SIZE_MB}MB, starting chunking process...")
             # Create chunks
-            chunk_files = chunk_audio(audio_path, OUTPUT_DIR, CHUNK_DURATION_MINUTES)
+            chunk_files = chunk_audio(audio_path, workspace.audio_dir, CHUNK_DURATION_MINUTES)
             
             # Clean up original large audio file
             logger.info("🗑️  Cleaning up original large audio file...")
@@ -1138,12 +1381,17 @@ async def extract_audio(
             logger.info("✅ Original audio file deleted")
             
             # After chunking, run transcription and topic analysis
+            # Transcription and analysis run as one pipeline, so they share a single stage
+            report_progress("transcription", "Transcribing and analysing audio...", 30.0)
             logger.info("📝 Starting transcription and topic analysis...")
             try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
+                audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                    output_dir=str(workspace.audio_dir),
+                    transcriptions_path=str(workspace.transcriptions_json),
+                    interaction_segments_path=str(workspace.interaction_segments_json),
+                    combined_analysis=combined_analysis
+                )
+                with open(workspace.segments_json, "w") as f:
                     import json
                     json.dump(segment_json, f, indent=2)
                 logger.info("✅ Topic analysis and segment creation completed!")
@@ -1151,9 +1399,10 @@ async def extract_audio(
                 logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
             
             # Run video segment extraction after transcription
+            report_progress("video_segments", "Extracting video segments...", 75.0)
             logger.info("🎬 Starting video segment extraction after transcription...")
             try:
-                all_segments = run_video_segment_extraction(video_path)
+                all_segments = run_video_segment_extraction(video_path, workspace)
                 logger.info("✅ Video segment extraction completed!")
                 
                 # Separate regular segments from interaction segments
@@ -1169,7 +1418,7 @@ async def extract_audio(
                 
                 # Clean up intermediate files after successful video segment extraction
                 if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
+                    cleanup_intermediate_files(video_path, audio_path, workspace)
                 else:
                     logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
                     
@@ -1189,16 +1438,20 @@ async def extract_audio(
             logger.info(f"✂️  Created {len(chunk_files)} chunks")
             logger.info(f"🎬 Created {len(video_segments)} regular video segments")
             logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"📁 Output directory: {OUTPUT_DIR}")
-            logger.info(f"📁 Video segments directory: {VIDEO_SEGMENTS_DIR}")
+            logger.info(f"📁 Output directory: {workspace.audio_dir}")
+            logger.info(f"📁 Video segments directory: {workspace.video_segments_dir}")
             logger.info("=" * 60)
             
             # Upload video segments to S3
             s3_urls = []
             if all_segments:
+                report_progress("s3_upload", "Uploading segments to S3...", 90.0)
                 logger.info("☁️  Starting S3 upload for video segments...")
                 s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
+                logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(s3_urls)} segments uploaded")
+                # Drop the workspace once every clip is safely on S3
+                if all(upload["success"] for upload in s3_urls):
+                    workspace.cleanup()
             
             return AudioExtractionResponse(
                 message=f"Audio extracted and chunked into {len(chunk_files)} parts (original size: {audio_size_mb:.2f}MB)",
@@ -1208,19 +1461,25 @@ async def extract_audio(
                 total_video_segments=len(video_segments),
                 interaction_segments=interaction_segments,
                 total_interaction_segments=len(interaction_segments),
-                segments_json_path="segments.json",
-                s3_urls=s3_urls
+                segments_json_path=str(workspace.segments_json),
+                s3_urls=s3_urls,
+                file_sha256=file_sha256
             )
         else:
             logger.info(f"✅ Audio file is under {MAX_AUDIO_SIZE_MB}MB, no chunking needed")
             
             # After chunking, run transcription and topic analysis
+            # Transcription and analysis run as one pipeline, so they share a single stage
+            report_progress("transcription", "Transcribing and analysing audio...", 30.0)
             logger.info("📝 Starting transcription and topic analysis...")
             try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
+                audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                    output_dir=str(workspace.audio_dir),
+                    transcriptions_path=str(workspace.transcriptions_json),
+                    interaction_segments_path=str(workspace.interaction_segments_json),
+                    combined_analysis=combined_analysis
+                )
+                with open(workspace.segments_json, "w") as f:
                     import json
                     json.dump(segment_json, f, indent=2)
                 logger.info("✅ Topic analysis and segment creation completed!")
@@ -1228,9 +1487,10 @@ async def extract_audio(
                 logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
 
             # Run video segment extraction after transcription
+            report_progress("video_segments", "Extracting video segments...", 75.0)
             logger.info("🎬 Starting video segment extraction after transcription...")
             try:
-                all_segments = run_video_segment_extraction(video_path)
+                all_segments = run_video_segment_extraction(video_path, workspace)
                 logger.info("✅ Video segment extraction completed!")
                 
                 # Separate regular segments from interaction segments
@@ -1246,7 +1506,7 @@ async def extract_audio(
                 
                 # Clean up intermediate files after successful video segment extraction
                 if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
+                    cleanup_intermediate_files(video_path, audio_path, workspace)
                 else:
                     logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
                     
@@ -1265,15 +1525,19 @@ async def extract_audio(
             logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
             logger.info(f"🎬 Created {len(video_segments)} regular video segments")
             logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"📁 Output directory: {OUTPUT_DIR}")
+            logger.info(f"📁 Output directory: {workspace.audio_dir}")
             logger.info("=" * 60)
             
             # Upload video segments to S3
             s3_urls = []
             if all_segments:
+                report_progress("s3_upload", "Uploading segments to S3...", 90.0)
                 logger.info("☁️  Starting S3 upload for video segments...")
                 s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
+                logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(s3_urls)} segments uploaded")
+                # Drop the workspace once every clip is safely on S3
+                if all(upload["success"] for upload in s3_urls):
+                    workspace.cleanup()
             
             return AudioExtractionResponse(
                 message=f"Audio extracted successfully (size: {audio_size_mb:.2f}MB)",
@@ -1282,8 +1546,9 @@ async def extract_audio(
                 total_video_segments=len(video_segments),
                 interaction_segments=interaction_segments,
                 total_interaction_segments=len(interaction_segments),
-                segments_json_path="segments.json",
-                s3_urls=s3_urls
+                segments_json_path=str(workspace.segments_json),
+                s3_urls=s3_urls,
+                file_sha256=file_sha256
             )
     
     except Exception as e:
@@ -1299,26 +1564,25 @@ async def extract_audio(
     
     # Note: Video file cleanup is now handled in cleanup_intermediate_files() after video segment extraction
 
-@app.post("/process-youtube", response_model=YouTubeProcessResponse)
+@app.post("/process-youtube", response_model=JobResponse, status_code=202)
 async def process_youtube_endpoint(request: YouTubeProcessRequest):
     """
-    Process YouTube video URL through the complete pipeline
+    Process YouTube video URL through the complete pipeline in the background.
+    Returns a job id; poll /jobs/{job_id} for the result.
     """
-    try:
-        result = process_youtube_video(request.youtube_url)
-        return YouTubeProcessResponse(**result)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Unexpected error in YouTube processing endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    if not is_valid_youtube_url(request.youtube_url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL provided")
+    
+    job_id = uuid.uuid4().hex
+    job = submit_pipeline_job("process-youtube", lambda: YouTubeProcessResponse(**process_youtube_video(request.youtube_url, job_id, request.combined_analysis)), job_id=job_id)
+    return JobResponse(**job)
 
 @app.get("/download/{filename}")
 async def download_file(filename: str):
     """Download extracted audio file or chunk"""
-    file_path = OUTPUT_DIR / filename
+    file_path = find_job_file(filename, "audio_dir")
     
-    if not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=404, detail="File not found")
     
     return FileResponse(
@@ -1331,21 +1595,24 @@ async def download_file(filename: str):
 async def list_files():
     """List all extracted audio files"""
     files = []
-    for file_path in OUTPUT_DIR.iterdir():
-        if file_path.is_file() and file_path.suffix in ['.mp3', '.wav']:
-            files.append({
-                "filename": file_path.name,
-                "size_mb": get_file_size_mb(file_path),
-                "path": str(file_path)
-            })
+    for workspace in list_job_workspaces():
+        if not workspace.audio_dir.exists():
+            continue
+        for file_path in workspace.audio_dir.iterdir():
+            if file_path.is_file() and file_path.suffix in ['.mp3', '.wav']:
+                files.append({
+                    "filename": file_path.name,
+                    "size_mb": get_file_size_mb(file_path),
+                    "path": str(file_path)
+                })
     return {"files": files}
 
 @app.delete("/files/{filename}")
 async def delete_file(filename: str):
     """Delete a specific audio file"""
-    file_path = OUTPUT_DIR / filename
+    file_path = find_job_file(filename, "audio_dir")
     
-    if not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=404, detail="File not found")
     
     file_path.unlink()
@@ -1354,9 +1621,12 @@ async def delete_file(filename: str):
 @app.delete("/files/")
 async def delete_all_files():
     """Delete all extracted audio files"""
-    for file_path in OUTPUT_DIR.iterdir():
-        if file_path.is_file() and file_path.suffix in ['.mp3', '.wav']:
-            file_path.unlink()
+    for workspace in list_job_workspaces():
+        if not workspace.audio_dir.exists():
+            continue
+        for file_path in workspace.audio_dir.iterdir():
+            if file_path.is_file() and file_path.suffix in ['.mp3', '.wav']:
+                file_path.unlink()
     return {"message": "All audio files deleted successfully"}
 
 @app.get("/video-segments/")
@@ -1364,54 +1634,51 @@ async def list_video_segments():
     """List all video segments with their details"""
     segments = []
     
-    # Check if segments.json exists to get topic information
-    segments_json_path = Path("segments.json")
-    topic_info = {}
-    if segments_json_path.exists():
-        try:
-            import json
-            with open(segments_json_path, 'r') as f:
-                segments_data = json.load(f)
-                for i, segment in enumerate(segments_data, 1):
-                    topic_info[f"{i:02d}"] = {
-                        "title": segment.get('title', f'Unknown_Topic_{i}'),
-                        "start_time": segment.get('start_time', 0),
-                        "end_time": segment.get('end_time', 0)
-                    }
-        except Exception as e:
-            logger.error(f"Error reading segments.json: {e}")
-    
-    # List video segments
-    for file_path in VIDEO_SEGMENTS_DIR.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
-            # Extract segment number from filename (e.g., "01_Topic_Name.mp4" -> "01")
-            filename = file_path.name
-            segment_number = filename.split('_')[0] if '_' in filename else "unknown"
-            
-            # Get topic info
-            topic_data = topic_info.get(segment_number, {})
-            title = topic_data.get('title', filename.replace(file_path.suffix, ''))
-            start_time = topic_data.get('start_time', 0)
-            end_time = topic_data.get('end_time', 0)
-            duration = end_time - start_time
-            
-            segments.append(VideoSegmentResponse(
-                filename=filename,
-                title=title,
-                start_time=start_time,
-                end_time=end_time,
-                duration=duration,
-                size_mb=get_file_size_mb(file_path)
-            ))
+    for workspace in list_job_workspaces():
+        if not workspace.video_segments_dir.exists():
+            continue
+        
+        # Check if the job's segments.json exists to get topic information
+        topic_info = {}
+        segments_data = workspace.read_json(workspace.segments_json, [])
+        for i, segment in enumerate(segments_data, 1):
+            topic_info[f"{i:02d}"] = {
+                "title": segment.get('title', f'Unknown_Topic_{i}'),
+                "start_time": segment.get('start_time', 0),
+                "end_time": segment.get('end_time', 0)
+            }
+        
+        # List video segments
+        for file_path in workspace.video_segments_dir.iterdir():
+            if file_path.is_file() and file_path.suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
+                # Extract segment number from filename (e.g., "01_Topic_Name.mp4" -> "01")
+                filename = file_path.name
+                segment_number = filename.split('_')[0] if '_' in filename else "unknown"
+                
+                # Get topic info
+                topic_data = topic_info.get(segment_number, {})
+                title = topic_data.get('title', filename.replace(file_path.suffix, ''))
+                start_time = topic_data.get('start_time', 0)
+                end_time = topic_data.get('end_time', 0)
+                duration = end_time - start_time
+                
+                segments.append(VideoSegmentResponse(
+                    filename=filename,
+                    title=title,
+                    start_time=start_time,
+                    end_time=end_time,
+                    duration=duration,
+                    size_mb=get_file_size_mb(file_path)
+                ))
     
     return {"video_segments": segments, "total_segments": len(segments)}
 
 @app.get("/download-video/{filename}")
 async def download_video_segment(filename: str):
     """Download a video segment"""
-    file_path = VIDEO_SEGMENTS_DIR / filename
+    file_path = find_job_file(filename, "video_segments_dir")
     
-    if not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=404, detail="Video segment not found")
     
     return FileResponse(
@@ -1422,12 +1689,14 @@ async def download_video_segment(filename: str):
 
 @app.post("/cleanup")
 async def cleanup_files():
-    """Manually trigger cleanup of remnant files"""
+    """Manually trigger cleanup of remnant files and the workspaces of finished jobs"""
     try:
         cleaned_count = cleanup_previous_files()
+        workspaces_removed = cleanup_job_workspaces()
         return {
             "message": f"Cleanup completed successfully",
             "files_cleaned": cleaned_count,
+            "workspaces_removed": workspaces_removed,
             "status": "success"
         }
     except Exception as e:
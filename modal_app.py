@@ -6,14 +6,16 @@ import tempfile
 import uuid
 import shutil
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse, unquote
 import aiofiles
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Header
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from pydub import AudioSegment
 import subprocess
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 import yt_dlp
 import re
@@ -21,9 +23,11 @@ from dotenv import load_dotenv
 from datetime import datetime
 import time
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import hashlib
 import asyncio
 import json
+from job_workspace import JobWorkspace
 
 # Load environment variables
 load_dotenv()
@@ -41,8 +45,16 @@ logger = logging.getLogger(__name__)
 # Create Modal app
 app = modal.App("script-trimmer")
 
-# Modal Queue for real-time progress updates
-progress_queue = modal.Queue.from_name("script-trimmer-progress-queue", create_if_missing=True)
+# Per-job progress channels for real-time progress updates. Each update is stored under its own key,
+# f"{job_id}:{seq}", and its seq is claimed with put(skip_if_exists=True), so any container can
+# publish without a read-modify-write. f"{key}:head" holds the latest seq and f"{key}:start" the first seq
+# of the current run. Every subscriber reads the channel independently, so concurrent viewers never steal
+# each other's updates
+progress_state = modal.Dict.from_name("script-trimmer-progress-state", create_if_missing=True)
+PROGRESS_HISTORY_SIZE = 50  # Updates kept per job for replay to late subscribers
+PROGRESS_POLL_INTERVAL = 0.5  # Seconds between channel reads in the progress stream
+PROGRESS_HEARTBEAT_SECONDS = 10
+TERMINAL_PROGRESS_STATUSES = ("completed", "failed")
 
 # Define the image with all dependencies
 image = modal.Image.debian_slim(python_version="3.11").pip_install_from_requirements(
@@ -52,7 +64,7 @@ image = modal.Image.debian_slim(python_version="3.11").pip_install_from_requirem
     "git",     # For yt-dlp
     "curl",    # For downloads
     "wget"     # Alternative downloader
-).add_local_file("transcribe_segments.py", "/root/transcribe_segments.py").add_local_file("extract_video_segments.py", "/root/extract_video_segments.py")
+).add_local_file("transcribe_segments.py", "/root/transcribe_segments.py").add_local_file("extract_video_segments.py", "/root/extract_video_segments.py").add_local_file("audio_processing.py", "/root/audio_processing.py").add_local_file("job_workspace.py", "/root/job_workspace.py")
 
 # Create a volume for persistent storage
 volume = modal.Volume.from_name("script-trimmer-storage", create_if_missing=True)
@@ -65,11 +77,18 @@ youtube_cookies_secret = modal.Secret.from_name("youtube-cookies")
 
 # Configuration
 UPLOAD_DIR = Path("/data/uploads")
-OUTPUT_DIR = Path("/data/output")
-VIDEO_SEGMENTS_DIR = Path("/data/video_segments")
+JOBS_DIR = Path("/data/jobs")  # One JobWorkspace per processing run
 MAX_AUDIO_SIZE_MB = 25
 CHUNK_DURATION_MINUTES = 10
 MAX_FILE_SIZE_GB = 10  # Maximum file size supported (10GB)
+VIDEO_EXTRACTION_WORKERS = 4  # Parallel ffmpeg clip extractions (matches the 4 CPUs of the processing function)
+# Fan audio chunks out to transcribe_chunk_remote containers instead of transcribing on the processing container
+DISTRIBUTED_TRANSCRIPTION = os.getenv("DISTRIBUTED_TRANSCRIPTION", "true").lower() == "true"
+# Extract audio from S3 videos through a presigned URL while the full video downloads in parallel
+STREAM_AUDIO_FROM_S3 = os.getenv("STREAM_AUDIO_FROM_S3", "true").lower() == "true"
+PRESIGNED_GET_EXPIRY = 14400  # Seconds; covers the longest processing run
+PRESIGNED_PART_EXPIRY = 3600  # Seconds; the browser presigns parts in batches as it goes
+MAX_PRESIGN_BATCH = 100  # Part URLs handed out per presign call
 
 # Storage optimizations for large files:
 # - Default Modal volume size (handles large files)
@@ -83,8 +102,27 @@ S3_REGION = os.getenv("S3_REGION", "ap-south-1")
 S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
 S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
 
+# Concurrent S3 uploads
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "8"))  # Clips uploaded in parallel
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,  # Clips above 16MB are sent as parallel multipart uploads
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=4,  # Transfer threads per file
+    use_threads=True
+)
+
+# Parallel ranged S3 download
+S3_DOWNLOAD_CONCURRENCY = int(os.getenv("S3_DOWNLOAD_CONCURRENCY", "16"))  # Ranged GETs in flight
+S3_DOWNLOAD_PART_SIZE = int(os.getenv("S3_DOWNLOAD_PART_SIZE_MB", "64")) * 1024 * 1024
+S3_DOWNLOAD_RETRIES = 3
+S3_DOWNLOAD_PROGRESS_STEP = 0.05  # Report download progress every 5%
+
 # Multipart upload configuration
-MULTIPART_CHUNK_SIZE = 50 * 1024 * 1024  # 50MB chunks for multipart upload
+MULTIPART_CHUNK_SIZE = 50 * 1024 * 1024  # Preferred part size for multipart upload
+MULTIPART_MIN_PART_SIZE = 8 * 1024 * 1024  # Smallest part used when shrinking parts for smaller files (S3 minimum is 5MB)
+MULTIPART_MAX_PARTS = 10000  # S3 limit on parts per upload
+MULTIPART_CONCURRENCY = int(os.getenv("MULTIPART_CONCURRENCY", "8"))  # Parts in flight (bounds memory to this many parts)
+MULTIPART_PART_RETRIES = 3
 
 # Pydantic models
 class AudioExtractionResponse(BaseModel):
@@ -110,10 +148,22 @@ class PresignedUrlResponse(BaseModel):
     s3_key: str
     expires_in: int
 
+class MultipartUploadRequest(BaseModel):
+    action: str  # "create", "presign", "list", "complete" or "abort"
+    filename: Optional[str] = None  # create
+    content_type: str = "video/mp4"  # create
+    file_size: Optional[int] = None  # create
+    s3_key: Optional[str] = None  # every action except create
+    upload_id: Optional[str] = None  # every action except create
+    part_numbers: Optional[List[int]] = None  # presign
+    parts: Optional[List[dict]] = None  # complete: [{"PartNumber": 1, "ETag": "..."}]
+
 class S3UploadRequest(BaseModel):
     s3_url: str
     video_type: str = "live"  # Default to live session for backward compatibility
     cookies_content: Optional[str] = None  # Optional cookies for YouTube URLs
+    combined_analysis: Optional[bool] = None  # Live sessions: one analysis call per chunk (None uses the server default)
+    resume_job_id: Optional[str] = None  # Resume a failed run from its checkpoint instead of starting over
 
 
 
@@ -144,31 +194,36 @@ def validate_file_size(file_size_mb: float) -> bool:
         return False
     return True
 
+# Shared S3 client: boto3 clients are thread-safe, so one connection-pooled client serves every upload
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
 def get_s3_client():
-    """Get S3 client with credentials from environment variables"""
-    print(f"🔍 DEBUG: S3_ACCESS_KEY present: {S3_ACCESS_KEY is not None}")
-    print(f"🔍 DEBUG: S3_SECRET_KEY present: {S3_SECRET_KEY is not None}")
-    print(f"🔍 DEBUG: S3_BUCKET_NAME: {S3_BUCKET_NAME}")
-    print(f"🔍 DEBUG: S3_REGION: {S3_REGION}")
-    
+    """Return the process-wide S3 client, creating it on first use (None without credentials)"""
+    global _s3_client
     if not S3_ACCESS_KEY or not S3_SECRET_KEY:
         logger.warning("⚠️  S3 credentials not found in environment variables")
-        print("⚠️  S3 credentials not found in environment variables")
         return None
     
-    try:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=S3_ACCESS_KEY,
-            aws_secret_access_key=S3_SECRET_KEY,
-            region_name=S3_REGION
-        )
-        print("✅ S3 client created successfully")
-        return s3_client
-    except Exception as e:
-        logger.error(f"❌ Failed to create S3 client: {e}")
-        print(f"❌ Failed to create S3 client: {e}")
-        return None
+    with _s3_client_lock:
+        if _s3_client is None:
+            try:
+                _s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=S3_ACCESS_KEY,
+                    aws_secret_access_key=S3_SECRET_KEY,
+                    region_name=S3_REGION,
+                    # Enough pooled connections for the widest concurrent transfer (clip uploads, ranged downloads, multipart parts)
+                    config=BotoConfig(
+                        max_pool_connections=max(S3_UPLOAD_CONCURRENCY * S3_TRANSFER_CONFIG.max_concurrency, S3_DOWNLOAD_CONCURRENCY, MULTIPART_CONCURRENCY),
+                        retries={"max_attempts": 5, "mode": "standard"}
+                    )
+                )
+                logger.info(f"✅ S3 client created (bucket: {S3_BUCKET_NAME}, region: {S3_REGION})")
+            except Exception as e:
+                logger.error(f"❌ Failed to create S3 client: {e}")
+                return None
+        return _s3_client
 
 def upload_file_to_s3(file_path: Path, s3_key: str) -> Optional[str]:
     """Upload a file to S3 and return the URL"""
@@ -183,7 +238,8 @@ def upload_file_to_s3(file_path: Path, s3_key: str) -> Optional[str]:
             str(file_path),
             S3_BUCKET_NAME,
             s3_key,
-            ExtraArgs={'ContentType': 'video/mp4'}
+            ExtraArgs={'ContentType': 'video/mp4'},
+            Config=S3_TRANSFER_CONFIG
         )
         
         # Generate the S3 URL
@@ -198,13 +254,108 @@ def upload_file_to_s3(file_path: Path, s3_key: str) -> Optional[str]:
         logger.error(f"❌ Unexpected error during S3 upload: {e}")
         return None
 
-def upload_file_to_s3_multipart(file_path: Path, s3_key: str) -> Optional[str]:
-    """Upload a file to S3 using multipart upload and return the URL"""
+def multipart_part_size(file_size: int) -> int:
+    """
+    Part size for a multipart upload: MULTIPART_CHUNK_SIZE, shrunk so smaller files still spread over
+    every upload thread and grown so very large files stay under S3's part limit (rounded up to 1MB)
+    """
+    part_size = min(MULTIPART_CHUNK_SIZE, max(MULTIPART_MIN_PART_SIZE, file_size // MULTIPART_CONCURRENCY))
+    part_size = max(part_size, -(-file_size // MULTIPART_MAX_PARTS))
+    mb = 1024 * 1024
+    return -(-part_size // mb) * mb
+
+def file_fingerprint(file_path: Path, sample_size: int = 1024 * 1024) -> str:
+    """
+    Short content fingerprint of a file (its size plus the first and last sample_size bytes), cheap enough
+    for multi-GB videos and stable across containers, so a retried upload of the same file gets the same key
+    """
+    file_size = file_path.stat().st_size
+    digest = hashlib.sha256(str(file_size).encode())
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(sample_size))
+        if file_size > sample_size:
+            f.seek(max(sample_size, file_size - sample_size))
+            digest.update(f.read(sample_size))
+    return digest.hexdigest()[:16]
+
+def find_resumable_upload(s3_client, s3_key: str, part_size: int, upload_id: Optional[str] = None) -> tuple:
+    """
+    Look for an unfinished multipart upload of s3_key (or the given upload_id) and return (upload_id,
+    {part_number: etag}) for the parts that were uploaded with the same part size, or (None, {}) if there
+    is nothing to resume
+    """
+    if not upload_id:
+        uploads = s3_client.list_multipart_uploads(Bucket=S3_BUCKET_NAME, Prefix=s3_key).get('Uploads', [])
+        uploads = sorted((upload for upload in uploads if upload['Key'] == s3_key), key=lambda upload: upload['Initiated'])
+        if not uploads:
+            return None, {}
+        upload_id = uploads[-1]['UploadId']
+    
+    completed = {}
+    paginator = s3_client.get_paginator('list_parts')
+    try:
+        for page in paginator.paginate(Bucket=S3_BUCKET_NAME, Key=s3_key, UploadId=upload_id):
+            for part in page.get('Parts', []):
+                completed[part['PartNumber']] = part
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+            raise
+        logger.warning(f"⚠️  Multipart upload {upload_id} no longer exists, starting a new one")
+        return None, {}
+    
+    # Parts are only reusable if they were cut at the same offsets; the last part may be shorter
+    last_part = max(completed, default=0)
+    if any(part['Size'] != part_size for number, part in completed.items() if number != last_part):
+        logger.info(f"♻️  Found multipart upload {upload_id} with a different part size, starting a new one")
+        return None, {}
+    return upload_id, {number: part['ETag'] for number, part in completed.items()}
+
+def _upload_part(s3_client, file_path: Path, s3_key: str, upload_id: str, part_number: int, offset: int, size: int,
+                 etag: Optional[str] = None) -> dict:
+    """
+    Read one part from disk and upload it, retrying with backoff. A part S3 already has (etag) is kept
+    only if it is the MD5 of the local bytes at that offset, otherwise it is uploaded again.
+    """
+    for attempt in range(MULTIPART_PART_RETRIES):
+        try:
+            # Each worker reads only its own part, so memory stays at MULTIPART_CONCURRENCY parts
+            with open(file_path, 'rb') as file:
+                file.seek(offset)
+                body = file.read(size)
+            # Under SSE-KMS the ETag is not the MD5, so such parts never match and are simply re-uploaded
+            if etag and hashlib.md5(body).hexdigest() == etag.strip('"'):
+                return {'ETag': etag, 'PartNumber': part_number}
+            etag = None
+            response = s3_client.upload_part(
+                Bucket=S3_BUCKET_NAME,
+                Key=s3_key,
+                PartNumber=part_number,
+                UploadId=upload_id,
+                Body=body
+            )
+            return {'ETag': response['ETag'], 'PartNumber': part_number}
+        except Exception as e:
+            if attempt == MULTIPART_PART_RETRIES - 1:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"⚠️  Part {part_number} failed ({e}), retrying in {delay}s...")
+            time.sleep(delay)
+
+def upload_file_to_s3_multipart(file_path: Path, s3_key: str, upload_id: Optional[str] = None) -> Optional[str]:
+    """
+    Upload a file to S3 using a parallel multipart upload and return the URL. Up to MULTIPART_CONCURRENCY
+    parts are in flight and each part is retried on its own. An unfinished upload of the same key (or the
+    given upload_id) is resumed: parts S3 already has are skipped once their MD5 matches the local file.
+    If a part keeps failing the upload is left open so the next call can resume it; only an upload that
+    cannot be completed is aborted (an S3 lifecycle rule should expire the abandoned ones).
+    """
     s3_client = get_s3_client()
     if not s3_client:
         logger.error("❌ S3 client not available")
         return None
     
+    # upload_id is the one to resume; active_upload_id is the upload this call is writing to
+    active_upload_id = None
     try:
         file_size = file_path.stat().st_size
         logger.info(f"📤 Starting multipart upload for {file_path.name} ({file_size / (1024*1024):.2f}MB)")
@@ -214,53 +365,53 @@ def upload_file_to_s3_multipart(file_path: Path, s3_key: str) -> Optional[str]:
             logger.info(f"📁 File size ({file_size / (1024*1024):.2f}MB) is small, using regular upload")
             return upload_file_to_s3(file_path, s3_key)
         
-        # Create multipart upload
-        response = s3_client.create_multipart_upload(
-            Bucket=S3_BUCKET_NAME,
-            Key=s3_key,
-            ContentType='video/mp4'
-        )
-        upload_id = response['UploadId']
-        logger.info(f"🔄 Created multipart upload with ID: {upload_id}")
+        part_size = multipart_part_size(file_size)
+        num_parts = (file_size + part_size - 1) // part_size
         
-        # Calculate number of parts
-        num_parts = (file_size + MULTIPART_CHUNK_SIZE - 1) // MULTIPART_CHUNK_SIZE
-        logger.info(f"📊 Total parts: {num_parts}")
+        active_upload_id, completed = find_resumable_upload(s3_client, s3_key, part_size, upload_id)
+        if active_upload_id:
+            logger.info(f"🔄 Resuming multipart upload {active_upload_id}: {len(completed)}/{num_parts} parts already uploaded")
+        else:
+            response = s3_client.create_multipart_upload(
+                Bucket=S3_BUCKET_NAME,
+                Key=s3_key,
+                ContentType='video/mp4'
+            )
+            active_upload_id = response['UploadId']
+            logger.info(f"🔄 Created multipart upload with ID: {active_upload_id}")
+        logger.info(f"📊 Total parts: {num_parts} of {part_size / (1024*1024):.0f}MB, {MULTIPART_CONCURRENCY} in flight")
         
         parts = []
-        
-        with open(file_path, 'rb') as file:
-            for part_num in range(1, num_parts + 1):
-                # Read chunk
-                chunk = file.read(MULTIPART_CHUNK_SIZE)
-                if not chunk:
-                    break
-                
-                logger.info(f"📤 Uploading part {part_num}/{num_parts} ({len(chunk) / (1024*1024):.2f}MB)")
-                
-                # Upload part
-                response = s3_client.upload_part(
-                    Bucket=S3_BUCKET_NAME,
-                    Key=s3_key,
-                    PartNumber=part_num,
-                    UploadId=upload_id,
-                    Body=chunk
+        executor = ThreadPoolExecutor(max_workers=MULTIPART_CONCURRENCY, thread_name_prefix="s3-part")
+        try:
+            futures = [
+                executor.submit(
+                    _upload_part, s3_client, file_path, s3_key, active_upload_id, number,
+                    (number - 1) * part_size, min(part_size, file_size - (number - 1) * part_size),
+                    completed.get(number)
                 )
-                
-                parts.append({
-                    'ETag': response['ETag'],
-                    'PartNumber': part_num
-                })
-                
-                logger.info(f"✅ Part {part_num} uploaded successfully")
+                for number in range(1, num_parts + 1)
+            ]
+            for index, future in enumerate(futures, 1):
+                parts.append(future.result())
+                if index % 10 == 0 or index == len(futures):
+                    logger.info(f"✅ {index}/{len(futures)} parts uploaded")
+        except Exception as e:
+            # Parts already uploaded stay on S3 so a retry with the same key resumes from them
+            logger.error(f"❌ S3 multipart upload of {file_path.name} interrupted: {e}")
+            logger.info(f"🔄 Multipart upload {active_upload_id} left open for resume")
+            return None
+        finally:
+            # Stop queued parts straight away if one of them failed
+            executor.shutdown(wait=True, cancel_futures=True)
         
         # Complete multipart upload
         logger.info("🔗 Completing multipart upload...")
         s3_client.complete_multipart_upload(
             Bucket=S3_BUCKET_NAME,
             Key=s3_key,
-            UploadId=upload_id,
-            MultipartUpload={'Parts': parts}
+            UploadId=active_upload_id,
+            MultipartUpload={'Parts': sorted(parts, key=lambda part: part['PartNumber'])}
         )
         
         # Generate the S3 URL
@@ -268,31 +419,26 @@ def upload_file_to_s3_multipart(file_path: Path, s3_key: str) -> Optional[str]:
         logger.info(f"✅ Successfully uploaded to S3 via multipart: {s3_url}")
         return s3_url
         
-    except ClientError as e:
+    except Exception as e:
         logger.error(f"❌ S3 multipart upload failed for {file_path.name}: {e}")
-        # Try to abort multipart upload if it was created
-        if 'upload_id' in locals():
+        # The upload cannot be completed, so abort it rather than leave its parts behind (and billed)
+        if active_upload_id:
             try:
                 s3_client.abort_multipart_upload(
                     Bucket=S3_BUCKET_NAME,
                     Key=s3_key,
-                    UploadId=upload_id
+                    UploadId=active_upload_id
                 )
                 logger.info("🔄 Aborted multipart upload due to error")
             except Exception as abort_error:
                 logger.error(f"❌ Failed to abort multipart upload: {abort_error}")
         return None
-    except Exception as e:
-        logger.error(f"❌ Unexpected error during S3 multipart upload: {e}")
-        return None
 
 def upload_video_to_s3_multipart(video_path: Path, original_filename: str) -> Optional[dict]:
     """Upload video file to S3 using multipart upload and return upload info"""
     try:
-        # Create S3 key with timestamp to avoid conflicts
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_id = str(uuid.uuid4())
-        s3_key = f"videos/{timestamp}_{file_id}_{original_filename}"
+        # Key derived from the file itself, so an interrupted upload of the same video is resumed, not restarted
+        s3_key = f"videos/{file_fingerprint(video_path)}_{original_filename}"
         
         logger.info(f"🚀 Starting S3 multipart upload for video: {original_filename}")
         
@@ -315,49 +461,72 @@ def upload_video_to_s3_multipart(video_path: Path, original_filename: str) -> Op
         logger.error(f"❌ Error uploading video to S3: {e}")
         return None
 
-def upload_video_segments_to_s3(video_segments: List[str]) -> List[dict]:
-    """Upload all video segments to S3 and return their URLs"""
+def upload_video_segment_to_s3(segment_path: str) -> dict:
+    """Upload one video segment to S3 and return its upload info, with success/error telling whether it made it"""
+    segment_file = Path(segment_path)
+    
+    # Create S3 key with timestamp to avoid conflicts
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # Determine if this is an interaction segment based on path
+    if "interactions" in str(segment_file):
+        s3_key = f"video-segments/interactions/{timestamp}_{segment_file.name}"
+        segment_type = "interaction"
+    else:
+        s3_key = f"video-segments/topics/{timestamp}_{segment_file.name}"
+        segment_type = "topic"
+    
+    upload = {
+        "filename": segment_file.name,
+        "s3_url": None,
+        "s3_key": s3_key,
+        "size_mb": None,
+        "segment_type": segment_type,
+        "success": False,
+        "error": None
+    }
+    if not segment_file.exists():
+        logger.warning(f"⚠️  Video segment not found: {segment_path}")
+        upload["error"] = "Segment file not found"
+        return upload
+    
+    upload["size_mb"] = get_file_size_mb(segment_file)
+    s3_url = upload_file_to_s3(segment_file, s3_key)
+    if not s3_url:
+        logger.error(f"❌ Failed to upload {segment_file.name} to S3")
+        upload["error"] = "S3 upload failed"
+        return upload
+    
+    logger.info(f"✅ Uploaded {segment_type} segment: {segment_file.name}")
+    upload.update(s3_url=s3_url, success=True)
+    return upload
+
+def upload_video_segments_to_s3(video_segments: List[str], max_workers: int = S3_UPLOAD_CONCURRENCY) -> List[dict]:
+    """
+    Upload video segments to S3 concurrently and return one upload info per segment, in segment order.
+    Failed uploads are included with success=False and an error, so callers decide what to do with them.
+    """
     s3_urls = []
     
     if not video_segments:
         logger.warning("⚠️  No video segments to upload")
         return s3_urls
     
-    logger.info(f"🚀 Starting S3 upload for {len(video_segments)} video segments...")
+    workers = max(1, min(max_workers, len(video_segments)))
+    logger.info(f"🚀 Starting S3 upload for {len(video_segments)} video segments ({workers} in parallel)...")
     
-    for segment_path in video_segments:
-        segment_file = Path(segment_path)
-        if not segment_file.exists():
-            logger.warning(f"⚠️  Video segment not found: {segment_path}")
-            continue
-        
-        # Create S3 key with timestamp to avoid conflicts
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Determine if this is an interaction segment based on path
-        if "interactions" in str(segment_file):
-            s3_key = f"video-segments/interactions/{timestamp}_{segment_file.name}"
-            segment_type = "interaction"
-        else:
-            s3_key = f"video-segments/topics/{timestamp}_{segment_file.name}"
-            segment_type = "topic"
-        
-        s3_url = upload_file_to_s3(segment_file, s3_key)
-        if s3_url:
-            s3_urls.append({
-                "filename": segment_file.name,
-                "s3_url": s3_url,
-                "s3_key": s3_key,
-                "size_mb": get_file_size_mb(segment_file),
-                "segment_type": segment_type
-            })
-            logger.info(f"✅ Uploaded {segment_type} segment: {segment_file.name}")
-        else:
-            logger.error(f"❌ Failed to upload {segment_file.name} to S3")
+    # executor.map keeps the outcomes in segment order
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-upload") as executor:
+        outcomes = list(executor.map(upload_video_segment_to_s3, video_segments))
+    s3_urls = list(outcomes)
     
-    logger.info(f"✅ S3 upload completed: {len(s3_urls)}/{len(video_segments)} segments uploaded")
+    logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(video_segments)} segments uploaded")
     return s3_urls
 
+def count_uploaded(s3_urls: List[dict]) -> int:
+    """Number of segments in an upload_video_segments_to_s3 result that made it to S3"""
+    return sum(1 for upload in s3_urls if upload["success"])
+
 def is_valid_youtube_url(url: str) -> bool:
     """Check if the URL is a valid YouTube URL"""
     youtube_patterns = [
@@ -591,42 +760,25 @@ def download_youtube_video(youtube_url: str, output_dir: Path) -> Optional[Path]
         return None
 
 def chunk_audio(audio_path: Path, output_dir: Path, chunk_duration_minutes: int = 10) -> List[str]:
-    """Split audio file into chunks"""
+    """Split audio file into transcription-ready MP3 chunks with ffmpeg's segment muxer (constant memory)"""
+    import sys
+    sys.path.append("/root")
+    import audio_processing
+    
     logger.info(f"🎵 Starting audio chunking process for: {audio_path}")
+    logger.info(f"📏 Chunk duration set to: {chunk_duration_minutes} minutes")
     
     try:
-        audio = AudioSegment.from_file(str(audio_path))
-        logger.info(f"✅ Audio file loaded successfully. Duration: {len(audio)/1000/60:.2f} minutes")
-        
-        # Convert minutes to milliseconds
-        chunk_duration_ms = chunk_duration_minutes * 60 * 1000
-        logger.info(f"📏 Chunk duration set to: {chunk_duration_minutes} minutes ({chunk_duration_ms}ms)")
-        
-        chunk_files = []
-        total_duration = len(audio)
-        total_chunks = (total_duration + chunk_duration_ms - 1) // chunk_duration_ms
+        chunks = audio_processing.segment_audio(audio_path, output_dir, chunk_duration_minutes * 60, MAX_AUDIO_SIZE_MB)
         
-        logger.info(f"📊 Total duration: {total_duration/1000/60:.2f} minutes")
-        logger.info(f"🔢 Expected chunks: {total_chunks}")
-        
-        for i, start_time in enumerate(range(0, total_duration, chunk_duration_ms)):
-            end_time = min(start_time + chunk_duration_ms, total_duration)
-            chunk = audio[start_time:end_time]
-            
-            chunk_filename = f"chunk_{i+1:03d}_{audio_path.stem}.mp3"
-            chunk_path = output_dir / chunk_filename
-            
-            logger.info(f"✂️  Creating chunk {i+1}/{total_chunks}: {chunk_filename}")
-            logger.info(f"   ⏱️  Time range: {start_time/1000/60:.2f} - {end_time/1000/60:.2f} minutes")
-            
-            chunk.export(str(chunk_path), format="mp3")
-            
-            # Get chunk file size
-            chunk_size_mb = chunk_path.stat().st_size / (1024 * 1024)
-            logger.info(f"   💾 Chunk size: {chunk_size_mb:.2f}MB")
-            
-            chunk_files.append(str(chunk_path))
+        for chunk in chunks:
+            chunk_start = chunk["start"]
+            chunk_end = chunk["start"] + chunk["duration"]
+            logger.info(f"✂️  Created chunk {chunk['index']}/{len(chunks)}: {chunk['filename']}")
+            logger.info(f"   ⏱️  Time range: {chunk_start/60:.2f} - {chunk_end/60:.2f} minutes")
+            logger.info(f"   💾 Chunk size: {get_file_size_mb(Path(chunk['path'])):.2f}MB")
         
+        chunk_files = [chunk["path"] for chunk in chunks]
         logger.info(f"✅ Audio chunking completed successfully! Created {len(chunk_files)} chunks")
         return chunk_files
         
@@ -634,76 +786,112 @@ def chunk_audio(audio_path: Path, output_dir: Path, chunk_duration_minutes: int
         logger.error(f"❌ Error during audio chunking: {str(e)}")
         raise
 
-def cleanup_previous_files():
-    """Clean up remnant files from previous processing runs"""
-    logger.info("🧹 Cleaning up remnant files from previous runs...")
+def extract_audio_chunks(video_path, output_dir: Path, source: str) -> List[str]:
+    """Extract speech-optimized audio chunks from a video (local path or http(s) URL) in a single ffmpeg pass"""
+    import sys
+    sys.path.append("/root")
+    import audio_processing
     
-    files_to_clean = [
-        "transcriptions.json",
-        "segments.json", 
-        "processing_status.json"
-    ]
+    file_id = str(uuid.uuid4())
+    stem = f"{file_id}_{source}_audio"
+    logger.info(f"⚡ Extracting {audio_processing.TRANSCRIPTION_SAMPLE_RATE // 1000} kHz mono audio chunks using FFmpeg (single pass)...")
     
-    cleaned_count = 0
-    for filename in files_to_clean:
-        file_path = Path(filename)
-        if file_path.exists():
-            try:
-                file_path.unlink()
-                logger.info(f"🗑️  Deleted remnant file: {filename}")
-                cleaned_count += 1
-            except Exception as e:
-                logger.warning(f"⚠️  Could not delete {filename}: {e}")
+    chunks = audio_processing.extract_audio_chunks(video_path, output_dir, stem, CHUNK_DURATION_MINUTES * 60, MAX_AUDIO_SIZE_MB)
+    chunk_files = [chunk["path"] for chunk in chunks]
     
-    # Clean up empty directories
-    directories_to_clean = [OUTPUT_DIR, VIDEO_SEGMENTS_DIR]
-    for directory in directories_to_clean:
-        if directory.exists():
-            try:
-                # Remove all files in directories
-                for file_path in directory.iterdir():
-                    if file_path.is_file():
-                        file_path.unlink()
-                        logger.info(f"🗑️  Deleted remnant file: {file_path}")
-                        cleaned_count += 1
-            except Exception as e:
-                logger.warning(f"⚠️  Could not clean directory {directory}: {e}")
+    total_size_mb = sum(get_file_size_mb(Path(chunk_file)) for chunk_file in chunk_files)
+    logger.info(f"✅ Audio extraction completed successfully: {len(chunk_files)} chunks, {total_size_mb:.2f}MB total")
+    return chunk_files
+
+def generate_presigned_get_url(s3_url: str, expires_in: int = PRESIGNED_GET_EXPIRY) -> Optional[str]:
+    """Return a presigned GET URL for an S3 object URL (None if it cannot be signed)"""
+    s3_client = get_s3_client()
+    if not s3_client:
+        return None
+    try:
+        bucket_name, s3_key = parse_s3_url(s3_url)
+        return s3_client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket_name, 'Key': s3_key},
+            ExpiresIn=expires_in
+        )
+    except Exception as e:
+        logger.error(f"❌ Error generating presigned GET URL: {e}")
+        return None
+
+def extract_audio_chunks_from_s3(s3_url: str, video_future: Future, output_dir: Path) -> List[str]:
+    """
+    Extract audio chunks by pointing ffmpeg at a presigned GET URL, so it range-reads just the audio
+    while video_future downloads the full file. Falls back to the downloaded file if streaming fails.
+    """
+    presigned_url = generate_presigned_get_url(s3_url)
+    if presigned_url:
+        try:
+            logger.info("🌊 Extracting audio straight from S3 while the video downloads...")
+            return extract_audio_chunks(presigned_url, output_dir, "s3")
+        except Exception as e:
+            logger.warning(f"⚠️  Streaming audio extraction failed ({e}), waiting for the full download...")
+            for leftover in Path(output_dir).glob("chunk_*"):
+                leftover.unlink()
     
-    if cleaned_count > 0:
-        logger.info(f"✅ Cleaned up {cleaned_count} remnant files")
-    else:
-        logger.info("✅ No remnant files found to clean")
+    video_path = video_future.result()
+    if not video_path:
+        raise Exception("Failed to download video from S3")
+    return extract_audio_chunks(video_path, output_dir, "s3")
+
+@app.function(
+    image=image,
+    cpu=0.25,  # Transcription is network-bound, a fraction of a core is enough
+    memory=512,  # A single chunk is at most 25MB
+    timeout=900,  # 15 minutes covers all retries of one chunk
+    retries=2,
+    volumes={"/data": volume},  # Shares the transcription cache
+    secrets=[secret]
+)
+def transcribe_chunk_remote(filename: str, audio_bytes: bytes, language: str = "en") -> dict:
+    """Transcribe a single audio chunk on its own small container"""
+    sys.path.append("/root")
+    import transcribe_segments
     
-    return cleaned_count
+    with tempfile.TemporaryDirectory() as temp_dir:
+        chunk_path = Path(temp_dir) / filename
+        chunk_path.write_bytes(audio_bytes)
+        return transcribe_segments.transcribe_audio_file(str(chunk_path), filename, language)
+
+def transcribe_chunks_distributed(file_paths: List[str], language: str = "en") -> Iterator[dict]:
+    """Transcribe audio chunks in parallel on transcribe_chunk_remote containers, yielding results in input order as they arrive"""
+    filenames = [Path(file_path).name for file_path in file_paths]
+    logger.info(f"🛰️  Dispatching {len(file_paths)} chunks to remote transcription workers...")
+    
+    # Chunk bytes are read lazily as inputs are sent
+    payloads = (Path(file_path).read_bytes() for file_path in file_paths)
+    completed = 0
+    for filename, result in zip(filenames, transcribe_chunk_remote.map(filenames, payloads, kwargs={"language": language}, return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.error(f"❌ Remote transcription failed for {filename}: {result}")
+            result = {"filename": filename, "total_segments": 0, "segments": [], "error": str(result)}
+        else:
+            completed += 1
+        yield result
+    
+    logger.info(f"✅ Remote transcription completed: {completed}/{len(filenames)} chunks")
 
-def cleanup_intermediate_files(video_path: Path, audio_path: Path = None):
+def get_chunk_transcriber():
+    """Return the chunk transcriber hook for transcribe_and_analyse (None transcribes locally)"""
+    return transcribe_chunks_distributed if DISTRIBUTED_TRANSCRIPTION else None
+
+def cleanup_intermediate_files(video_path: Path, workspace: JobWorkspace, audio_path: Path = None):
     """Clean up intermediate files after video segment extraction is complete"""
     logger.info("🧹 Cleaning up intermediate files after video segment extraction...")
     
     cleaned_count = 0
     
-    # Clean up intermediate JSON files
-    intermediate_files = ["transcriptions.json", "segments.json"]
-    for filename in intermediate_files:
-        file_path = Path(filename)
-        if file_path.exists():
-            try:
-                file_path.unlink()
-                logger.info(f"🗑️  Deleted intermediate file: {filename}")
-                cleaned_count += 1
-            except Exception as e:
-                logger.warning(f"⚠️  Could not delete {filename}: {e}")
-    
-    # Clean up audio chunks in output directory
-    if OUTPUT_DIR.exists():
-        try:
-            for file_path in OUTPUT_DIR.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in ['.mp3', '.aac', '.wav']:
-                    file_path.unlink()
-                    logger.info(f"🗑️  Deleted audio file: {file_path.name}")
-                    cleaned_count += 1
-        except Exception as e:
-            logger.warning(f"⚠️  Could not clean audio files: {e}")
+    # Clean up intermediate JSON files and audio chunks in the job workspace
+    try:
+        cleaned_count += workspace.cleanup_intermediate()
+        logger.info(f"🗑️  Deleted intermediate files in {workspace.root}")
+    except Exception as e:
+        logger.warning(f"⚠️  Could not clean workspace {workspace.root}: {e}")
     
     # Clean up original video file
     if video_path.exists():
@@ -726,7 +914,87 @@ def cleanup_intermediate_files(video_path: Path, audio_path: Path = None):
     logger.info(f"✅ Cleaned up {cleaned_count} intermediate files")
     return cleaned_count
 
-def run_video_segment_extraction(video_path: Path) -> List[str]:
+class StreamingClipPipeline:
+    """
+    Cuts and uploads clips while analysis is still running. create_segment_json hands every final
+    segment to submit(), which queues an ffmpeg cut followed by an S3 upload on a small worker pool;
+    each uploaded clip is streamed to the client through the job's progress channel. video_path may be a
+    Future of a download still in progress; clips then wait for it on the worker pool.
+    """
+
+    def __init__(self, video_path, workspace: JobWorkspace, progress_id: str, max_workers: int = VIDEO_EXTRACTION_WORKERS):
+        sys.path.append("/root")
+        import extract_video_segments
+        self._extract_video_segments = extract_video_segments
+        self.video_path = video_path
+        self.workspace = workspace
+        self.progress_id = progress_id
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clips")
+        self._futures = []
+        self._counts = {"topic": 0, "interaction": 0}
+        self._uploaded = 0
+        self._lock = threading.Lock()
+        self._aborted = threading.Event()
+
+    def submit(self, segment: dict):
+        """Queue the cut and upload of a final segment (called from the analysis thread)"""
+        segment_type = "interaction" if segment.get("segment_type") == "interaction" else "topic"
+        self._counts[segment_type] += 1
+        self._futures.append(self._executor.submit(self._cut_and_upload, segment, self._counts[segment_type]))
+
+    def _cut_and_upload(self, segment: dict, index: int) -> Optional[dict]:
+        if self._aborted.is_set():
+            return None
+        video_path = self.video_path.result() if isinstance(self.video_path, Future) else self.video_path
+        # A failed or cancelled download yields None; an abort while waiting for it drops the clip too
+        if not video_path or self._aborted.is_set():
+            return None
+        outcome = self._extract_video_segments.extract_segment_clip(
+            str(video_path),
+            segment,
+            index,
+            output_dir=str(self.workspace.video_segments_dir),
+            interaction_output_dir=str(self.workspace.interaction_segments_dir)
+        )
+        if not outcome:
+            return None
+        if not outcome["success"]:
+            logger.error(f"❌ Failed to extract clip {outcome['output_path']}: {outcome['error']}")
+            return None
+        
+        logger.info(f"✂️  Extracted {Path(outcome['output_path']).name} in {outcome['elapsed']:.2f}s")
+        upload = upload_video_segment_to_s3(outcome["output_path"])
+        if upload["success"]:
+            with self._lock:
+                self._uploaded += 1
+                uploaded = self._uploaded
+            send_progress_update(self.progress_id, "running", f"Clip {uploaded} ready: {upload['filename']}", clip=upload)
+        return {"path": outcome["output_path"], "segment_type": outcome["segment_type"], "upload": upload}
+
+    def finish(self):
+        """Wait for every queued clip. Returns (video_segments, interaction_segments, s3_urls) in segment order"""
+        try:
+            clips = [clip for clip in (future.result() for future in self._futures) if clip]
+        finally:
+            self._executor.shutdown(wait=True)
+        
+        video_segments = [clip["path"] for clip in clips if clip["segment_type"] == "topic"]
+        interaction_segments = [clip["path"] for clip in clips if clip["segment_type"] == "interaction"]
+        s3_urls = [clip["upload"] for clip in clips if clip["segment_type"] == "topic"]
+        s3_urls += [clip["upload"] for clip in clips if clip["segment_type"] == "interaction"]
+        
+        logger.info(f"✅ Streaming clip pipeline completed: {len(video_segments)} topic and {len(interaction_segments)} interaction clips, {count_uploaded(s3_urls)} uploaded")
+        return video_segments, interaction_segments, s3_urls
+
+    def abort(self):
+        """
+        Drop queued clips and wait for the ones in flight. Clips waiting for a background download only
+        return once it ends, so cancel the download before calling this.
+        """
+        self._aborted.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+def run_video_segment_extraction(video_path: Path, workspace: JobWorkspace) -> List[str]:
     """Run video segment extraction and return list of created video segments"""
     import sys
     sys.path.append("/root")
@@ -735,8 +1003,14 @@ def run_video_segment_extraction(video_path: Path) -> List[str]:
     logger.info("🎬 Starting video segment extraction...")
     
     try:
-        # Run video segment extraction with the provided video path
-        success = extract_video_segments.create_video_segments(str(video_path))
+        # Run video segment extraction with the provided video path inside the job workspace
+        success = extract_video_segments.create_video_segments(
+            str(video_path),
+            max_workers=VIDEO_EXTRACTION_WORKERS,
+            segments_json=str(workspace.segments_json),
+            output_dir=str(workspace.video_segments_dir),
+            interaction_output_dir=str(workspace.interaction_segments_dir)
+        )
         
         if not success:
             logger.error("❌ Video segment extraction failed")
@@ -746,19 +1020,11 @@ def run_video_segment_extraction(video_path: Path) -> List[str]:
         video_segments = []
         interaction_segments = []
         
-        # Get regular segments from main video_segments directory (current working directory)
-        video_segments_dir = Path("video_segments")
-        if video_segments_dir.exists():
-            for file_path in video_segments_dir.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
-                    video_segments.append(str(file_path))
-        
-        # Get interaction segments from interactions subdirectory
-        interaction_dir = video_segments_dir / "interactions"
-        if interaction_dir.exists():
-            for file_path in interaction_dir.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
-                    interaction_segments.append(str(file_path))
+        for segment_path in workspace.list_video_segments():
+            if Path(segment_path).parent == workspace.interaction_segments_dir:
+                interaction_segments.append(segment_path)
+            else:
+                video_segments.append(segment_path)
         
         # Combine all segments
         all_segments = video_segments + interaction_segments
@@ -779,16 +1045,18 @@ def download_youtube_video(youtube_url: str, output_dir: Path, cookies_content:
     try:
         logger.info(f"📥 Starting YouTube video download: {youtube_url}")
         
-        # Handle cookies
+        # Handle cookies (one file per download so concurrent jobs don't overwrite each other)
         cookies_file = None
+        output_dir.mkdir(parents=True, exist_ok=True)
+        cookies_path = output_dir / f"{uuid.uuid4().hex}_youtube_cookies.txt"
         if cookies_content:
             logger.info("🔐 Using user-provided cookies")
-            cookies_file = Path("/tmp/youtube_cookies.txt")
+            cookies_file = cookies_path
             with open(cookies_file, 'w') as f:
                 f.write(cookies_content)
         elif os.getenv("YOUTUBE_COOKIES"):
             logger.info("🔐 Using Modal secret cookies")
-            cookies_file = Path("/tmp/youtube_cookies.txt")
+            cookies_file = cookies_path
             with open(cookies_file, 'w') as f:
                 f.write(os.getenv("YOUTUBE_COOKIES"))
         
@@ -852,16 +1120,139 @@ def download_youtube_video(youtube_url: str, output_dir: Path, cookies_content:
             cookies_file.unlink()
         return None
 
-def download_video_from_s3(s3_url: str, output_dir: Path) -> Optional[Path]:
-    """Download video from S3 URL using boto3 and return the file path"""
+def parse_s3_url(s3_url: str) -> Tuple[str, str]:
+    """
+    Return (bucket, key) for s3://bucket/key, virtual-hosted (https://bucket.s3[.region].amazonaws.com/key)
+    and path-style (https://s3[.region].amazonaws.com/bucket/key) URLs. Raises ValueError for anything else.
+    """
+    parsed = urlparse(s3_url.strip())
+    if parsed.scheme == "s3":
+        bucket, key = parsed.netloc, parsed.path.lstrip('/')
+    elif parsed.scheme in ("http", "https"):
+        host = (parsed.hostname or "").lower()
+        path = unquote(parsed.path).lstrip('/')
+        virtual_hosted = re.match(r'^(?P<bucket>.+)\.s3[.-](?:[a-z0-9-]+\.)*amazonaws\.com(?:\.cn)?$', host)
+        if virtual_hosted:
+            bucket, key = virtual_hosted.group('bucket'), path
+        elif re.match(r'^s3(?:[.-][a-z0-9-]+)*\.amazonaws\.com(?:\.cn)?$', host):
+            bucket, _, key = path.partition('/')
+        else:
+            raise ValueError(f"Not an S3 URL: {s3_url}")
+    else:
+        raise ValueError(f"Unsupported URL scheme: {s3_url}")
+    
+    if not bucket or not key:
+        raise ValueError(f"S3 URL has no bucket or key: {s3_url}")
+    return bucket, key
+
+def download_s3_object(s3_client, bucket: str, key: str, destination: Path, progress_callback: Optional[Callable[[int, int], None]] = None,
+                       max_workers: int = S3_DOWNLOAD_CONCURRENCY, part_size: int = S3_DOWNLOAD_PART_SIZE,
+                       cancel_event: Optional[threading.Event] = None) -> dict:
+    """
+    Download an object with up to max_workers concurrent ranged GETs, each written straight to its offset
+    in a preallocated file. Every range is pinned to the object's ETag and retried on its own.
+    progress_callback(downloaded_bytes, total_bytes) is called every S3_DOWNLOAD_PROGRESS_STEP.
+    Setting cancel_event stops the download between blocks with an InterruptedError.
+    Returns the object's head_object response.
+    """
+    head = s3_client.head_object(Bucket=bucket, Key=key)
+    size = head['ContentLength']
+    etag = head['ETag']
+    ranges = [(offset, min(offset + part_size, size) - 1) for offset in range(0, size, part_size)]
+    logger.info(f"⬇️  Downloading {size / (1024*1024):.2f}MB in {len(ranges)} ranges, {min(max_workers, len(ranges) or 1)} in parallel")
+    
+    with open(destination, 'wb') as f:
+        f.truncate(size)
+    
+    progress_lock = threading.Lock()
+    progress = {"downloaded": 0, "reported": 0.0}
+    
+    def fetch(byte_range):
+        start, end = byte_range
+        for attempt in range(S3_DOWNLOAD_RETRIES):
+            try:
+                # IfMatch fails the request if the object is replaced mid-download
+                body = s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=etag)['Body']
+                offset = start
+                for block in iter(lambda: body.read(1024 * 1024), b''):
+                    if cancel_event and cancel_event.is_set():
+                        raise InterruptedError("Download cancelled")
+                    os.pwrite(fd, block, offset)
+                    offset += len(block)
+                if offset != end + 1:
+                    raise IOError(f"Short read for bytes {start}-{end}: got {offset - start} bytes")
+                break
+            except InterruptedError:
+                raise
+            except Exception as e:
+                if attempt == S3_DOWNLOAD_RETRIES - 1:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(f"⚠️  Range {start}-{end} failed ({e}), retrying in {delay}s...")
+                time.sleep(delay)
+        
+        with progress_lock:
+            progress["downloaded"] += end - start + 1
+            fraction = progress["downloaded"] / size
+            report = progress_callback and (fraction - progress["reported"] >= S3_DOWNLOAD_PROGRESS_STEP or fraction == 1)
+            if report:
+                progress["reported"] = fraction
+        if report:
+            progress_callback(progress["downloaded"], size)
+    
+    fd = os.open(destination, os.O_WRONLY)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ranges) or 1)), thread_name_prefix="s3-range")
+    try:
+        # Consuming the results re-raises the first failed range
+        list(executor.map(fetch, ranges))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        os.close(fd)
+    return head
+
+def verify_s3_etag(s3_client, bucket: str, key: str, file_path: Path, head: dict) -> Optional[bool]:
+    """
+    Check a downloaded file against the object's ETag: the MD5 of the content, or for multipart uploads the
+    MD5 of the concatenated part MD5s. Returns None when the ETag is not content-derived (SSE-KMS / SSE-C).
+    """
+    if str(head.get('ServerSideEncryption', '')).startswith('aws:kms') or head.get('SSECustomerAlgorithm'):
+        return None
+    
+    etag = head['ETag'].strip('"')
+    if '-' in etag:
+        # head_object with PartNumber returns the size of that part, i.e. the part size of the upload
+        part_size = s3_client.head_object(Bucket=bucket, Key=key, PartNumber=1)['ContentLength']
+        part_digests = []
+        with open(file_path, 'rb') as f:
+            for part in iter(lambda: f.read(part_size), b''):
+                part_digests.append(hashlib.md5(part).digest())
+        actual = f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+    else:
+        digest = hashlib.md5()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+                digest.update(block)
+        actual = digest.hexdigest()
+    
+    if actual != etag:
+        logger.error(f"❌ Integrity check failed: expected ETag {etag}, got {actual}")
+        return False
+    return True
+
+def download_video_from_s3(s3_url: str, output_dir: Path, progress_callback: Optional[Callable[[int, int], None]] = None,
+                           cancel_event: Optional[threading.Event] = None) -> Optional[Path]:
+    """
+    Download video from S3 URL with parallel ranged GETs, verify it against its ETag and return the file path.
+    Setting cancel_event aborts the download; the partial file is removed and None is returned.
+    """
     try:
         logger.info(f"📥 Starting S3 video download: {s3_url}")
         
-        # Parse S3 URL to get bucket and key
-        # URL format: https://bucket-name.s3.region.amazonaws.com/key
-        url_parts = s3_url.replace('https://', '').split('/')
-        bucket_name = url_parts[0].split('.')[0]  # Extract bucket name
-        s3_key = '/'.join(url_parts[1:])  # Extract the key
+        try:
+            bucket_name, s3_key = parse_s3_url(s3_url)
+        except ValueError as e:
+            logger.error(f"❌ {e}")
+            return None
         
         logger.info(f"🪣 S3 Bucket: {bucket_name}")
         logger.info(f"🔑 S3 Key: {s3_key}")
@@ -869,6 +1260,7 @@ def download_video_from_s3(s3_url: str, output_dir: Path) -> Optional[Path]:
         # Generate a unique filename
         file_id = str(uuid.uuid4())
         video_filename = f"{file_id}_s3_video.mp4"
+        output_dir.mkdir(parents=True, exist_ok=True)
         video_path = output_dir / video_filename
         
         # Get S3 client
@@ -877,24 +1269,24 @@ def download_video_from_s3(s3_url: str, output_dir: Path) -> Optional[Path]:
             logger.error("❌ S3 client not available")
             return None
         
-        # Download using boto3
-        logger.info("⬇️  Downloading video from S3 using boto3...")
-        
         try:
-            s3_client.download_file(bucket_name, s3_key, str(video_path))
-            
-            # Verify file was downloaded
-            if not video_path.exists():
-                logger.error("❌ File not found after boto3 download")
-                return None
+            started = time.time()
+            head = download_s3_object(s3_client, bucket_name, s3_key, video_path, progress_callback, cancel_event=cancel_event)
+            elapsed = time.time() - started
             
-            # Get downloaded file size
             file_size_mb = get_file_size_mb(video_path)
-            logger.info(f"✅ S3 video downloaded successfully: {video_path.name} ({file_size_mb:.2f}MB)")
+            logger.info(f"✅ S3 video downloaded: {video_path.name} ({file_size_mb:.2f}MB in {elapsed:.1f}s, {file_size_mb / max(elapsed, 0.001):.1f}MB/s)")
+            
+            verified = verify_s3_etag(s3_client, bucket_name, s3_key, video_path, head)
+            if verified is False:
+                video_path.unlink(missing_ok=True)
+                return None
+            logger.info("🔒 ETag verified" if verified else "ℹ️  ETag is not an MD5 (encrypted object), skipping integrity check")
             return video_path
             
         except Exception as e:
-            logger.error(f"❌ boto3 download failed: {str(e)}")
+            logger.error(f"❌ S3 download failed: {str(e)}")
+            video_path.unlink(missing_ok=True)
             return None
         
     except Exception as e:
@@ -914,8 +1306,9 @@ def process_video_from_s3(s3_url: str) -> dict:
     logger.info(f"☁️  S3 URL: {s3_url}")
     logger.info(f"🆔 Request ID: {start_time.strftime('%Y%m%d_%H%M%S')}")
     
-    # Clean up remnant files from previous runs
-    cleanup_previous_files()
+    # Every request gets its own workspace so concurrent jobs never share files
+    workspace = JobWorkspace(JOBS_DIR).create()
+    logger.info(f"📂 Job workspace: {workspace.root}")
     
     try:
         # Download video from S3
@@ -929,218 +1322,96 @@ def process_video_from_s3(s3_url: str) -> dict:
         video_size_mb = get_file_size_mb(video_path)
         logger.info(f"✅ Video file ready: {video_size_mb:.2f}MB")
         
-        # Extract audio using ffmpeg
+        # Extract speech-optimized audio chunks in a single ffmpeg pass
         logger.info("🎵 Starting audio extraction from S3 video...")
         try:
-            # First, probe the input file to get the audio codec
-            logger.info("🔍 Probing video file for audio codec...")
-            probe_cmd = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'a:0',
-                '-show_entries', 'stream=codec_name',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(video_path)
-            ]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            audio_codec = probe_result.stdout.strip()
-            logger.info(f"🎼 Detected audio codec: {audio_codec}")
-            
-            file_id = str(uuid.uuid4())
-            audio_filename = f"{file_id}_s3_audio.mp3"
-            audio_path = OUTPUT_DIR / audio_filename
-            logger.info(f"📄 Audio will be saved as: {audio_filename}")
-            
-            # Extract audio using FFmpeg
-            logger.info("⚡ Extracting audio using FFmpeg...")
-            cmd_copy = [
-                'ffmpeg',
-                '-i', str(video_path),
-                '-vn',
-                '-acodec', 'mp3',
-                '-ab', '192k',
-                '-y',
-                str(audio_path)
-            ]
-            result_copy = subprocess.run(cmd_copy, capture_output=True, text=True)
-            
-            if result_copy.returncode != 0 or not audio_path.exists() or audio_path.stat().st_size == 0:
-                logger.error(f"❌ FFmpeg extraction failed: {result_copy.stderr}")
-                raise Exception(f"FFmpeg error: {result_copy.stderr}")
-            
-            # Get extracted audio file size
-            audio_size_mb = audio_path.stat().st_size / (1024 * 1024)
-            logger.info(f"✅ Audio extraction completed successfully: {audio_size_mb:.2f}MB")
-            
+            chunk_files = extract_audio_chunks(video_path, workspace.audio_dir, "s3")
         except Exception as e:
             logger.error(f"❌ Error extracting audio: {str(e)}")
             raise Exception(f"Error extracting audio: {str(e)}")
         
-        # Check if audio file needs chunking
-        audio_size_mb = get_file_size_mb(audio_path)
-        logger.info(f"📊 Audio file size: {audio_size_mb:.2f}MB (max before chunking: {MAX_AUDIO_SIZE_MB}MB)")
+        audio_size_mb = sum(get_file_size_mb(Path(chunk_file)) for chunk_file in chunk_files)
         
-        if audio_size_mb > MAX_AUDIO_SIZE_MB:
-            logger.info(f"✂️  Audio file exceeds {MAX_AUDIO_SIZE_MB}MB, starting chunking process...")
-            # Create chunks
-            chunk_files = chunk_audio(audio_path, OUTPUT_DIR, CHUNK_DURATION_MINUTES)
-            
-            # Clean up original large audio file
-            logger.info("🗑️  Cleaning up original large audio file...")
-            audio_path.unlink()
-            logger.info("✅ Original audio file deleted")
+        # Run transcription and topic analysis
+        logger.info("📝 Starting transcription and topic analysis...")
+        try:
+            audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                output_dir=str(workspace.audio_dir),
+                transcriptions_path=str(workspace.transcriptions_json),
+                interaction_segments_path=str(workspace.interaction_segments_json)
+            )
+            with open(workspace.segments_json, "w") as f:
+                import json
+                json.dump(segment_json, f, indent=2)
+            logger.info("✅ Topic analysis and segment creation completed!")
+        except Exception as e:
+            logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
+        
+        # Run video segment extraction after transcription
+        logger.info("🎬 Starting video segment extraction after transcription...")
+        try:
+            all_segments = run_video_segment_extraction(video_path, workspace)
+            logger.info("✅ Video segment extraction completed!")
             
-            # After chunking, run transcription and topic analysis
-            logger.info("📝 Starting transcription and topic analysis...")
-            try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
-                    import json
-                    json.dump(segment_json, f, indent=2)
-                logger.info("✅ Topic analysis and segment creation completed!")
-            except Exception as e:
-                logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
+            # Separate regular segments from interaction segments
+            video_segments = []
+            interaction_segments = []
             
-            # Run video segment extraction after transcription
-            logger.info("🎬 Starting video segment extraction after transcription...")
-            try:
-                all_segments = run_video_segment_extraction(video_path)
-                logger.info("✅ Video segment extraction completed!")
-                
-                # Separate regular segments from interaction segments
-                video_segments = []
-                interaction_segments = []
-                
-                for segment_path in all_segments:
-                    segment_file = Path(segment_path)
-                    if "interactions" in str(segment_file):
-                        interaction_segments.append(segment_path)
-                    else:
-                        video_segments.append(segment_path)
-                
-                # Clean up intermediate files after successful video segment extraction
-                if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
+            for segment_path in all_segments:
+                segment_file = Path(segment_path)
+                if "interactions" in str(segment_file):
+                    interaction_segments.append(segment_path)
                 else:
-                    logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
-                video_segments = []
-                interaction_segments = []
-
-            # Upload video segments to S3
-            s3_urls = []
-            if all_segments:
-                logger.info("☁️  Starting S3 upload for video segments...")
-                s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
-            
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            logger.info("=" * 60)
-            logger.info("🎉 S3 VIDEO PROCESSING COMPLETED SUCCESSFULLY")
-            logger.info("=" * 60)
-            logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
-            logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
-            logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
-            logger.info(f"✂️  Created {len(chunk_files)} chunks")
-            logger.info(f"🎬 Created {len(video_segments)} regular video segments")
-            logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
-            logger.info("=" * 60)
-            
-            return {
-                "message": f"S3 video processed successfully. Audio chunked into {len(chunk_files)} parts (original size: {audio_size_mb:.2f}MB)",
-                "s3_url": s3_url,
-                "chunk_files": chunk_files,
-                "total_chunks": len(chunk_files),
-                "video_segments": video_segments,
-                "total_video_segments": len(video_segments),
-                "interaction_segments": interaction_segments,
-                "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
-                "s3_urls": s3_urls,
-                "processing_time_seconds": processing_time
-            }
-        else:
-            logger.info(f"✅ Audio file is under {MAX_AUDIO_SIZE_MB}MB, no chunking needed")
+                    video_segments.append(segment_path)
             
-            # After chunking, run transcription and topic analysis
-            logger.info("📝 Starting transcription and topic analysis...")
-            try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
-                    import json
-                    json.dump(segment_json, f, indent=2)
-                logger.info("✅ Topic analysis and segment creation completed!")
-            except Exception as e:
-                logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
-
-            # Run video segment extraction after transcription
-            logger.info("🎬 Starting video segment extraction after transcription...")
-            try:
-                all_segments = run_video_segment_extraction(video_path)
-                logger.info("✅ Video segment extraction completed!")
-                
-                # Separate regular segments from interaction segments
-                video_segments = []
-                interaction_segments = []
-                
-                for segment_path in all_segments:
-                    segment_file = Path(segment_path)
-                    if "interactions" in str(segment_file):
-                        interaction_segments.append(segment_path)
-                    else:
-                        video_segments.append(segment_path)
+            # Clean up intermediate files after successful video segment extraction
+            if all_segments:
+                cleanup_intermediate_files(video_path, workspace)
+            else:
+                logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
                 
-                # Clean up intermediate files after successful video segment extraction
-                if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
-                else:
-                    logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
-                video_segments = []
-                interaction_segments = []
+        except Exception as e:
+            logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
+            video_segments = []
+            interaction_segments = []
 
-            # Upload video segments to S3
-            s3_urls = []
-            if all_segments:
-                logger.info("☁️  Starting S3 upload for video segments...")
-                s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
-            
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            logger.info("=" * 60)
-            logger.info("🎉 S3 VIDEO PROCESSING COMPLETED SUCCESSFULLY")
-            logger.info("=" * 60)
-            logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
-            logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
-            logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
-            logger.info(f"🎬 Created {len(video_segments)} regular video segments")
-            logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
-            logger.info("=" * 60)
-            
-            return {
-                "message": f"S3 video processed successfully (audio size: {audio_size_mb:.2f}MB)",
-                "s3_url": s3_url,
-                "audio_file_path": str(audio_path),
-                "video_segments": video_segments,
-                "total_video_segments": len(video_segments),
-                "interaction_segments": interaction_segments,
-                "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
-                "s3_urls": s3_urls,
-                "processing_time_seconds": processing_time
-            }
+        # Upload video segments to S3
+        s3_urls = []
+        if all_segments:
+            logger.info("☁️  Starting S3 upload for video segments...")
+            s3_urls = upload_video_segments_to_s3(all_segments)
+            logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(s3_urls)} segments uploaded")
+            # Drop the workspace once every clip is safely on S3
+            if all(upload["success"] for upload in s3_urls):
+                workspace.cleanup()
+        
+        end_time = datetime.now()
+        processing_time = (end_time - start_time).total_seconds()
+        logger.info("=" * 60)
+        logger.info("🎉 S3 VIDEO PROCESSING COMPLETED SUCCESSFULLY")
+        logger.info("=" * 60)
+        logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
+        logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
+        logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
+        logger.info(f"✂️  Created {len(chunk_files)} chunks")
+        logger.info(f"🎬 Created {len(video_segments)} regular video segments")
+        logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
+        logger.info(f"☁️  Uploaded {count_uploaded(s3_urls)}/{len(s3_urls)} segments to S3")
+        logger.info("=" * 60)
+        
+        return {
+            "message": f"S3 video processed successfully. Audio chunked into {len(chunk_files)} parts (total size: {audio_size_mb:.2f}MB)",
+            "s3_url": s3_url,
+            "chunk_files": chunk_files,
+            "total_chunks": len(chunk_files),
+            "video_segments": video_segments,
+            "total_video_segments": len(video_segments),
+            "interaction_segments": interaction_segments,
+            "total_interaction_segments": len(interaction_segments),
+            "segments_json_path": str(workspace.segments_json),
+            "s3_urls": s3_urls,
+            "processing_time_seconds": processing_time
+        }
     
     except Exception as e:
         logger.error(f"❌ Error processing S3 video: {str(e)}")
@@ -1148,9 +1419,10 @@ def process_video_from_s3(s3_url: str) -> dict:
         if 'video_path' in locals() and video_path is not None and video_path.exists():
             logger.info("🗑️  Cleaning up video file due to error...")
             video_path.unlink()
-        if 'audio_path' in locals() and audio_path is not None and audio_path.exists():
-            logger.info("🗑️  Cleaning up audio file due to error...")
-            audio_path.unlink()
+        if 'chunk_files' in locals():
+            logger.info("🗑️  Cleaning up audio chunks due to error...")
+            for chunk_file in chunk_files:
+                Path(chunk_file).unlink(missing_ok=True)
         raise Exception(f"Error processing S3 video: {str(e)}")
 
 # Main processing functions
@@ -1167,225 +1439,103 @@ def process_video_file(video_path: Path, filename: str) -> dict:
     logger.info(f"📁 Original filename: {filename}")
     logger.info(f"🆔 Request ID: {start_time.strftime('%Y%m%d_%H%M%S')}")
     
-    # Clean up remnant files from previous runs
-    cleanup_previous_files()
+    # Every request gets its own workspace so concurrent jobs never share files
+    workspace = JobWorkspace(JOBS_DIR).create()
+    logger.info(f"📂 Job workspace: {workspace.root}")
     
     try:
         # Get video file size
         video_size_mb = get_file_size_mb(video_path)
         logger.info(f"✅ Video file ready: {video_size_mb:.2f}MB")
         
-        # Extract audio using ffmpeg
+        # Extract speech-optimized audio chunks in a single ffmpeg pass
         logger.info("🎵 Starting audio extraction from video...")
         try:
-            # First, probe the input file to get the audio codec
-            logger.info("🔍 Probing video file for audio codec...")
-            probe_cmd = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'a:0',
-                '-show_entries', 'stream=codec_name',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(video_path)
-            ]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            audio_codec = probe_result.stdout.strip()
-            logger.info(f"🎼 Detected audio codec: {audio_codec}")
-            
-            # Map codec to extension
-            codec_ext = {'aac': 'aac', 'mp3': 'mp3', 'wav': 'wav', 'flac': 'flac', 'opus': 'opus', 'm4a': 'm4a', 'ogg': 'ogg'}
-            out_ext = codec_ext.get(audio_codec, 'audio')
-            file_id = str(uuid.uuid4())
-            audio_filename = f"{file_id}_audio.mp3"
-            audio_path = OUTPUT_DIR / audio_filename
-            logger.info(f"📄 Audio will be saved as: {audio_filename}")
-            
-            # Extract audio using FFmpeg
-            logger.info("⚡ Extracting audio using FFmpeg...")
-            cmd_copy = [
-                'ffmpeg',
-                '-i', str(video_path),
-                '-vn',
-                '-acodec', 'mp3',
-                '-ab', '192k',
-                '-y',
-                str(audio_path)
-            ]
-            result_copy = subprocess.run(cmd_copy, capture_output=True, text=True)
-            
-            if result_copy.returncode != 0 or not audio_path.exists() or audio_path.stat().st_size == 0:
-                logger.error(f"❌ FFmpeg extraction failed: {result_copy.stderr}")
-                raise Exception(f"FFmpeg error: {result_copy.stderr}")
-            
-            # Get extracted audio file size
-            audio_size_mb = audio_path.stat().st_size / (1024 * 1024)
-            logger.info(f"✅ Audio extraction completed successfully: {audio_size_mb:.2f}MB")
-            
+            chunk_files = extract_audio_chunks(video_path, workspace.audio_dir, "upload")
         except Exception as e:
             logger.error(f"❌ Error extracting audio: {str(e)}")
             raise Exception(f"Error extracting audio: {str(e)}")
         
-        # Check if audio file needs chunking
-        audio_size_mb = get_file_size_mb(audio_path)
-        logger.info(f"📊 Audio file size: {audio_size_mb:.2f}MB (max before chunking: {MAX_AUDIO_SIZE_MB}MB)")
+        audio_size_mb = sum(get_file_size_mb(Path(chunk_file)) for chunk_file in chunk_files)
         
-        if audio_size_mb > MAX_AUDIO_SIZE_MB:
-            logger.info(f"✂️  Audio file exceeds {MAX_AUDIO_SIZE_MB}MB, starting chunking process...")
-            # Create chunks
-            chunk_files = chunk_audio(audio_path, OUTPUT_DIR, CHUNK_DURATION_MINUTES)
-            
-            # Clean up original large audio file
-            logger.info("🗑️  Cleaning up original large audio file...")
-            audio_path.unlink()
-            logger.info("✅ Original audio file deleted")
+        # Run transcription and topic analysis
+        logger.info("📝 Starting transcription and topic analysis...")
+        try:
+            audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                output_dir=str(workspace.audio_dir),
+                transcriptions_path=str(workspace.transcriptions_json),
+                interaction_segments_path=str(workspace.interaction_segments_json)
+            )
+            with open(workspace.segments_json, "w") as f:
+                import json
+                json.dump(segment_json, f, indent=2)
+            logger.info("✅ Topic analysis and segment creation completed!")
+        except Exception as e:
+            logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
+        
+        # Run video segment extraction after transcription
+        logger.info("🎬 Starting video segment extraction after transcription...")
+        try:
+            all_segments = run_video_segment_extraction(video_path, workspace)
+            logger.info("✅ Video segment extraction completed!")
             
-            # After chunking, run transcription and topic analysis
-            logger.info("📝 Starting transcription and topic analysis...")
-            try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
-                    import json
-                    json.dump(segment_json, f, indent=2)
-                logger.info("✅ Topic analysis and segment creation completed!")
-            except Exception as e:
-                logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
+            # Separate regular segments from interaction segments
+            video_segments = []
+            interaction_segments = []
             
-            # Run video segment extraction after transcription
-            logger.info("🎬 Starting video segment extraction after transcription...")
-            try:
-                all_segments = run_video_segment_extraction(video_path)
-                logger.info("✅ Video segment extraction completed!")
-                
-                # Separate regular segments from interaction segments
-                video_segments = []
-                interaction_segments = []
-                
-                for segment_path in all_segments:
-                    segment_file = Path(segment_path)
-                    if "interactions" in str(segment_file):
-                        interaction_segments.append(segment_path)
-                    else:
-                        video_segments.append(segment_path)
-                
-                # Clean up intermediate files after successful video segment extraction
-                if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
+            for segment_path in all_segments:
+                segment_file = Path(segment_path)
+                if "interactions" in str(segment_file):
+                    interaction_segments.append(segment_path)
                 else:
-                    logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
-                video_segments = []
-                interaction_segments = []
-
-            # Upload video segments to S3
-            s3_urls = []
-            if all_segments:
-                logger.info("☁️  Starting S3 upload for video segments...")
-                s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
-            
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            logger.info("=" * 60)
-            logger.info("🎉 PROCESSING COMPLETED SUCCESSFULLY")
-            logger.info("=" * 60)
-            logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
-            logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
-            logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
-            logger.info(f"✂️  Created {len(chunk_files)} chunks")
-            logger.info(f"🎬 Created {len(video_segments)} regular video segments")
-            logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
-            logger.info("=" * 60)
-            
-            return {
-                "message": f"Audio extracted and chunked into {len(chunk_files)} parts (original size: {audio_size_mb:.2f}MB)",
-                "chunk_files": chunk_files,
-                "total_chunks": len(chunk_files),
-                "video_segments": video_segments,
-                "total_video_segments": len(video_segments),
-                "interaction_segments": interaction_segments,
-                "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
-                "s3_urls": s3_urls
-            }
-        else:
-            logger.info(f"✅ Audio file is under {MAX_AUDIO_SIZE_MB}MB, no chunking needed")
+                    video_segments.append(segment_path)
             
-            # After chunking, run transcription and topic analysis
-            logger.info("📝 Starting transcription and topic analysis...")
-            try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
-                    import json
-                    json.dump(segment_json, f, indent=2)
-                logger.info("✅ Topic analysis and segment creation completed!")
-            except Exception as e:
-                logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
-
-            # Run video segment extraction after transcription
-            logger.info("🎬 Starting video segment extraction after transcription...")
-            try:
-                all_segments = run_video_segment_extraction(video_path)
-                logger.info("✅ Video segment extraction completed!")
-                
-                # Separate regular segments from interaction segments
-                video_segments = []
-                interaction_segments = []
-                
-                for segment_path in all_segments:
-                    segment_file = Path(segment_path)
-                    if "interactions" in str(segment_file):
-                        interaction_segments.append(segment_path)
-                    else:
-                        video_segments.append(segment_path)
+            # Clean up intermediate files after successful video segment extraction
+            if all_segments:
+                cleanup_intermediate_files(video_path, workspace)
+            else:
+                logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
                 
-                # Clean up intermediate files after successful video segment extraction
-                if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
-                else:
-                    logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
-                video_segments = []
-                interaction_segments = []
+        except Exception as e:
+            logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
+            video_segments = []
+            interaction_segments = []
 
-            # Upload video segments to S3
-            s3_urls = []
-            if all_segments:
-                logger.info("☁️  Starting S3 upload for video segments...")
-                s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
-            
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            logger.info("=" * 60)
-            logger.info("🎉 PROCESSING COMPLETED SUCCESSFULLY")
-            logger.info("=" * 60)
-            logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
-            logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
-            logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
-            logger.info(f"🎬 Created {len(video_segments)} regular video segments")
-            logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
-            logger.info("=" * 60)
-            
-            return {
-                "message": f"Audio extracted successfully (size: {audio_size_mb:.2f}MB)",
-                "audio_file_path": str(audio_path),
-                "video_segments": video_segments,
-                "total_video_segments": len(video_segments),
-                "interaction_segments": interaction_segments,
-                "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
-                "s3_urls": s3_urls
-            }
+        # Upload video segments to S3
+        s3_urls = []
+        if all_segments:
+            logger.info("☁️  Starting S3 upload for video segments...")
+            s3_urls = upload_video_segments_to_s3(all_segments)
+            logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(s3_urls)} segments uploaded")
+            # Drop the workspace once every clip is safely on S3
+            if all(upload["success"] for upload in s3_urls):
+                workspace.cleanup()
+        
+        end_time = datetime.now()
+        processing_time = (end_time - start_time).total_seconds()
+        logger.info("=" * 60)
+        logger.info("🎉 PROCESSING COMPLETED SUCCESSFULLY")
+        logger.info("=" * 60)
+        logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
+        logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
+        logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
+        logger.info(f"✂️  Created {len(chunk_files)} chunks")
+        logger.info(f"🎬 Created {len(video_segments)} regular video segments")
+        logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
+        logger.info(f"☁️  Uploaded {count_uploaded(s3_urls)}/{len(s3_urls)} segments to S3")
+        logger.info("=" * 60)
+        
+        return {
+            "message": f"Audio extracted and chunked into {len(chunk_files)} parts (total size: {audio_size_mb:.2f}MB)",
+            "chunk_files": chunk_files,
+            "total_chunks": len(chunk_files),
+            "video_segments": video_segments,
+            "total_video_segments": len(video_segments),
+            "interaction_segments": interaction_segments,
+            "total_interaction_segments": len(interaction_segments),
+            "segments_json_path": str(workspace.segments_json),
+            "s3_urls": s3_urls
+        }
     
     except Exception as e:
         logger.error(f"❌ Error processing video: {str(e)}")
@@ -1393,9 +1543,10 @@ def process_video_file(video_path: Path, filename: str) -> dict:
         if video_path.exists():
             logger.info("🗑️  Cleaning up video file due to error...")
             video_path.unlink()
-        if 'audio_path' in locals() and audio_path.exists():
-            logger.info("🗑️  Cleaning up audio file due to error...")
-            audio_path.unlink()
+        if 'chunk_files' in locals():
+            logger.info("🗑️  Cleaning up audio chunks due to error...")
+            for chunk_file in chunk_files:
+                Path(chunk_file).unlink(missing_ok=True)
         raise Exception(f"Error processing video: {str(e)}")
 
 def process_youtube_video(youtube_url: str) -> dict:
@@ -1411,8 +1562,9 @@ def process_youtube_video(youtube_url: str) -> dict:
     logger.info(f"📺 YouTube URL: {youtube_url}")
     logger.info(f"🆔 Request ID: {start_time.strftime('%Y%m%d_%H%M%S')}")
     
-    # Clean up remnant files from previous runs
-    cleanup_previous_files()
+    # Every request gets its own workspace so concurrent jobs never share files
+    workspace = JobWorkspace(JOBS_DIR).create()
+    logger.info(f"📂 Job workspace: {workspace.root}")
     
     # Validate YouTube URL
     if not is_valid_youtube_url(youtube_url):
@@ -1430,218 +1582,96 @@ def process_youtube_video(youtube_url: str) -> dict:
         video_size_mb = get_file_size_mb(video_path)
         logger.info(f"✅ Video file ready: {video_size_mb:.2f}MB")
         
-        # Extract audio using ffmpeg
+        # Extract speech-optimized audio chunks in a single ffmpeg pass
         logger.info("🎵 Starting audio extraction from YouTube video...")
         try:
-            # First, probe the input file to get the audio codec
-            logger.info("🔍 Probing video file for audio codec...")
-            probe_cmd = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'a:0',
-                '-show_entries', 'stream=codec_name',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(video_path)
-            ]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            audio_codec = probe_result.stdout.strip()
-            logger.info(f"🎼 Detected audio codec: {audio_codec}")
-            
-            file_id = str(uuid.uuid4())
-            audio_filename = f"{file_id}_youtube_audio.mp3"
-            audio_path = OUTPUT_DIR / audio_filename
-            logger.info(f"📄 Audio will be saved as: {audio_filename}")
-            
-            # Extract audio using FFmpeg
-            logger.info("⚡ Extracting audio using FFmpeg...")
-            cmd_copy = [
-                'ffmpeg',
-                '-i', str(video_path),
-                '-vn',
-                '-acodec', 'mp3',
-                '-ab', '192k',
-                '-y',
-                str(audio_path)
-            ]
-            result_copy = subprocess.run(cmd_copy, capture_output=True, text=True)
-            
-            if result_copy.returncode != 0 or not audio_path.exists() or audio_path.stat().st_size == 0:
-                logger.error(f"❌ FFmpeg extraction failed: {result_copy.stderr}")
-                raise Exception(f"FFmpeg error: {result_copy.stderr}")
-            
-            # Get extracted audio file size
-            audio_size_mb = audio_path.stat().st_size / (1024 * 1024)
-            logger.info(f"✅ Audio extraction completed successfully: {audio_size_mb:.2f}MB")
-            
+            chunk_files = extract_audio_chunks(video_path, workspace.audio_dir, "youtube")
         except Exception as e:
             logger.error(f"❌ Error extracting audio: {str(e)}")
             raise Exception(f"Error extracting audio: {str(e)}")
         
-        # Check if audio file needs chunking
-        audio_size_mb = get_file_size_mb(audio_path)
-        logger.info(f"📊 Audio file size: {audio_size_mb:.2f}MB (max before chunking: {MAX_AUDIO_SIZE_MB}MB)")
+        audio_size_mb = sum(get_file_size_mb(Path(chunk_file)) for chunk_file in chunk_files)
         
-        if audio_size_mb > MAX_AUDIO_SIZE_MB:
-            logger.info(f"✂️  Audio file exceeds {MAX_AUDIO_SIZE_MB}MB, starting chunking process...")
-            # Create chunks
-            chunk_files = chunk_audio(audio_path, OUTPUT_DIR, CHUNK_DURATION_MINUTES)
-            
-            # Clean up original large audio file
-            logger.info("🗑️  Cleaning up original large audio file...")
-            audio_path.unlink()
-            logger.info("✅ Original audio file deleted")
+        # Run transcription and topic analysis
+        logger.info("📝 Starting transcription and topic analysis...")
+        try:
+            audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                output_dir=str(workspace.audio_dir),
+                transcriptions_path=str(workspace.transcriptions_json),
+                interaction_segments_path=str(workspace.interaction_segments_json)
+            )
+            with open(workspace.segments_json, "w") as f:
+                import json
+                json.dump(segment_json, f, indent=2)
+            logger.info("✅ Topic analysis and segment creation completed!")
+        except Exception as e:
+            logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
+        
+        # Run video segment extraction after transcription
+        logger.info("🎬 Starting video segment extraction after transcription...")
+        try:
+            all_segments = run_video_segment_extraction(video_path, workspace)
+            logger.info("✅ Video segment extraction completed!")
             
-            # After chunking, run transcription and topic analysis
-            logger.info("📝 Starting transcription and topic analysis...")
-            try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
-                    import json
-                    json.dump(segment_json, f, indent=2)
-                logger.info("✅ Topic analysis and segment creation completed!")
-            except Exception as e:
-                logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
+            # Separate regular segments from interaction segments
+            video_segments = []
+            interaction_segments = []
             
-            # Run video segment extraction after transcription
-            logger.info("🎬 Starting video segment extraction after transcription...")
-            try:
-                all_segments = run_video_segment_extraction(video_path)
-                logger.info("✅ Video segment extraction completed!")
-                
-                # Separate regular segments from interaction segments
-                video_segments = []
-                interaction_segments = []
-                
-                for segment_path in all_segments:
-                    segment_file = Path(segment_path)
-                    if "interactions" in str(segment_file):
-                        interaction_segments.append(segment_path)
-                    else:
-                        video_segments.append(segment_path)
-                
-                # Clean up intermediate files after successful video segment extraction
-                if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
+            for segment_path in all_segments:
+                segment_file = Path(segment_path)
+                if "interactions" in str(segment_file):
+                    interaction_segments.append(segment_path)
                 else:
-                    logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
-                video_segments = []
-                interaction_segments = []
-
-            # Upload video segments to S3
-            s3_urls = []
-            if all_segments:
-                logger.info("☁️  Starting S3 upload for video segments...")
-                s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
-            
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            logger.info("=" * 60)
-            logger.info("🎉 YOUTUBE VIDEO PROCESSING COMPLETED SUCCESSFULLY")
-            logger.info("=" * 60)
-            logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
-            logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
-            logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
-            logger.info(f"✂️  Created {len(chunk_files)} chunks")
-            logger.info(f"🎬 Created {len(video_segments)} regular video segments")
-            logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
-            logger.info("=" * 60)
-            
-            return {
-                "message": f"YouTube video processed successfully. Audio chunked into {len(chunk_files)} parts (original size: {audio_size_mb:.2f}MB)",
-                "youtube_url": youtube_url,
-                "chunk_files": chunk_files,
-                "total_chunks": len(chunk_files),
-                "video_segments": video_segments,
-                "total_video_segments": len(video_segments),
-                "interaction_segments": interaction_segments,
-                "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
-                "s3_urls": s3_urls,
-                "processing_time_seconds": processing_time
-            }
-        else:
-            logger.info(f"✅ Audio file is under {MAX_AUDIO_SIZE_MB}MB, no chunking needed")
+                    video_segments.append(segment_path)
             
-            # After chunking, run transcription and topic analysis
-            logger.info("📝 Starting transcription and topic analysis...")
-            try:
-                audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR))
-                logger.info("✅ Transcription completed. Now analyzing topics...")
-                segment_json = transcribe_segments.create_segment_json(audio_files)
-                with open("segments.json", "w") as f:
-                    import json
-                    json.dump(segment_json, f, indent=2)
-                logger.info("✅ Topic analysis and segment creation completed!")
-            except Exception as e:
-                logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
-
-            # Run video segment extraction after transcription
-            logger.info("🎬 Starting video segment extraction after transcription...")
-            try:
-                all_segments = run_video_segment_extraction(video_path)
-                logger.info("✅ Video segment extraction completed!")
-                
-                # Separate regular segments from interaction segments
-                video_segments = []
-                interaction_segments = []
-                
-                for segment_path in all_segments:
-                    segment_file = Path(segment_path)
-                    if "interactions" in str(segment_file):
-                        interaction_segments.append(segment_path)
-                    else:
-                        video_segments.append(segment_path)
+            # Clean up intermediate files after successful video segment extraction
+            if all_segments:
+                cleanup_intermediate_files(video_path, workspace)
+            else:
+                logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
                 
-                # Clean up intermediate files after successful video segment extraction
-                if all_segments:
-                    cleanup_intermediate_files(video_path, audio_path)
-                else:
-                    logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
-                video_segments = []
-                interaction_segments = []
+        except Exception as e:
+            logger.error(f"❌ Error during video segment extraction after transcription: {str(e)}")
+            video_segments = []
+            interaction_segments = []
 
-            # Upload video segments to S3
-            s3_urls = []
-            if all_segments:
-                logger.info("☁️  Starting S3 upload for video segments...")
-                s3_urls = upload_video_segments_to_s3(all_segments)
-                logger.info(f"✅ S3 upload completed: {len(s3_urls)} segments uploaded")
-            
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            logger.info("=" * 60)
-            logger.info("🎉 YOUTUBE VIDEO PROCESSING COMPLETED SUCCESSFULLY")
-            logger.info("=" * 60)
-            logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
-            logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
-            logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
-            logger.info(f"🎬 Created {len(video_segments)} regular video segments")
-            logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
-            logger.info(f"☁️  Uploaded {len(s3_urls)} segments to S3")
-            logger.info("=" * 60)
-            
-            return {
-                "message": f"YouTube video processed successfully (audio size: {audio_size_mb:.2f}MB)",
-                "youtube_url": youtube_url,
-                "audio_file_path": str(audio_path),
-                "video_segments": video_segments,
-                "total_video_segments": len(video_segments),
-                "interaction_segments": interaction_segments,
-                "total_interaction_segments": len(interaction_segments),
-                "segments_json_path": "segments.json",
-                "s3_urls": s3_urls,
-                "processing_time_seconds": processing_time
-            }
+        # Upload video segments to S3
+        s3_urls = []
+        if all_segments:
+            logger.info("☁️  Starting S3 upload for video segments...")
+            s3_urls = upload_video_segments_to_s3(all_segments)
+            logger.info(f"✅ S3 upload completed: {count_uploaded(s3_urls)}/{len(s3_urls)} segments uploaded")
+            # Drop the workspace once every clip is safely on S3
+            if all(upload["success"] for upload in s3_urls):
+                workspace.cleanup()
+        
+        end_time = datetime.now()
+        processing_time = (end_time - start_time).total_seconds()
+        logger.info("=" * 60)
+        logger.info("🎉 YOUTUBE VIDEO PROCESSING COMPLETED SUCCESSFULLY")
+        logger.info("=" * 60)
+        logger.info(f"⏱️  Total processing time: {processing_time:.2f} seconds")
+        logger.info(f"📊 Original video size: {video_size_mb:.2f}MB")
+        logger.info(f"🎵 Extracted audio size: {audio_size_mb:.2f}MB")
+        logger.info(f"✂️  Created {len(chunk_files)} chunks")
+        logger.info(f"🎬 Created {len(video_segments)} regular video segments")
+        logger.info(f"💬 Created {len(interaction_segments)} interaction segments")
+        logger.info(f"☁️  Uploaded {count_uploaded(s3_urls)}/{len(s3_urls)} segments to S3")
+        logger.info("=" * 60)
+        
+        return {
+            "message": f"YouTube video processed successfully. Audio chunked into {len(chunk_files)} parts (total size: {audio_size_mb:.2f}MB)",
+            "youtube_url": youtube_url,
+            "chunk_files": chunk_files,
+            "total_chunks": len(chunk_files),
+            "video_segments": video_segments,
+            "total_video_segments": len(video_segments),
+            "interaction_segments": interaction_segments,
+            "total_interaction_segments": len(interaction_segments),
+            "segments_json_path": str(workspace.segments_json),
+            "s3_urls": s3_urls,
+            "processing_time_seconds": processing_time
+        }
     
     except Exception as e:
         logger.error(f"❌ Error processing YouTube video: {str(e)}")
@@ -1649,9 +1679,10 @@ def process_youtube_video(youtube_url: str) -> dict:
         if 'video_path' in locals() and video_path is not None and video_path.exists():
             logger.info("🗑️  Cleaning up video file due to error...")
             video_path.unlink()
-        if 'audio_path' in locals() and audio_path is not None and audio_path.exists():
-            logger.info("🗑️  Cleaning up audio file due to error...")
-            audio_path.unlink()
+        if 'chunk_files' in locals():
+            logger.info("🗑️  Cleaning up audio chunks due to error...")
+            for chunk_file in chunk_files:
+                Path(chunk_file).unlink(missing_ok=True)
         raise Exception(f"Error processing YouTube video: {str(e)}")
 
 # Web endpoints
@@ -1705,6 +1736,105 @@ async def get_presigned_url_endpoint(request: PresignedUrlRequest):
         logger.error(f"❌ Error in get_presigned_url_endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating presigned URL: {str(e)}")
 
+@app.function(
+    image=image,
+    cpu=1.0,  # Minimal CPU for presigned URL generation
+    memory=1024,  # Minimal RAM for presigned URL generation
+    timeout=300,  # 5 minutes timeout
+    secrets=[secret]
+)
+@modal.fastapi_endpoint(method="POST")
+async def multipart_upload_endpoint(request: MultipartUploadRequest):
+    """
+    Browser-side multipart upload of large videos. The browser creates an upload, asks for presigned
+    part URLs in batches, PUTs the parts to S3 in parallel and completes (or aborts) the upload; "list"
+    returns the parts S3 already has so an interrupted upload can be resumed.
+    """
+    s3_client = get_s3_client()
+    if not s3_client:
+        raise HTTPException(status_code=500, detail="S3 client not available")
+    
+    if request.action == "create":
+        if not request.filename or not request.file_size:
+            raise HTTPException(status_code=400, detail="filename and file_size are required")
+        if request.file_size > MAX_FILE_SIZE_GB * 1024 * 1024 * 1024:
+            raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_FILE_SIZE_GB}GB limit")
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        s3_key = f"videos/{timestamp}_{uuid.uuid4()}_{request.filename}"
+        part_size = multipart_part_size(request.file_size)
+        try:
+            response = s3_client.create_multipart_upload(Bucket=S3_BUCKET_NAME, Key=s3_key, ContentType=request.content_type)
+        except Exception as e:
+            logger.error(f"❌ Failed to create multipart upload: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to create multipart upload: {str(e)}")
+        
+        logger.info(f"🔄 Created browser multipart upload for {request.filename} ({request.file_size / (1024*1024):.2f}MB)")
+        return {
+            "upload_id": response['UploadId'],
+            "s3_key": s3_key,
+            "s3_url": f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{s3_key}",
+            "part_size": part_size,
+            "total_parts": (request.file_size + part_size - 1) // part_size
+        }
+    
+    # Every other action works on an existing upload, which must be one of ours
+    if not request.s3_key or not request.upload_id:
+        raise HTTPException(status_code=400, detail="s3_key and upload_id are required")
+    if not request.s3_key.startswith("videos/"):
+        raise HTTPException(status_code=403, detail="Uploads are only allowed under videos/")
+    
+    try:
+        if request.action == "presign":
+            part_numbers = request.part_numbers or []
+            if not part_numbers or len(part_numbers) > MAX_PRESIGN_BATCH or any(not 1 <= number <= MULTIPART_MAX_PARTS for number in part_numbers):
+                raise HTTPException(status_code=400, detail=f"Request 1-{MAX_PRESIGN_BATCH} part numbers between 1 and {MULTIPART_MAX_PARTS}")
+            urls = {
+                str(number): s3_client.generate_presigned_url(
+                    'upload_part',
+                    Params={'Bucket': S3_BUCKET_NAME, 'Key': request.s3_key, 'UploadId': request.upload_id, 'PartNumber': number},
+                    ExpiresIn=PRESIGNED_PART_EXPIRY
+                )
+                for number in part_numbers
+            }
+            return {"urls": urls, "expires_in": PRESIGNED_PART_EXPIRY}
+        
+        if request.action == "list":
+            parts = []
+            paginator = s3_client.get_paginator('list_parts')
+            for page in paginator.paginate(Bucket=S3_BUCKET_NAME, Key=request.s3_key, UploadId=request.upload_id):
+                parts.extend({"PartNumber": part['PartNumber'], "ETag": part['ETag'], "Size": part['Size']} for part in page.get('Parts', []))
+            return {"parts": parts}
+        
+        if request.action == "complete":
+            if not request.parts:
+                raise HTTPException(status_code=400, detail="parts are required")
+            parts = sorted(({"PartNumber": int(part["PartNumber"]), "ETag": part["ETag"]} for part in request.parts), key=lambda part: part["PartNumber"])
+            s3_client.complete_multipart_upload(
+                Bucket=S3_BUCKET_NAME,
+                Key=request.s3_key,
+                UploadId=request.upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+            s3_url = f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{request.s3_key}"
+            logger.info(f"✅ Browser multipart upload completed ({len(parts)} parts): {s3_url}")
+            return {"s3_url": s3_url, "s3_key": request.s3_key}
+        
+        if request.action == "abort":
+            s3_client.abort_multipart_upload(Bucket=S3_BUCKET_NAME, Key=request.s3_key, UploadId=request.upload_id)
+            logger.info(f"🔄 Aborted browser multipart upload {request.upload_id}")
+            return {"aborted": True}
+    except HTTPException:
+        raise
+    except ClientError as e:
+        # NoSuchUpload tells the browser its saved upload is gone and it has to start over
+        code = e.response.get('Error', {}).get('Code', '')
+        status_code = 404 if code == 'NoSuchUpload' else 500
+        logger.error(f"❌ Multipart {request.action} failed: {e}")
+        raise HTTPException(status_code=status_code, detail=f"Multipart {request.action} failed: {code or str(e)}")
+    
+    raise HTTPException(status_code=400, detail=f"Unknown action: {request.action}")
+
 @app.function(
     image=image,
     cpu=1.0,  # Minimal CPU for job creation
@@ -1715,25 +1845,30 @@ async def get_presigned_url_endpoint(request: PresignedUrlRequest):
 )
 @modal.fastapi_endpoint(method="POST")
 async def extract_audio_endpoint(request: S3UploadRequest):
-    """Start video processing and return immediately with S3 URL hash for progress tracking"""
+    """Start video processing and return immediately with the job id for progress tracking"""
     print("🚀 extract_audio_endpoint called")
     print(f"☁️  S3 URL: {request.s3_url}")
     
     logger.info("🚀 extract_audio_endpoint called")
     logger.info(f"☁️  S3 URL: {request.s3_url}")
     
+    # Only job ids we handed out can be resumed (they name a directory on the volume)
+    if request.resume_job_id and not re.fullmatch(r"[0-9a-f]{32}", request.resume_job_id):
+        raise HTTPException(status_code=400, detail="Invalid resume_job_id")
+    
     try:
-        # Hash the S3 URL for queue key
-        queue_key = hash_s3_url(request.s3_url)
-        logger.info(f"🔑 Queue key generated: {queue_key}")
+        # Every run gets its own job id (and workspace); a resumed run reuses the id of the run it resumes
+        job_id = request.resume_job_id or uuid.uuid4().hex
         
-        # Send initial progress update
-        send_progress_update(request.s3_url, "pending", "Video processing job started successfully", 0.0)
+        # Progress is published on the job's own channel, so concurrent runs of one URL never mix
+        # (a resumed run starts its channel afresh so subscribers don't replay the failed attempt)
+        reset_progress_channel(job_id)
+        send_progress_update(job_id, "pending", "Video processing job started successfully", 0.0)
         
         # Prepare response data
         response_data = {
             "s3_url": request.s3_url,
-            "queue_key": queue_key,
+            "job_id": job_id,
             "status": "pending",
             "message": "Video processing job started successfully",
             "progress": 0.0
@@ -1754,19 +1889,21 @@ async def extract_audio_endpoint(request: S3UploadRequest):
                     if is_youtube_url(request.s3_url):
                         logger.info(f"🎬 Detected YouTube URL: {request.s3_url}")
                         # Download YouTube video and process through S3 pipeline
-                        process_video_background.remote(request.s3_url, request.video_type, request.cookies_content)
+                        process_video_background.remote(request.s3_url, request.video_type, request.cookies_content, request.combined_analysis,
+                                                        job_id=job_id, resume=bool(request.resume_job_id))
                         logger.info("✅ YouTube download and S3 processing triggered successfully")
                     else:
                         logger.info(f"☁️  Detected S3 URL: {request.s3_url}")
                         # Call S3 processing function
-                        process_video_background.remote(request.s3_url, request.video_type)
+                        process_video_background.remote(request.s3_url, request.video_type, combined_analysis=request.combined_analysis,
+                                                        job_id=job_id, resume=bool(request.resume_job_id))
                         logger.info("✅ S3 background processing triggered successfully")
                     break  # Success, exit retry loop
                 except Exception as remote_error:
                     logger.error(f"❌ Remote function call failed (attempt {attempt + 1}/{max_retries}): {str(remote_error)}")
                     if attempt == max_retries - 1:  # Last attempt
-                        # Send error update to queue
-                        send_progress_update(request.s3_url, "failed", f"Failed to start background processing after {max_retries} attempts: {str(remote_error)}", error=str(remote_error))
+                        # Send error update to the job's progress channel
+                        send_progress_update(job_id, "failed", f"Failed to start background processing after {max_retries} attempts: {str(remote_error)}", error=str(remote_error))
                     else:
                         # Wait before retrying
                         time.sleep(retry_delay)
@@ -1793,41 +1930,54 @@ async def extract_audio_endpoint(request: S3UploadRequest):
     secrets=[secret]
 )
 @modal.fastapi_endpoint(method="GET")
-async def progress_stream_endpoint(s3_url: str):
-    """Stream real-time progress updates for a given S3 URL"""
+async def progress_stream_endpoint(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """Stream real-time progress updates for a job (the job_id returned by extract_audio_endpoint)"""
+    if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+        raise HTTPException(status_code=400, detail="Invalid job_id")
+    
     try:
-        logger.info(f"📊 Starting progress stream for S3 URL: {s3_url}")
+        logger.info(f"📊 Starting progress stream for job: {job_id}")
+        queue_key = job_id
         
-        # Hash the S3 URL to get the queue key
-        queue_key = hash_s3_url(s3_url)
-        logger.info(f"🔑 Queue key for streaming: {queue_key}")
+        # EventSource sends Last-Event-ID on reconnect; resume after it instead of replaying everything
+        start_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+        head_key, start_key = f"{queue_key}:head", f"{queue_key}:start"
         
         async def generate_progress_stream():
             """Generate Server-Sent Events stream for progress updates"""
             try:
                 # Send initial connection message
-                yield f"data: {json.dumps({'type': 'connection', 'message': 'Connected to progress stream', 's3_url': s3_url})}\n\n"
+                yield f"data: {json.dumps({'type': 'connection', 'message': 'Connected to progress stream', 'job_id': job_id})}\n\n"
                 
-                # Stream progress updates from the queue
+                # Replay the job's recent history (late subscribers get the current state immediately),
+                # then poll the channel for updates newer than the last one sent
+                head = await progress_state.get.aio(head_key) or 0
+                run_start = await progress_state.get.aio(start_key) or 1
+                last_seq = max(start_seq, run_start - 1, head - PROGRESS_HISTORY_SIZE)
+                last_sent = time.monotonic()
                 while True:
-                    try:
-                        # Get the next update from the queue (non-blocking)
-                        update = progress_queue.get(timeout=1.0)
-                        if update:
-                            received_key, update_data = update
-                            
-                            # Only send updates for this specific S3 URL
-                            if received_key == queue_key:
-                                yield f"data: {json.dumps(update_data)}\n\n"
-                                
-                                # If the status is completed or failed, end the stream
-                                if update_data.get('status') in ['completed', 'failed']:
-                                    logger.info(f"📊 Progress stream completed for S3 URL: {s3_url}")
-                                    break
-                    except Exception as queue_error:
-                        # If no update available, send a heartbeat
+                    update_data = await progress_state.get.aio(f"{queue_key}:{last_seq + 1}")
+                    if update_data is not None:
+                        yield f"id: {update_data['seq']}\ndata: {json.dumps(update_data)}\n\n"
+                        last_seq = update_data["seq"]
+                        last_sent = time.monotonic()
+                        
+                        # If the status is completed or failed, end the stream
+                        if update_data.get('status') in TERMINAL_PROGRESS_STATUSES:
+                            logger.info(f"📊 Progress stream completed for job: {job_id}")
+                            break
+                        continue
+                    
+                    # A seq is only missing below the head once it was trimmed or dropped, so skip over it
+                    if (await progress_state.get.aio(head_key) or 0) > last_seq:
+                        last_seq += 1
+                        continue
+                    
+                    # Send a heartbeat when nothing happened for a while
+                    if time.monotonic() - last_sent >= PROGRESS_HEARTBEAT_SECONDS:
                         yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now().isoformat()})}\n\n"
-                        await asyncio.sleep(1)
+                        last_sent = time.monotonic()
+                    await asyncio.sleep(PROGRESS_POLL_INTERVAL)
                         
             except Exception as e:
                 logger.error(f"❌ Error in progress stream: {str(e)}")
@@ -1849,6 +1999,82 @@ async def progress_stream_endpoint(s3_url: str):
         logger.error(f"❌ Error starting progress stream: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error starting progress stream: {str(e)}")
 
+def finish_video_processing(s3_url: str, workspace: JobWorkspace, video_path: Path, chunk_files: List[str],
+                            video_segments: List[str], interaction_segments: List[str], s3_urls: List[dict]) -> dict:
+    """Clean up a run whose clips are cut and uploaded, and return its result"""
+    all_segments = video_segments + interaction_segments
+    
+    # Clean up intermediate files after successful video segment extraction
+    if all_segments:
+        cleanup_intermediate_files(video_path, workspace)
+    else:
+        logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
+    
+    # Final result
+    result = {
+        "message": f"Video processed successfully",
+        "s3_url": s3_url,
+        "job_id": workspace.job_id,
+        "chunk_files": chunk_files,
+        "total_chunks": len(chunk_files),
+        "video_segments": video_segments,
+        "total_video_segments": len(video_segments),
+        "interaction_segments": interaction_segments,
+        "total_interaction_segments": len(interaction_segments),
+        "segments_json_path": str(workspace.segments_json),
+        "s3_urls": s3_urls
+    }
+    
+    # Clean up checkpoint file after successful completion
+    checkpoint_file = workspace.checkpoint_json
+    if checkpoint_file.exists():
+        try:
+            checkpoint_file.unlink()
+            logger.info("🗑️  Checkpoint file cleaned up after successful completion")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not clean up checkpoint file: {e}")
+    
+    # Drop the workspace once every clip is safely on S3
+    if all_segments and all(upload["success"] for upload in s3_urls):
+        workspace.cleanup()
+    return result
+
+def resume_from_checkpoint(s3_url: str, workspace: JobWorkspace, checkpoint: dict) -> Optional[dict]:
+    """
+    Finish a failed run from its checkpoint: cut the clips again if the run stopped before they were done,
+    upload whatever is not on S3 yet and clean up. Returns None when the checkpoint cannot be resumed.
+    """
+    stage = checkpoint.get("stage")
+    video_path = Path(checkpoint.get("video_path", ""))
+    if checkpoint.get("s3_url") != s3_url or stage not in ("transcription_completed", "video_segments_completed") or not video_path.is_file():
+        return None
+    
+    chunk_files = checkpoint.get("chunk_files", [])
+    if stage == "transcription_completed":
+        logger.info("✅ Transcription already completed, skipping to video segments...")
+        send_progress_update(workspace.job_id, "running", "Transcription completed, extracting video segments...", 85.0)
+        all_segments = run_video_segment_extraction(video_path, workspace)
+        video_segments = [path for path in all_segments if Path(path).parent != workspace.interaction_segments_dir]
+        interaction_segments = [path for path in all_segments if Path(path).parent == workspace.interaction_segments_dir]
+        send_progress_update(workspace.job_id, "running", "Uploading video segments to S3...", 95.0)
+        s3_urls = upload_video_segments_to_s3(all_segments)
+    else:
+        logger.info("✅ Video segments already completed and uploaded, finishing up...")
+        send_progress_update(workspace.job_id, "running", "Video segments completed, finishing up...", 95.0)
+        video_segments = checkpoint.get("video_segments", [])
+        interaction_segments = checkpoint.get("interaction_segments", [])
+        s3_urls = checkpoint.get("s3_urls", [])
+        # s3_urls has one entry per clip, in video_segments + interaction_segments order
+        failed = [index for index, upload in enumerate(s3_urls) if not upload["success"]]
+        if failed:
+            logger.info(f"🔄 Retrying {len(failed)} failed segment uploads...")
+            all_segments = video_segments + interaction_segments
+            retried = upload_video_segments_to_s3([all_segments[index] for index in failed])
+            for index, upload in zip(failed, retried):
+                s3_urls[index] = upload
+
+    return finish_video_processing(s3_url, workspace, video_path, chunk_files, video_segments, interaction_segments, s3_urls)
+
 @app.function(
     image=image,
     cpu=4.0,  # 4 CPU cores for heavy video processing
@@ -1857,206 +2083,166 @@ async def progress_stream_endpoint(s3_url: str):
     volumes={"/data": volume},
     secrets=[secret]
 )
-def process_video_background(s3_url: str, video_type: str = "live", cookies_content: Optional[str] = None):
-    """Background function to process video with real-time progress updates via Modal Queue"""
+def process_video_background(s3_url: str, video_type: str = "live", cookies_content: Optional[str] = None, combined_analysis: Optional[bool] = None,
+                             job_id: Optional[str] = None, resume: bool = False):
+    """
+    Background function to process video with real-time progress updates via its progress channel.
+    Every run works in its own workspace (job_id); with resume=True a failed run with that job_id
+    continues from its checkpoint instead of starting over.
+    """
+    # The job id names both the workspace and the progress channel the caller subscribed to
+    job_id = job_id or uuid.uuid4().hex
+    # Full video download running alongside audio extraction (STREAM_AUDIO_FROM_S3)
+    video_future = None
+    download_cancelled = threading.Event()
+    workspace = None
+    checkpoint_saved = False
     try:
         logger.info(f"🚀 Starting background processing for S3 URL: {s3_url}")
         
-        # Check for existing checkpoint
-        checkpoint_file = Path("processing_checkpoint.json")
-        if checkpoint_file.exists():
-            try:
-                with open(checkpoint_file, "r") as f:
-                    import json
-                    checkpoint = json.load(f)
-                    if checkpoint.get("s3_url") == s3_url:
-                        logger.info("🔄 Found existing checkpoint, resuming processing...")
-                        # Resume from checkpoint
-                        current_stage = checkpoint.get("stage", "start")
-                        if current_stage == "transcription_completed":
-                            logger.info("✅ Transcription already completed, skipping to video segments...")
-                            send_progress_update(s3_url, "running", "Transcription completed, extracting video segments...", 85.0)
-                            # Skip to video segment extraction
-                            video_path = Path(checkpoint.get("video_path"))
-                            all_segments = run_video_segment_extraction(video_path)
-                            # Continue with rest of processing...
-                        elif current_stage == "video_segments_completed":
-                            logger.info("✅ Video segments already completed, skipping to S3 upload...")
-                            send_progress_update(s3_url, "running", "Video segments completed, uploading to S3...", 95.0)
-                            # Skip to S3 upload
-                            # Continue with rest of processing...
-            except Exception as e:
-                logger.warning(f"⚠️  Error reading checkpoint: {e}, starting fresh...")
+        workspace = JobWorkspace(JOBS_DIR, job_id)
+        logger.info(f"📂 Job workspace: {workspace.root}")
+        
+        if resume:
+            checkpoint = workspace.read_json(workspace.checkpoint_json)
+            result = resume_from_checkpoint(s3_url, workspace, checkpoint) if checkpoint else None
+            if result is not None:
+                send_progress_update(job_id, "completed", "Video processing completed successfully!", 100.0, result)
+                logger.info(f"✅ Resumed processing completed for S3 URL: {s3_url}")
+                return
+            logger.warning(f"⚠️  No resumable checkpoint for job {workspace.job_id}, starting fresh...")
         
-        # Clean up remnant files from previous runs
-        cleanup_previous_files()
+        # Clean up remnant files of an earlier run of this job (only when a resume fell back to a fresh start)
+        workspace.reset()
         
         # Send initial progress update
-        send_progress_update(s3_url, "running", "Starting video processing...", 5.0)
+        send_progress_update(job_id, "running", "Starting video processing...", 5.0)
         
-        # Create directories
-        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        VIDEO_SEGMENTS_DIR.mkdir(parents=True, exist_ok=True)
+        def report_download(downloaded: int, total: int):
+            # Progress between 15% and 30%
+            send_progress_update(job_id, "running", f"Downloading video from S3... {downloaded / total:.0%}", 15.0 + 15.0 * downloaded / total)
         
         # Check if it's a YouTube URL or S3 URL
         if is_youtube_url(s3_url):
-            send_progress_update(s3_url, "running", "Downloading YouTube video...", 15.0)
+            send_progress_update(job_id, "running", "Downloading YouTube video...", 15.0)
             # Download YouTube video
-            video_path = download_youtube_video(s3_url, UPLOAD_DIR, cookies_content)
+            video_path = download_youtube_video(s3_url, workspace.input_dir, cookies_content)
             if not video_path:
                 raise Exception("Failed to download YouTube video")
+        elif STREAM_AUDIO_FROM_S3:
+            # Only the audio is needed to start transcribing; the full video (for clip cutting) downloads alongside
+            send_progress_update(job_id, "running", "Extracting audio from S3 while the video downloads...", 15.0)
+            download_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="s3-download")
+            video_future = download_executor.submit(download_video_from_s3, s3_url, workspace.input_dir, report_download, download_cancelled)
+            download_executor.shutdown(wait=False)
+            video_path = video_future
         else:
-            send_progress_update(s3_url, "running", "Downloading video from S3...", 15.0)
-            # Download video from S3
-            video_path = download_video_from_s3(s3_url, UPLOAD_DIR)
+            send_progress_update(job_id, "running", "Downloading video from S3...", 15.0)
+            video_path = download_video_from_s3(s3_url, workspace.input_dir, report_download)
             if not video_path:
                 raise Exception("Failed to download video from S3")
         
-        send_progress_update(s3_url, "running", "Extracting audio...", 30.0)
+        send_progress_update(job_id, "running", "Extracting audio...", 30.0)
         
-        # Extract audio
-        file_id = str(uuid.uuid4())
-        audio_filename = f"{file_id}_s3_audio.mp3"
-        audio_path = OUTPUT_DIR / audio_filename
-        
-        cmd = [
-            'ffmpeg',
-            '-i', str(video_path),
-            '-vn',
-            '-acodec', 'mp3',
-            '-ab', '192k',
-            '-y',
-            str(audio_path)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            raise Exception(f"FFmpeg error: {result.stderr}")
-        
-        send_progress_update(s3_url, "running", "Processing audio chunks...", 50.0)
-        
-        # Process audio chunks
-        audio_size_mb = get_file_size_mb(audio_path)
-        logger.info(f"📊 Audio file size: {audio_size_mb:.2f}MB (max before chunking: {MAX_AUDIO_SIZE_MB}MB)")
-        
-        if audio_size_mb > MAX_AUDIO_SIZE_MB:
-            logger.info(f"✂️  Audio file exceeds {MAX_AUDIO_SIZE_MB}MB, starting chunking process...")
-            # Create chunks
-            chunk_files = chunk_audio(audio_path, OUTPUT_DIR, CHUNK_DURATION_MINUTES)
-            
-            # Clean up original large audio file
-            logger.info("🗑️  Cleaning up original large audio file...")
-            audio_path.unlink()
-            logger.info("✅ Original audio file deleted")
+        # Extract speech-optimized audio chunks in a single ffmpeg pass
+        if video_future:
+            chunk_files = extract_audio_chunks_from_s3(s3_url, video_future, workspace.audio_dir)
         else:
-            logger.info(f"✅ Audio file is under {MAX_AUDIO_SIZE_MB}MB, no chunking needed")
-            chunk_files = [str(audio_path)]
+            chunk_files = extract_audio_chunks(video_path, workspace.audio_dir, "s3")
         
-        send_progress_update(s3_url, "running", "Transcribing audio...", 70.0)
+        send_progress_update(job_id, "running", "Transcribing and analysing audio...", 70.0)
         
         # Transcribe audio
         import sys
         sys.path.append("/root")
         import transcribe_segments
         
+        # Clips are cut and uploaded as soon as their segment is final, while later chunks are still analysed
+        clips = StreamingClipPipeline(video_path, workspace, job_id)
         try:
-            audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR), video_type=video_type)
-            logger.info("✅ Transcription completed. Now analyzing topics...")
-            segment_json = transcribe_segments.create_segment_json(audio_files, video_type)
-            with open("segments.json", "w") as f:
+            audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                output_dir=str(workspace.audio_dir),
+                video_type=video_type,
+                transcriptions_path=str(workspace.transcriptions_json),
+                interaction_segments_path=str(workspace.interaction_segments_json),
+                chunk_transcriber=get_chunk_transcriber(),
+                on_segment=clips.submit,
+                combined_analysis=combined_analysis
+            )
+            with open(workspace.segments_json, "w") as f:
                 import json
                 json.dump(segment_json, f, indent=2)
             logger.info("✅ Topic analysis and segment creation completed!")
             
-            # Save checkpoint after transcription
-            checkpoint_data = {
-                "s3_url": s3_url,
-                "stage": "transcription_completed",
-                "video_path": str(video_path),
-                "timestamp": datetime.now().isoformat()
-            }
-            with open("processing_checkpoint.json", "w") as f:
-                import json
-                json.dump(checkpoint_data, f, indent=2)
-            logger.info("💾 Checkpoint saved: transcription completed")
-            
         except Exception as e:
+            # Cancel the download first: clips in flight are waiting for it and would otherwise cut orphan clips
+            download_cancelled.set()
+            clips.abort()
             logger.error(f"❌ Error during transcription or topic analysis: {str(e)}")
             raise Exception(f"Transcription failed: {str(e)}")
         
-        send_progress_update(s3_url, "running", "Extracting video segments...", 85.0)
-        
-        # Extract video segments
-        all_segments = run_video_segment_extraction(video_path)
-        
-        # Separate segments
-        video_segments = []
-        interaction_segments = []
-        for segment_path in all_segments:
-            segment_file = Path(segment_path)
-            if "interactions" in str(segment_file):
-                interaction_segments.append(segment_path)
-            else:
-                video_segments.append(segment_path)
+        if video_future:
+            # Clip cutting, cleanup and the checkpoint need the full video from the parallel download
+            video_path = video_future.result()
+            if not video_path:
+                clips.abort()
+                raise Exception("Failed to download video from S3")
         
-        # Save checkpoint after video segment extraction
+        # Save checkpoint after transcription
         checkpoint_data = {
             "s3_url": s3_url,
-            "stage": "video_segments_completed",
+            "stage": "transcription_completed",
             "video_path": str(video_path),
-            "video_segments": video_segments,
-            "interaction_segments": interaction_segments,
+            "chunk_files": chunk_files,
             "timestamp": datetime.now().isoformat()
         }
-        with open("processing_checkpoint.json", "w") as f:
-            import json
-            json.dump(checkpoint_data, f, indent=2)
-        logger.info("💾 Checkpoint saved: video segments completed")
+        workspace.write_json(workspace.checkpoint_json, checkpoint_data)
+        # From here on the video belongs to the checkpoint: a failed run keeps it for a resume
+        checkpoint_saved = True
+        logger.info("💾 Checkpoint saved: transcription completed")
         
-        send_progress_update(s3_url, "running", "Uploading segments to S3...", 95.0)
-        
-        # Upload to S3
-        s3_urls = []
-        if all_segments:
-            s3_urls = upload_video_segments_to_s3(all_segments)
+        send_progress_update(job_id, "running", "Finishing video segments and uploads...", 85.0)
         
-        # Clean up intermediate files after successful video segment extraction
-        if all_segments:
-            cleanup_intermediate_files(video_path, audio_path)
-        else:
-            logger.warning("⚠️  No video segments created, keeping intermediate files for debugging")
+        # Wait for the clips still being cut or uploaded
+        video_segments, interaction_segments, s3_urls = clips.finish()
         
-        # Final result
-        result = {
-            "message": f"Video processed successfully",
+        # Save checkpoint after video segment extraction
+        checkpoint_data = {
             "s3_url": s3_url,
+            "stage": "video_segments_completed",
+            "video_path": str(video_path),
             "chunk_files": chunk_files,
-            "total_chunks": len(chunk_files),
             "video_segments": video_segments,
-            "total_video_segments": len(video_segments),
             "interaction_segments": interaction_segments,
-            "total_interaction_segments": len(interaction_segments),
-            "segments_json_path": "segments.json",
-            "s3_urls": s3_urls
+            "s3_urls": s3_urls,
+            "timestamp": datetime.now().isoformat()
         }
+        workspace.write_json(workspace.checkpoint_json, checkpoint_data)
+        logger.info("💾 Checkpoint saved: video segments completed")
         
-        # Clean up checkpoint file after successful completion
-        checkpoint_file = Path("processing_checkpoint.json")
-        if checkpoint_file.exists():
-            try:
-                checkpoint_file.unlink()
-                logger.info("🗑️  Checkpoint file cleaned up after successful completion")
-            except Exception as e:
-                logger.warning(f"⚠️  Could not clean up checkpoint file: {e}")
-        
-        send_progress_update(s3_url, "completed", "Video processing completed successfully!", 100.0, result)
+        result = finish_video_processing(s3_url, workspace, video_path, chunk_files, video_segments, interaction_segments, s3_urls)
+        send_progress_update(job_id, "completed", "Video processing completed successfully!", 100.0, result)
         logger.info(f"✅ Background processing completed for S3 URL: {s3_url}")
         
     except Exception as e:
         logger.error(f"❌ Background processing failed for S3 URL {s3_url}: {str(e)}")
+        if video_future and not checkpoint_saved:
+            # Stop the background download and remove whatever it wrote
+            download_cancelled.set()
+            try:
+                downloaded_path = video_future.result()
+                if downloaded_path:
+                    downloaded_path.unlink(missing_ok=True)
+                    logger.info(f"🗑️  Deleted downloaded video: {downloaded_path.name}")
+            except Exception as cleanup_error:
+                logger.warning(f"⚠️  Could not clean up the background download: {cleanup_error}")
+        if workspace and not checkpoint_saved:
+            # Nothing to resume from, so nothing of this run is worth keeping
+            workspace.cleanup()
         try:
-            send_progress_update(s3_url, "failed", f"Processing failed: {str(e)}", error=str(e))
+            # A run that saved a checkpoint can be resumed by sending its job_id as resume_job_id
+            failure = {"job_id": workspace.job_id, "resumable": checkpoint_saved} if workspace else None
+            send_progress_update(job_id, "failed", f"Processing failed: {str(e)}", result=failure, error=str(e))
         except Exception as update_error:
             logger.error(f"❌ Failed to send error update for S3 URL {s3_url}: {str(update_error)}")
 
@@ -2099,11 +2285,6 @@ def generate_presigned_url(filename: str, content_type: str = "video/mp4") -> Op
         logger.error(f"❌ Error generating presigned URL: {e}")
         return None
 
-# Helper function to hash S3 URL for queue key
-def hash_s3_url(s3_url: str) -> str:
-    """Hash S3 URL to use as queue key"""
-    return hashlib.md5(s3_url.encode()).hexdigest()
-
 def is_youtube_url(url: str) -> bool:
     """Check if the URL is a YouTube URL"""
     youtube_patterns = [
@@ -2121,13 +2302,31 @@ def is_youtube_url(url: str) -> bool:
             return True
     return False
 
-# Progress update function
-def send_progress_update(s3_url: str, status: str, message: str, progress: float = None, result: dict = None, error: str = None):
-    """Send progress update to Modal Queue"""
+# Progress update functions
+def drop_progress_events(queue_key: str, first_seq: int, last_seq: int):
+    """Delete the stored updates first_seq..last_seq of a progress channel (missing ones are skipped)"""
+    for seq in range(max(first_seq, 1), last_seq + 1):
+        try:
+            progress_state.pop(f"{queue_key}:{seq}")
+        except KeyError:
+            pass
+
+def reset_progress_channel(job_id: str):
+    """Drop the replay history of a job's progress channel (the sequence number keeps increasing)"""
     try:
-        queue_key = hash_s3_url(s3_url)
+        queue_key = job_id
+        head = progress_state.get(f"{queue_key}:head") or 0
+        progress_state[f"{queue_key}:start"] = head + 1
+        drop_progress_events(queue_key, head - PROGRESS_HISTORY_SIZE, head)
+    except Exception as e:
+        logger.error(f"❌ Failed to reset progress channel: {str(e)}")
+
+def send_progress_update(job_id: str, status: str, message: str, progress: float = None, result: dict = None, error: str = None, clip: dict = None):
+    """Append a progress update to the job's progress channel (clip carries a clip uploaded before the job finished)"""
+    try:
+        queue_key = job_id
         update_data = {
-            "s3_url": s3_url,
+            "job_id": job_id,
             "status": status,
             "message": message,
             "timestamp": datetime.now().isoformat()
@@ -2138,13 +2337,29 @@ def send_progress_update(s3_url: str, status: str, message: str, progress: float
             update_data["result"] = result
         if error is not None:
             update_data["error"] = error
-        
-        progress_queue.put((queue_key, update_data))
-        logger.info(f"📤 Progress update sent to queue: {status} - {message} ({progress}%)")
+        if clip is not None:
+            update_data["clip"] = clip
+        
+        # Claim the next free seq: put with skip_if_exists is atomic, so concurrent writers (threads,
+        # the processing container and the web container) never share a seq or overwrite an update
+        seq = (progress_state.get(f"{queue_key}:head") or 0) + 1
+        while True:
+            update_data["seq"] = seq
+            if progress_state.put(f"{queue_key}:{seq}", update_data, skip_if_exists=True):
+                break
+            seq += 1
+        # head is only a hint (a racing writer may briefly set it lower); readers and writers probe past it
+        progress_state[f"{queue_key}:head"] = seq
+        
+        if status in TERMINAL_PROGRESS_STATUSES:
+            # The job is over: keep only its final update, which late subscribers still need for the result
+            drop_progress_events(queue_key, seq - PROGRESS_HISTORY_SIZE, seq - 1)
+        else:
+            drop_progress_events(queue_key, seq - PROGRESS_HISTORY_SIZE, seq - PROGRESS_HISTORY_SIZE)
+        logger.info(f"📤 Progress update #{update_data['seq']} sent: {status} - {message} ({progress}%)")
     except Exception as e:
         logger.error(f"❌ Failed to send progress update: {str(e)}")
 
-
 @app.function(
     image=image,
     cpu=4.0,  # 4 CPU cores for heavy video processing
@@ -2153,33 +2368,34 @@ def send_progress_update(s3_url: str, status: str, message: str, progress: float
     volumes={"/data": volume},
     secrets=[secret, youtube_cookies_secret]
 )
-def process_youtube_background(youtube_url: str, video_type: str = "live", cookies_content: Optional[str] = None):
-    """Background function to process YouTube video with real-time progress updates via Modal Queue"""
+def process_youtube_background(youtube_url: str, video_type: str = "live", cookies_content: Optional[str] = None, combined_analysis: Optional[bool] = None,
+                               job_id: Optional[str] = None):
+    """Background function to process YouTube video with real-time progress updates via its progress channel (job_id)"""
+    job_id = job_id or uuid.uuid4().hex
     try:
         logger.info(f"🚀 Starting YouTube processing for URL: {youtube_url}")
         
-        # Send initial progress update
-        send_progress_update(youtube_url, "running", "Starting YouTube video processing...", 5.0)
+        # Every request gets its own workspace so concurrent jobs never share files
+        workspace = JobWorkspace(JOBS_DIR, job_id).create()
+        logger.info(f"📂 Job workspace: {workspace.root}")
         
-        # Create directories
-        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        VIDEO_SEGMENTS_DIR.mkdir(parents=True, exist_ok=True)
+        # Send initial progress update
+        send_progress_update(job_id, "running", "Starting YouTube video processing...", 5.0)
         
         # Handle cookies
         cookies_file = None
         if cookies_content:
             logger.info("🔐 Using user-provided cookies")
-            cookies_file = Path("/tmp/youtube_cookies.txt")
+            cookies_file = workspace.root / "youtube_cookies.txt"
             with open(cookies_file, 'w') as f:
                 f.write(cookies_content)
         elif os.getenv("YOUTUBE_COOKIES"):
             logger.info("🔐 Using Modal secret cookies")
-            cookies_file = Path("/tmp/youtube_cookies.txt")
+            cookies_file = workspace.root / "youtube_cookies.txt"
             with open(cookies_file, 'w') as f:
                 f.write(os.getenv("YOUTUBE_COOKIES"))
         
-        send_progress_update(youtube_url, "running", "Downloading YouTube video...", 15.0)
+        send_progress_update(job_id, "running", "Downloading YouTube video...", 15.0)
         
         # Download YouTube video using yt-dlp
         import yt_dlp
@@ -2206,7 +2422,7 @@ def process_youtube_background(youtube_url: str, video_type: str = "live", cooki
         safe_title = safe_title.replace(' ', '_')[:50]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{safe_title}_{timestamp}.mp4"
-        video_path = UPLOAD_DIR / filename
+        video_path = workspace.root / filename
         
         # Download video
         ydl_opts = {
@@ -2227,78 +2443,43 @@ def process_youtube_background(youtube_url: str, video_type: str = "live", cooki
         video_size_mb = get_file_size_mb(video_path)
         logger.info(f"📊 Downloaded video size: {video_size_mb:.2f}MB")
         
-        send_progress_update(youtube_url, "running", "Extracting audio...", 30.0)
-        
-        # Extract audio (same as S3 processing)
-        file_id = str(uuid.uuid4())
-        audio_filename = f"{file_id}_youtube_audio.mp3"
-        audio_path = OUTPUT_DIR / audio_filename
-        
-        cmd = [
-            'ffmpeg',
-            '-i', str(video_path),
-            '-vn',
-            '-acodec', 'mp3',
-            '-ab', '192k',
-            '-y',
-            str(audio_path)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            raise Exception(f"FFmpeg error: {result.stderr}")
-        
-        send_progress_update(youtube_url, "running", "Processing audio chunks...", 50.0)
+        send_progress_update(job_id, "running", "Extracting audio...", 30.0)
         
-        # Process audio chunks (same as S3 processing)
-        audio_size_mb = get_file_size_mb(audio_path)
-        logger.info(f"📊 Audio file size: {audio_size_mb:.2f}MB (max before chunking: {MAX_AUDIO_SIZE_MB}MB)")
+        # Extract speech-optimized audio chunks (same as S3 processing) in a single ffmpeg pass
+        chunk_files = extract_audio_chunks(video_path, workspace.audio_dir, "youtube")
         
-        if audio_size_mb > MAX_AUDIO_SIZE_MB:
-            logger.info(f"✂️  Audio file exceeds {MAX_AUDIO_SIZE_MB}MB, starting chunking process...")
-            chunk_files = chunk_audio(audio_path, OUTPUT_DIR, CHUNK_DURATION_MINUTES)
-            audio_path.unlink()
-            logger.info("✅ Original audio file deleted")
-        else:
-            logger.info(f"✅ Audio file is under {MAX_AUDIO_SIZE_MB}MB, no chunking needed")
-            chunk_files = [str(audio_path)]
-        
-        send_progress_update(youtube_url, "running", "Transcribing audio...", 70.0)
+        send_progress_update(job_id, "running", "Transcribing and analysing audio...", 70.0)
         
         # Transcribe audio (same as S3 processing)
         import sys
         sys.path.append("/root")
         import transcribe_segments
         
-        audio_files = transcribe_segments.transcribe_audio_segments(output_dir=str(OUTPUT_DIR), video_type=video_type)
-        segment_json = transcribe_segments.create_segment_json(audio_files, video_type)
-        with open("segments.json", "w") as f:
+        # Clips are cut and uploaded as soon as their segment is final (same as S3 processing)
+        clips = StreamingClipPipeline(video_path, workspace, job_id)
+        try:
+            audio_files, segment_json = transcribe_segments.transcribe_and_analyse(
+                output_dir=str(workspace.audio_dir),
+                video_type=video_type,
+                transcriptions_path=str(workspace.transcriptions_json),
+                interaction_segments_path=str(workspace.interaction_segments_json),
+                chunk_transcriber=get_chunk_transcriber(),
+                on_segment=clips.submit,
+                combined_analysis=combined_analysis
+            )
+        except Exception:
+            clips.abort()
+            raise
+        with open(workspace.segments_json, "w") as f:
             import json
             json.dump(segment_json, f, indent=2)
         logger.info("✅ Topic analysis and segment creation completed!")
         
-        send_progress_update(youtube_url, "running", "Extracting video segments...", 85.0)
-        
-        # Extract video segments (same as S3 processing)
-        all_segments = run_video_segment_extraction(video_path)
-        
-        # Separate regular segments from interaction segments
-        video_segments = []
-        interaction_segments = []
+        send_progress_update(job_id, "running", "Finishing video segments and uploads...", 85.0)
         
-        for segment_path in all_segments:
-            segment_file = Path(segment_path)
-            if "interactions" in str(segment_file):
-                interaction_segments.append(segment_path)
-            else:
-                video_segments.append(segment_path)
-        
-        send_progress_update(youtube_url, "running", "Uploading segments to S3...", 95.0)
-        
-        # Upload segments to S3 (same as S3 processing)
-        s3_urls = []
-        if all_segments:
-            s3_urls = upload_video_segments_to_s3(all_segments)
+        # Wait for the clips still being cut or uploaded
+        video_segments, interaction_segments, s3_urls = clips.finish()
+        all_segments = video_segments + interaction_segments
         
         # Clean up temporary files
         if cookies_file and cookies_file.exists():
@@ -2312,6 +2493,10 @@ def process_youtube_background(youtube_url: str, video_type: str = "live", cooki
         except Exception as e:
             logger.warning(f"⚠️  Failed to clean up video file: {e}")
         
+        # Drop the workspace once every clip is safely on S3
+        if all_segments and all(upload["success"] for upload in s3_urls):
+            workspace.cleanup()
+        
         # Prepare result
         result = {
             "message": f"YouTube video processed successfully",
@@ -2324,16 +2509,16 @@ def process_youtube_background(youtube_url: str, video_type: str = "live", cooki
             "total_video_segments": len(video_segments),
             "interaction_segments": interaction_segments,
             "total_interaction_segments": len(interaction_segments),
-            "segments_json_path": "segments.json",
+            "segments_json_path": str(workspace.segments_json),
             "s3_urls": s3_urls
         }
         
-        send_progress_update(youtube_url, "completed", "YouTube video processing completed successfully!", 100.0, result)
+        send_progress_update(job_id, "completed", "YouTube video processing completed successfully!", 100.0, result)
         logger.info(f"✅ YouTube processing completed for URL: {youtube_url}")
         
     except Exception as e:
         logger.error(f"❌ YouTube processing failed for URL {youtube_url}: {str(e)}")
         try:
-            send_progress_update(youtube_url, "failed", f"YouTube processing failed: {str(e)}", error=str(e))
+            send_progress_update(job_id, "failed", f"YouTube processing failed: {str(e)}", error=str(e))
         except Exception as update_error:
             logger.error(f"❌ Failed to send error update for YouTube URL {youtube_url}: {str(update_error)}")
\ No newline at end of file
@@ -0,0 +1,87 @@
+import hashlib
+import os
+
+import pytest
+
+pytest.importorskip("modal")
+pytest.importorskip("boto3")
+
+import modal_app
+
+MB = 1024 * 1024
+
+
+class FakeS3:
+    """In-memory stand-in for the multipart calls upload_file_to_s3_multipart makes"""
+
+    def __init__(self):
+        self.uploads = {}
+        self.uploaded_parts = []
+        self.completed = None
+        self.aborted = []
+
+    def add_upload(self, upload_id, key, initiated, parts=None):
+        self.uploads[upload_id] = {"Key": key, "Initiated": initiated, "Parts": dict(parts or {})}
+
+    def list_multipart_uploads(self, Bucket, Prefix):
+        return {"Uploads": [
+            {"Key": upload["Key"], "UploadId": upload_id, "Initiated": upload["Initiated"]}
+            for upload_id, upload in self.uploads.items() if upload["Key"].startswith(Prefix)
+        ]}
+
+    def get_paginator(self, name):
+        s3 = self
+
+        class Paginator:
+            def paginate(self, Bucket, Key, UploadId):
+                parts = s3.uploads[UploadId]["Parts"]
+                yield {"Parts": [
+                    {"PartNumber": number, "ETag": etag, "Size": size} for number, (etag, size) in sorted(parts.items())
+                ]}
+
+        return Paginator()
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        upload_id = f"new-{len(self.uploads)}"
+        self.add_upload(upload_id, Key, initiated=len(self.uploads))
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, PartNumber, UploadId, Body):
+        etag = f'"{hashlib.md5(Body).hexdigest()}"'
+        self.uploads[UploadId]["Parts"][PartNumber] = (etag, len(Body))
+        self.uploaded_parts.append((UploadId, PartNumber))
+        return {"ETag": etag}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = (UploadId, MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+
+
+def test_resume_with_explicit_upload_id_uploads_only_missing_parts(tmp_path, monkeypatch):
+    data = os.urandom(24 * MB)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(data)
+    part_size = modal_app.multipart_part_size(len(data))
+    chunks = [data[offset:offset + part_size] for offset in range(0, len(data), part_size)]
+    assert len(chunks) == 3
+
+    s3 = FakeS3()
+    key = "videos/video.mp4"
+    # Parts 1 and 3 made it before the interruption; a newer unrelated upload of the key must not be picked
+    s3.add_upload("interrupted", key, initiated=1, parts={
+        1: (f'"{hashlib.md5(chunks[0]).hexdigest()}"', part_size),
+        3: (f'"{hashlib.md5(chunks[2]).hexdigest()}"', len(chunks[2])),
+    })
+    s3.add_upload("other", key, initiated=2)
+    monkeypatch.setattr(modal_app, "get_s3_client", lambda: s3)
+
+    s3_url = modal_app.upload_file_to_s3_multipart(video, key, upload_id="interrupted")
+
+    assert s3_url is not None
+    assert s3.uploaded_parts == [("interrupted", 2)]
+    upload_id, parts = s3.completed
+    assert upload_id == "interrupted"
+    assert [part["PartNumber"] for part in parts] == [1, 2, 3]
+    assert not s3.aborted
@@ -4,6 +4,12 @@ from tqdm import tqdm
 import json
 import time
 import sys
+import hashlib
+import tempfile
+import contextvars
+from contextlib import closing, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from audio_processing import read_chunk_manifest, vad_trimming_enabled, trim_silence, to_original_time
 
 # Set your OpenAI API key here or use an environment variable
 openai.api_key = os.getenv("OPENAI_API_KEY", "sk-...")  # <-- Replace with your key or set env var
@@ -11,7 +17,18 @@ openai.api_key = os.getenv("OPENAI_API_KEY", "sk-...")  # <-- Replace with your
 OUTPUT_DIR = "output"
 SEGMENTS_JSON = "segments.json"
 TRANSCRIPTIONS_JSON = "transcriptions.json"
+INTERACTION_SEGMENTS_JSON = "interaction_segments.json"
 GPT_MODEL = "gpt-4o-mini"
+WHISPER_MODEL = "whisper-1"
+
+# Cache settings (the Modal volume is mounted at /data, fall back to a local directory)
+CACHE_ROOT = os.getenv("CACHE_ROOT", "/data/cache" if os.path.isdir("/data") else "cache")
+TRANSCRIPTION_CACHE_DIR = os.path.join(CACHE_ROOT, "transcriptions")
+TRANSCRIPTION_CACHE_MAX_MB = int(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "512"))  # LRU eviction above this size
+LLM_CACHE_DIR = os.path.join(CACHE_ROOT, "llm")
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "64"))  # LRU eviction above this size
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))  # Cached analysis responses expire after a week
+ANALYSIS_PROMPT_VERSION = 1  # Bump when an analysis prompt changes so cached responses are not reused
 
 # Retry settings
 MAX_RETRIES = 5
@@ -19,6 +36,13 @@ RETRY_DELAY = 5
 TIMEOUT = 300  # 5 minutes for transcription
 CHUNK_TIMEOUT = 120  # 2 minutes timeout for individual chunk transcription
 
+# Concurrency settings
+TRANSCRIPTION_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CONCURRENCY", "4"))  # Chunks uploaded to Whisper in parallel
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "4"))  # Interaction detection calls run in parallel
+
+# Live sessions: detect topics and interactions with one call per chunk instead of two (overridable per job)
+COMBINED_ANALYSIS = os.getenv("COMBINED_ANALYSIS", "false").lower() == "true"
+
 REFERENCE_PROMPT = '''
 You are analyzing a transcript of a lecture to extract meaningful **main topics** and **subtopics**.
 
@@ -52,99 +76,315 @@ Output format:
 ]
 '''
 
-def transcribe_audio_segments(output_dir=OUTPUT_DIR, language="en", video_type="live"):
-    # If transcriptions.json exists, load and return it
-    if os.path.exists(TRANSCRIPTIONS_JSON):
-        print(f"Loading transcriptions from {TRANSCRIPTIONS_JSON} for faster testing...")
-        with open(TRANSCRIPTIONS_JSON, "r") as f:
-            return json.load(f)
+# Active deadline (time.monotonic() timestamp) for API calls in the current thread/task
+_call_deadline = contextvars.ContextVar("call_deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an enclosing deadline has already expired before a call starts"""
+
+@contextmanager
+def deadline(seconds):
+    """
+    Bound every API call made inside the block to finish within `seconds`.
+    The deadline is stored in a context variable, so it is private to the current
+    thread or asyncio task (asyncio.to_thread and copied contexts inherit it), and a
+    nested deadline can only shorten the enclosing one.
+    """
+    expires_at = time.monotonic() + seconds
+    outer = _call_deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+    token = _call_deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _call_deadline.reset(token)
+
+def remaining_time(default=None):
+    """Return the seconds left before the active deadline, or `default` if there is none"""
+    expires_at = _call_deadline.get()
+    if expires_at is None:
+        return default
+    remaining = expires_at - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return remaining
+
+def _call_with_deadline(label, api_call, **kwargs):
+    """Run an OpenAI API call bounded by CHUNK_TIMEOUT and any enclosing deadline"""
+    with deadline(CHUNK_TIMEOUT):
+        timeout = remaining_time()
+        try:
+            # The HTTP client aborts the request itself, so this works from any thread
+            return api_call(timeout=timeout, **kwargs)
+        except openai.APITimeoutError:
+            raise TimeoutError(f"{label} timeout after {timeout:.0f} seconds")
+
+def _retry_sleep():
+    """Sleep before the next retry unless the enclosing deadline would expire first"""
+    remaining = remaining_time()
+    if remaining is not None and remaining <= RETRY_DELAY:
+        raise DeadlineExceeded("Deadline exceeded before next retry")
+    time.sleep(RETRY_DELAY)
+
+def _run_in_copied_context(executor, fn, items):
+    """executor.map that runs each call in a copy of the caller's context (keeps deadlines)"""
+    contexts = [contextvars.copy_context() for _ in items]
+    return executor.map(lambda ctx, item: ctx.run(fn, item), contexts, items)
+
+def _hash_file(file_path, block_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _cache_get(cache_dir, key):
+    """Load a cached JSON entry and mark it as recently used, or return None"""
+    path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(path, "r") as f:
+            value = json.load(f)
+        os.utime(path)  # mtime doubles as the LRU timestamp
+        return value
+    except (OSError, ValueError):
+        return None
+
+def _cache_put(cache_dir, key, value, max_mb):
+    """Atomically store a JSON entry and evict least recently used entries above max_mb"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{key}.json"))
+        _evict_cache(cache_dir, max_mb * 1024 * 1024)
+    except OSError as e:
+        print(f"⚠️  Could not write cache entry {key}: {e}")
+
+def _evict_cache(cache_dir, max_bytes):
+    """Delete the oldest cache entries until the directory fits in max_bytes"""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".json"):
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_dir, name))
+        except OSError:
+            continue  # Removed by a concurrent eviction
+        entries.append((stat.st_mtime, stat.st_size, name))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+            total -= size
+        except OSError:
+            pass
+
+def transcription_cache_key(file_path, language="en", model=WHISPER_MODEL):
+    """Content-addressed cache key for a chunk: hash of its audio bytes, language and model"""
+    return hashlib.sha256(f"{_hash_file(file_path)}:{language}:{model}".encode()).hexdigest()
+
+def llm_cache_key(kind, model, transcript, chunk_duration, previous_topics=None):
+    """Cache key for an analysis call: kind, model, prompt version, transcript hash and previous-topics hash"""
+    transcript_hash = hashlib.sha256(transcript.encode()).hexdigest()
+    topics_hash = hashlib.sha256(json.dumps(previous_topics, sort_keys=True).encode()).hexdigest()
+    return hashlib.sha256(f"{kind}:{model}:{ANALYSIS_PROMPT_VERSION}:{chunk_duration}:{transcript_hash}:{topics_hash}".encode()).hexdigest()
+
+def _llm_cache_get(key):
+    """Return a cached analysis result younger than LLM_CACHE_TTL_HOURS, or None"""
+    entry = _cache_get(LLM_CACHE_DIR, key)
+    if not isinstance(entry, dict) or "result" not in entry:
+        return None
+    if time.time() - entry.get("created_at", 0) > LLM_CACHE_TTL_HOURS * 3600:
+        try:
+            os.remove(os.path.join(LLM_CACHE_DIR, f"{key}.json"))
+        except OSError:
+            pass
+        return None
+    return entry["result"]
+
+def _llm_cache_put(key, result):
+    """Cache a successful analysis result"""
+    _cache_put(LLM_CACHE_DIR, key, {"created_at": time.time(), "result": result}, LLM_CACHE_MAX_MB)
+
+def _cacheable(entries, validated):
+    """Only complete answers are cached: the model returned something and validation dropped none of it"""
+    return bool(validated) and len(validated) == len(entries)
+
+@contextmanager
+def _speech_only_audio(file_path, filename):
+    """Yield (upload_path, time_map): the chunk with long non-speech spans removed, or the chunk itself and None"""
+    if not vad_trimming_enabled():
+        yield file_path, None
+        return
+    fd, trimmed_path = tempfile.mkstemp(suffix=".mp3")
+    os.close(fd)
+    try:
+        try:
+            time_map = trim_silence(file_path, trimmed_path)
+        except Exception as e:
+            print(f"⚠️  VAD trimming failed for {filename}, sending the full chunk: {e}")
+            time_map = None
+        yield (trimmed_path if time_map else file_path), time_map
+    finally:
+        os.remove(trimmed_path)
+
+def transcribe_audio_file(file_path, filename=None, language="en", use_cache=True):
+    """Transcribe a single audio file with retries and return its result entry"""
+    filename = filename or os.path.basename(file_path)
+    
+    cache_key = transcription_cache_key(file_path, language) if use_cache else None
+    if cache_key:
+        cached = _cache_get(TRANSCRIPTION_CACHE_DIR, cache_key)
+        if cached is not None:
+            print(f"♻️  Using cached transcription for {filename} ({cached['total_segments']} segments)")
+            return {**cached, "filename": filename, "file_path": file_path}
+    
+    print(f"\n---\nStarting transcription: {file_path}")
+    
+    with _speech_only_audio(file_path, filename) as (upload_path, time_map):
+        file_transcription = _transcribe_with_retries(upload_path, file_path, filename, language)
     
-    audio_files = [f for f in sorted(os.listdir(output_dir)) if f.endswith((
+    if file_transcription.get("error"):
+        return file_transcription
+    
+    if time_map:
+        # Whisper saw the trimmed audio; translate its timestamps back to the chunk's own timeline
+        for segment in file_transcription["segments"]:
+            segment["start"] = to_original_time(segment["start"], time_map)
+            segment["end"] = to_original_time(segment["end"], time_map, is_end=True)
+        file_transcription["transcribed_seconds"] = round(sum(entry["duration"] for entry in time_map), 3)
+    
+    if cache_key:
+        _cache_put(TRANSCRIPTION_CACHE_DIR, cache_key, file_transcription, TRANSCRIPTION_CACHE_MAX_MB)
+    
+    return file_transcription
+
+def _transcribe_with_retries(upload_path, file_path, filename, language):
+    """Send one audio file to Whisper with retries; errors are returned as a placeholder entry"""
+    # Retry logic for transcription with 2-minute timeout
+    for attempt in range(MAX_RETRIES):
+        try:
+            print(f"Attempt {attempt + 1}/{MAX_RETRIES} for {filename} (timeout: {CHUNK_TIMEOUT}s)")
+            
+            try:
+                with open(upload_path, "rb") as audio_file:
+                    transcript = _call_with_deadline(
+                        "Transcription",
+                        openai.audio.transcriptions.create,
+                        model=WHISPER_MODEL,
+                        file=audio_file,
+                        response_format="verbose_json",
+                        language=language
+                    )
+            except DeadlineExceeded:
+                raise
+            except TimeoutError as te:
+                print(f"⏰ Transcription timeout for {filename}: {str(te)}")
+                raise te
+            
+            print(f"Finished transcription: {file_path}")
+            print(f"Segments found: {len(transcript.segments)}")
+            
+            # Create a single object for this audio file with all segments
+            file_transcription = {
+                "filename": filename,
+                "file_path": file_path,
+                "total_segments": len(transcript.segments),
+                "segments": []
+            }
+            
+            # Add all segments with their timestamps and text
+            for i, segment in enumerate(transcript.segments):
+                print(f"  Segment {i+1}: {segment['start']}s - {segment['end']}s")
+                file_transcription["segments"].append({
+                    "segment_id": i + 1,
+                    "start": segment['start'],
+                    "end": segment['end'],
+                    "text": segment['text']
+                })
+            
+            return file_transcription
+            
+        except DeadlineExceeded:
+            raise
+        except (TimeoutError, Exception) as e:
+            print(f"Attempt {attempt + 1} failed for {filename}: {str(e)}")
+            if attempt < MAX_RETRIES - 1:
+                print(f"Retrying in {RETRY_DELAY} seconds...")
+                _retry_sleep()
+            else:
+                print(f"Failed to transcribe {filename} after {MAX_RETRIES} attempts. Skipping...")
+                # Return a placeholder entry to maintain file order
+                return {
+                    "filename": filename,
+                    "file_path": file_path,
+                    "total_segments": 0,
+                    "segments": [],
+                    "error": str(e)
+                }
+
+def list_audio_chunks(output_dir=OUTPUT_DIR):
+    """Return the audio chunk filenames in output_dir, in file order"""
+    return [f for f in sorted(os.listdir(output_dir)) if f.endswith((
         '.mp3', '.wav', '.flac', '.m4a', '.ogg', '.opus'
     ))]
-    results = []
+
+def _attach_chunk_info(result, manifest):
+    """Attach the chunk's manifest entry (index, start offset, duration, source) to a transcription result"""
+    entry = manifest.get(result.get("filename"))
+    if entry:
+        result["chunk"] = {key: entry[key] for key in ("index", "start", "duration", "source") if key in entry}
+    return result
+
+def iter_transcriptions(output_dir=OUTPUT_DIR, language="en", max_workers=TRANSCRIPTION_CONCURRENCY, use_cache=True, chunk_transcriber=None):
+    """
+    Transcribe every audio chunk in output_dir and yield the results in file order, each one as soon
+    as it (and every chunk before it) is done, while later chunks keep transcribing in the background.
+    chunk_transcriber(file_paths, language) can replace the local thread pool (e.g. to fan chunks out
+    to remote workers); it must return or yield one result per file, in the same order.
+    Results carry the chunk's entry from the chunker's manifest under "chunk", when there is one.
+    """
+    # Unchanged chunks are served from the content-addressed cache in transcribe_audio_file
+    audio_files = list_audio_chunks(output_dir)
+    manifest = read_chunk_manifest(output_dir)
     print(f"Found {len(audio_files)} audio files to transcribe.")
     
-    for filename in tqdm(audio_files, desc="Transcribing files", unit="file"):
-        file_path = os.path.join(output_dir, filename)
-        print(f"\n---\nStarting transcription: {file_path}")
-        
-        # Retry logic for transcription with 2-minute timeout
-        for attempt in range(MAX_RETRIES):
-            try:
-                print(f"Attempt {attempt + 1}/{MAX_RETRIES} for {filename} (timeout: {CHUNK_TIMEOUT}s)")
-                
-                # Set timeout for this transcription attempt
-                import signal
-                
-                def timeout_handler(signum, frame):
-                    raise TimeoutError(f"Transcription timeout after {CHUNK_TIMEOUT} seconds")
-                
-                # Set the timeout signal
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(CHUNK_TIMEOUT)
-                
-                try:
-                    with open(file_path, "rb") as audio_file:
-                        transcript = openai.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=audio_file,
-                            response_format="verbose_json",
-                            language=language
-                        )
-                    
-                    # Cancel the alarm if transcription succeeds
-                    signal.alarm(0)
-                    
-                    print(f"Finished transcription: {file_path}")
-                    print(f"Segments found: {len(transcript.segments)}")
-                    
-                    # Create a single object for this audio file with all segments
-                    file_transcription = {
-                        "filename": filename,
-                        "file_path": file_path,
-                        "total_segments": len(transcript.segments),
-                        "segments": []
-                    }
-                    
-                    # Add all segments with their timestamps and text
-                    for i, segment in enumerate(transcript.segments):
-                        print(f"  Segment {i+1}: {segment['start']}s - {segment['end']}s")
-                        file_transcription["segments"].append({
-                            "segment_id": i + 1,
-                            "start": segment['start'],
-                            "end": segment['end'],
-                            "text": segment['text']
-                        })
-                    
-                    results.append(file_transcription)
-                    break  # Success, exit retry loop
-                    
-                except TimeoutError as te:
-                    signal.alarm(0)  # Cancel the alarm
-                    print(f"⏰ Transcription timeout for {filename}: {str(te)}")
-                    raise te
-                    
-            except (TimeoutError, Exception) as e:
-                signal.alarm(0)  # Ensure alarm is cancelled
-                print(f"Attempt {attempt + 1} failed for {filename}: {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    print(f"Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
-                else:
-                    print(f"Failed to transcribe {filename} after {MAX_RETRIES} attempts. Skipping...")
-                    # Add a placeholder entry to maintain file order
-                    results.append({
-                        "filename": filename,
-                        "file_path": file_path,
-                        "total_segments": 0,
-                        "segments": [],
-                        "error": str(e)
-                                        })
+    def transcribe(filename):
+        return _attach_chunk_info(transcribe_audio_file(os.path.join(output_dir, filename), filename, language, use_cache), manifest)
+    
+    if chunk_transcriber:
+        file_paths = [os.path.join(output_dir, filename) for filename in audio_files]
+        for result, file_path in zip(chunk_transcriber(file_paths, language), file_paths):
+            result["file_path"] = file_path
+            yield _attach_chunk_info(result, manifest)
+    elif max_workers > 1 and len(audio_files) > 1:
+        # Every chunk is submitted up front; executor.map hands results back lazily in file order
+        workers = min(max_workers, len(audio_files))
+        print(f"Transcribing with {workers} concurrent workers")
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            yield from tqdm(_run_in_copied_context(executor, transcribe, audio_files), total=len(audio_files), desc="Transcribing files", unit="file")
+        finally:
+            # When the consumer stops early (e.g. analysis failed and closed the generator), drop the queued
+            # chunks and don't wait for the ones in flight; after a full run every call is already done
+            executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        for filename in tqdm(audio_files, desc="Transcribing files", unit="file"):
+            yield transcribe(filename)
     
     print("\nAll files transcribed!")
-    # Save to transcriptions.json for future fast runs
-    with open(TRANSCRIPTIONS_JSON, "w") as f:
+
+def transcribe_audio_segments(output_dir=OUTPUT_DIR, language="en", video_type="live", max_workers=TRANSCRIPTION_CONCURRENCY, use_cache=True, transcriptions_path=TRANSCRIPTIONS_JSON, chunk_transcriber=None):
+    """Transcribe every audio chunk in output_dir, in file order, and save the results to transcriptions_path"""
+    results = list(iter_transcriptions(output_dir, language, max_workers, use_cache, chunk_transcriber))
+    # Save to transcriptions.json for inspection
+    with open(transcriptions_path, "w") as f:
         json.dump(results, f, indent=2)
     return results
 
@@ -173,10 +413,42 @@ def _validate_timestamp(start_str, end_str, chunk_duration):
     except (ValueError, IndexError):
         return False
 
-def analyse_topic_gpt(transcript, previous_topics, chunk_duration, model=GPT_MODEL):
+def _strip_code_fence(content):
+    """Remove markdown code blocks around a JSON response"""
+    if content.startswith("```json"):
+        content = content[7:]  # Remove ```json
+    if content.startswith("```"):
+        content = content[3:]   # Remove ```
+    if content.endswith("```"):
+        content = content[:-3]  # Remove ```
+    return content.strip()
+
+def _validated_entries(entries, chunk_duration, kind):
+    """Keep the topics/interactions whose timestamps are valid and within the chunk"""
+    validated = []
+    for entry in entries:
+        if isinstance(entry, dict) and "title" in entry:
+            start_str = entry.get("start", "00:00")
+            end_str = entry.get("end", "00:00")
+            
+            # Validate timestamp format and range
+            if _validate_timestamp(start_str, end_str, chunk_duration):
+                validated.append(entry)
+            else:
+                print(f"Invalid timestamp in {kind} '{entry['title']}': {start_str} - {end_str}")
+    return validated
+
+def analyse_topic_gpt(transcript, previous_topics, chunk_duration, model=GPT_MODEL, use_cache=True):
     max_minutes = int(chunk_duration // 60)
     max_seconds = int(chunk_duration % 60)
     
+    cache_key = llm_cache_key("topics", model, transcript, chunk_duration, previous_topics) if use_cache else None
+    if cache_key:
+        cached = _llm_cache_get(cache_key)
+        if cached is not None:
+            print(f"♻️  Using cached topic analysis ({len(cached)} topics)")
+            return cached
+    
     prompt = f"""
 You are analyzing a transcript of a React/JavaScript lecture to extract meaningful topics.
 
@@ -212,60 +484,34 @@ Return ONLY the JSON array, no markdown formatting or explanations.
         try:
             print(f"GPT analysis attempt {attempt + 1}/{MAX_RETRIES} (timeout: {CHUNK_TIMEOUT}s)")
             
-            # Set timeout for GPT analysis
-            import signal
-            
-            def gpt_timeout_handler(signum, frame):
-                raise TimeoutError(f"GPT analysis timeout after {CHUNK_TIMEOUT} seconds")
-            
-            # Set the timeout signal
-            signal.signal(signal.SIGALRM, gpt_timeout_handler)
-            signal.alarm(CHUNK_TIMEOUT)
-            
             try:
-                response = openai.chat.completions.create(
+                response = _call_with_deadline(
+                    "GPT analysis",
+                    openai.chat.completions.create,
                     model=model,
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=2048,
                     temperature=0.2
                 )
-                
-                # Cancel the alarm if GPT call succeeds
-                signal.alarm(0)
                 content = response.choices[0].message.content.strip()
                 
+            except DeadlineExceeded:
+                raise
             except TimeoutError as te:
-                signal.alarm(0)  # Cancel the alarm
                 print(f"⏰ GPT analysis timeout: {str(te)}")
                 raise te
             
             # Clean the response - remove markdown code blocks
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            if content.startswith("```"):
-                content = content[3:]   # Remove ```
-            if content.endswith("```"):
-                content = content[:-3]  # Remove ```
-            
-            content = content.strip()
+            content = _strip_code_fence(content)
             
             # Try to parse the JSON output
             try:
                 topics = json.loads(content)
                 if isinstance(topics, list):
                     # Validate timestamps
-                    validated_topics = []
-                    for topic in topics:
-                        if isinstance(topic, dict) and "title" in topic:
-                            start_str = topic.get("start", "00:00")
-                            end_str = topic.get("end", "00:00")
-                            
-                            # Validate timestamp format and range
-                            if _validate_timestamp(start_str, end_str, chunk_duration):
-                                validated_topics.append(topic)
-                            else:
-                                print(f"Invalid timestamp in topic '{topic['title']}': {start_str} - {end_str}")
-                    
+                    validated_topics = _validated_entries(topics, chunk_duration, "topic")
+                    if cache_key and _cacheable(topics, validated_topics):
+                        _llm_cache_put(cache_key, validated_topics)
                     return validated_topics if validated_topics else [{"title": "Unknown", "start": "00:00", "end": f"{max_minutes}:{max_seconds:02d}"}]
                 else:
                     print(f"GPT returned non-list JSON: {content}")
@@ -275,17 +521,18 @@ Return ONLY the JSON array, no markdown formatting or explanations.
                 print(f"Raw content: {content}")
                 return [{"title": "Unknown", "start": "00:00", "end": f"{max_minutes}:{max_seconds:02d}"}]
                 
+        except DeadlineExceeded:
+            raise
         except (TimeoutError, Exception) as e:
-            signal.alarm(0)  # Ensure alarm is cancelled
             print(f"GPT analysis attempt {attempt + 1} failed: {str(e)}")
             if attempt < MAX_RETRIES - 1:
                 print(f"Retrying GPT analysis in {RETRY_DELAY} seconds...")
-                time.sleep(RETRY_DELAY)
+                _retry_sleep()
             else:
                 print(f"Failed GPT analysis after {MAX_RETRIES} attempts. Using fallback.")
                 return [{"title": "Unknown", "start": "00:00", "end": f"{max_minutes}:{max_seconds:02d}"}]
 
-def detect_speaker_student_interactions(transcript, chunk_duration, video_type="live"):
+def detect_speaker_student_interactions(transcript, chunk_duration, video_type="live", use_cache=True):
     """
     Detect segments where the speaker is directly interacting with students.
     This includes Q&A sessions, student questions, direct addressing, etc.
@@ -297,6 +544,13 @@ def detect_speaker_student_interactions(transcript, chunk_duration, video_type="
     max_minutes = int(chunk_duration // 60)
     max_seconds = int(chunk_duration % 60)
     
+    cache_key = llm_cache_key("interactions", GPT_MODEL, transcript, chunk_duration) if use_cache else None
+    if cache_key:
+        cached = _llm_cache_get(cache_key)
+        if cached is not None:
+            print(f"♻️  Using cached interaction detection ({len(cached)} interactions)")
+            return cached
+    
     prompt = f"""
 You are analyzing a lecture transcript to identify segments where the speaker is directly interacting with students.
 
@@ -337,60 +591,34 @@ Return ONLY the JSON array, no markdown formatting or explanations.
         try:
             print(f"Interaction detection attempt {attempt + 1}/{MAX_RETRIES} (timeout: {CHUNK_TIMEOUT}s)")
             
-            # Set timeout for interaction detection
-            import signal
-            
-            def interaction_timeout_handler(signum, frame):
-                raise TimeoutError(f"Interaction detection timeout after {CHUNK_TIMEOUT} seconds")
-            
-            # Set the timeout signal
-            signal.signal(signal.SIGALRM, interaction_timeout_handler)
-            signal.alarm(CHUNK_TIMEOUT)
-            
             try:
-                response = openai.chat.completions.create(
+                response = _call_with_deadline(
+                    "Interaction detection",
+                    openai.chat.completions.create,
                     model=GPT_MODEL,
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=2048,
                     temperature=0.2
                 )
-                
-                # Cancel the alarm if interaction detection succeeds
-                signal.alarm(0)
                 content = response.choices[0].message.content.strip()
                 
+            except DeadlineExceeded:
+                raise
             except TimeoutError as te:
-                signal.alarm(0)  # Cancel the alarm
                 print(f"⏰ Interaction detection timeout: {str(te)}")
                 raise te
             
             # Clean the response - remove markdown code blocks
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            if content.startswith("```"):
-                content = content[3:]   # Remove ```
-            if content.endswith("```"):
-                content = content[:-3]  # Remove ```
-            
-            content = content.strip()
+            content = _strip_code_fence(content)
             
             # Try to parse the JSON output
             try:
                 interactions = json.loads(content)
                 if isinstance(interactions, list):
                     # Validate timestamps
-                    validated_interactions = []
-                    for interaction in interactions:
-                        if isinstance(interaction, dict) and "title" in interaction:
-                            start_str = interaction.get("start", "00:00")
-                            end_str = interaction.get("end", "00:00")
-                            
-                            # Validate timestamp format and range
-                            if _validate_timestamp(start_str, end_str, chunk_duration):
-                                validated_interactions.append(interaction)
-                            else:
-                                print(f"Invalid timestamp in interaction '{interaction['title']}': {start_str} - {end_str}")
-                    
+                    validated_interactions = _validated_entries(interactions, chunk_duration, "interaction")
+                    if cache_key and _cacheable(interactions, validated_interactions):
+                        _llm_cache_put(cache_key, validated_interactions)
                     return validated_interactions
                 else:
                     print(f"GPT returned non-list JSON for interactions: {content}")
@@ -400,189 +628,409 @@ Return ONLY the JSON array, no markdown formatting or explanations.
                 print(f"Raw content: {content}")
                 return []
                 
+        except DeadlineExceeded:
+            raise
         except (TimeoutError, Exception) as e:
-            signal.alarm(0)  # Ensure alarm is cancelled
             print(f"Interaction detection attempt {attempt + 1} failed: {str(e)}")
             if attempt < MAX_RETRIES - 1:
                 print(f"Retrying interaction detection in {RETRY_DELAY} seconds...")
-                time.sleep(RETRY_DELAY)
+                _retry_sleep()
             else:
                 print(f"Failed interaction detection after {MAX_RETRIES} attempts.")
                 return []
 
-def create_segment_json(audio_files, video_type="live"):
-    segment_json = []
-    interaction_segments = []  # Separate list for speaker-student interactions
-    prev_topics = []
+def analyse_chunk_combined(transcript, previous_topics, chunk_duration, model=GPT_MODEL, use_cache=True):
+    """
+    Detect the topics and speaker-student interactions of a live-session chunk with a single
+    JSON-mode call, so the transcript is sent once instead of twice. Returns (topics, interactions)
+    with the same validation and fallbacks as analyse_topic_gpt and detect_speaker_student_interactions.
+    """
+    max_minutes = int(chunk_duration // 60)
+    max_seconds = int(chunk_duration % 60)
+    fallback_topics = [{"title": "Unknown", "start": "00:00", "end": f"{max_minutes}:{max_seconds:02d}"}]
     
-    for audio_file in tqdm(audio_files, desc="Analysing topics and interactions", unit="file"):
-        # Skip files with errors
-        if audio_file.get("error"):
-            print(f"Skipping {audio_file['filename']} due to transcription error")
-            continue
+    cache_key = llm_cache_key("combined", model, transcript, chunk_duration, previous_topics) if use_cache else None
+    if cache_key:
+        cached = _llm_cache_get(cache_key)
+        if cached is not None:
+            print(f"♻️  Using cached combined analysis ({len(cached['topics'])} topics, {len(cached['interactions'])} interactions)")
+            return cached["topics"], cached["interactions"]
+    
+    prompt = f"""
+You are analyzing a transcript of a live React/JavaScript lecture. Do two things in one pass:
+
+1. Extract meaningful topics.
+2. Identify segments where the speaker is directly interacting with students: questions asked by
+   the speaker to students, student questions and speaker responses, direct addressing of students
+   ("you", "class", "students"), interactive moments ("raise your hand", "what do you think"),
+   Q&A sessions and student participation moments.
+
+Previous topics detected:
+{json.dumps(previous_topics, indent=2)}
+
+The audio chunk is {max_minutes}:{max_seconds:02d} long.
+
+{transcript}
+
+Return ONLY a JSON object with two arrays:
+- "topics": each with "title", "start" and "end" (MM:SS) and an optional "parent_topic" if it is a subtopic
+- "interactions": each with "title", "start" and "end" (MM:SS) and "interaction_type"
+  (e.g., "Q&A", "Student Question", "Direct Address", "Interactive Moment")
+
+IMPORTANT: 
+- All times must be within 00:00 to {max_minutes}:{max_seconds:02d}
+- Each topic should have different time ranges
+- Only include interactions with clear speaker-student interaction (an empty array is fine)
+
+Example output:
+{{
+  "topics": [
+    {{"title": "React Hooks", "start": "00:00", "end": "02:30"}},
+    {{"title": "useState Hook", "start": "02:30", "end": "05:45", "parent_topic": "React Hooks"}}
+  ],
+  "interactions": [
+    {{"title": "Student Question about React Hooks", "start": "02:30", "end": "04:15", "interaction_type": "Student Question"}}
+  ]
+}}
+"""
+    
+    # Retry logic for combined analysis with timeout
+    for attempt in range(MAX_RETRIES):
+        try:
+            print(f"Combined analysis attempt {attempt + 1}/{MAX_RETRIES} (timeout: {CHUNK_TIMEOUT}s)")
             
-        # Skip files with no segments
-        if not audio_file["segments"]:
-            print(f"Skipping {audio_file['filename']} - no segments found")
-            continue
-        
-        # Get chunk duration and global start time
-        chunk_duration = audio_file["segments"][-1]["end"] if audio_file["segments"] else 0
-        chunk_start_time = audio_file["segments"][0]["start"] if audio_file["segments"] else 0
+            try:
+                response = _call_with_deadline(
+                    "Combined analysis",
+                    openai.chat.completions.create,
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=4096,
+                    temperature=0.2,
+                    response_format={"type": "json_object"}
+                )
+                content = response.choices[0].message.content.strip()
+                
+            except DeadlineExceeded:
+                raise
+            except TimeoutError as te:
+                print(f"⏰ Combined analysis timeout: {str(te)}")
+                raise te
+            
+            content = _strip_code_fence(content)
+            
+            # Try to parse the JSON output
+            try:
+                result = json.loads(content)
+            except json.JSONDecodeError as e:
+                print(f"JSON parsing failed for combined analysis: {e}")
+                print(f"Raw content: {content}")
+                return fallback_topics, []
+            if not isinstance(result, dict):
+                print(f"GPT returned non-object JSON for combined analysis: {content}")
+                return fallback_topics, []
+            
+            topics = result.get("topics")
+            interactions = result.get("interactions")
+            validated_topics = _validated_entries(topics, chunk_duration, "topic") if isinstance(topics, list) else []
+            validated_interactions = _validated_entries(interactions, chunk_duration, "interaction") if isinstance(interactions, list) else []
+            # A chunk may have no interactions, but the list must be there and survive validation intact
+            complete_interactions = isinstance(interactions, list) and len(validated_interactions) == len(interactions)
+            if cache_key and _cacheable(topics, validated_topics) and complete_interactions:
+                _llm_cache_put(cache_key, {"topics": validated_topics, "interactions": validated_interactions})
+            return validated_topics or fallback_topics, validated_interactions
+                
+        except DeadlineExceeded:
+            raise
+        except (TimeoutError, Exception) as e:
+            print(f"Combined analysis attempt {attempt + 1} failed: {str(e)}")
+            if attempt < MAX_RETRIES - 1:
+                print(f"Retrying combined analysis in {RETRY_DELAY} seconds...")
+                _retry_sleep()
+            else:
+                print(f"Failed combined analysis after {MAX_RETRIES} attempts. Using fallback.")
+                return fallback_topics, []
+
+def _prepare_chunk(audio_file):
+    """Return the timing info and timestamped transcript of a transcribed chunk, or None if it has nothing to analyse"""
+    # Skip files with errors
+    if audio_file.get("error"):
+        print(f"Skipping {audio_file['filename']} due to transcription error")
+        return None
         
-        # Calculate global start time based on chunk number
+    # Skip files with no segments
+    if not audio_file["segments"]:
+        print(f"Skipping {audio_file['filename']} - no segments found")
+        return None
+    
+    # Get chunk duration and global start time
+    chunk_duration = audio_file["segments"][-1]["end"] if audio_file["segments"] else 0
+    chunk_start_time = audio_file["segments"][0]["start"] if audio_file["segments"] else 0
+    
+    chunk_info = audio_file.get("chunk")
+    if chunk_info:
+        # Real offset and duration measured by the chunker (see the chunk manifest)
+        chunk_number = chunk_info["index"]
+        global_start_offset = chunk_info["start"]
+        chunk_duration = max(chunk_duration, chunk_info["duration"])
+    else:
+        # No manifest: derive the offset from the chunk number in the filename
         try:
-            # Try to extract chunk number from filename (old format)
             chunk_number = int(audio_file["filename"].split("_")[1])
         except (ValueError, IndexError):
-            # New format: use 1 as default chunk number
+            # Single unchunked file
             chunk_number = 1
         global_start_offset = (chunk_number - 1) * 600  # Each chunk is ~10 minutes
-        
-        # Create a single transcript with all segments for this file
-        transcript_with_time = ""
-        for segment in audio_file["segments"]:
-            # Convert seconds to MM:SS format
-            start_time = f"{int(segment['start']//60):02d}:{int(segment['start']%60):02d}"
-            end_time = f"{int(segment['end']//60):02d}:{int(segment['end']%60):02d}"
-            transcript_with_time += f"[{start_time} --> {end_time}] {segment['text']}\n"
-        
-        # Analyze topics for the entire file with chunk duration constraint
-        topics = analyse_topic_gpt(transcript_with_time, prev_topics, chunk_duration)
-        
-        # Detect speaker-student interactions (only for live sessions)
-        if video_type == "live":
-            interactions = detect_speaker_student_interactions(transcript_with_time, chunk_duration)
-        else:
-            interactions = []  # Skip interaction detection for recorded videos
-        
-        # Add new topics to the list
-        for topic in topics:
-            if isinstance(topic, dict) and "title" in topic:
-                # Parse and validate timestamps
-                start_str = topic.get("start", "00:00")
-                end_str = topic.get("end", "00:00")
+    
+    # Create a single transcript with all segments for this file
+    transcript_with_time = ""
+    for segment in audio_file["segments"]:
+        # Convert seconds to MM:SS format
+        start_time = f"{int(segment['start']//60):02d}:{int(segment['start']%60):02d}"
+        end_time = f"{int(segment['end']//60):02d}:{int(segment['end']%60):02d}"
+        transcript_with_time += f"[{start_time} --> {end_time}] {segment['text']}\n"
+    
+    return {
+        "audio_file": audio_file,
+        "chunk_duration": chunk_duration,
+        "chunk_start_time": chunk_start_time,
+        "chunk_number": chunk_number,
+        "global_start_offset": global_start_offset,
+        "transcript": transcript_with_time
+    }
+
+def _interaction_entries(chunk, interactions):
+    """Convert a chunk's detected interactions into interaction segments with global timestamps"""
+    audio_file = chunk["audio_file"]
+    chunk_duration = chunk["chunk_duration"]
+    chunk_start_time = chunk["chunk_start_time"]
+    chunk_number = chunk["chunk_number"]
+    global_start_offset = chunk["global_start_offset"]
+    interaction_segments = []
+    
+    for interaction in interactions:
+        if isinstance(interaction, dict) and "title" in interaction:
+            # Parse and validate timestamps
+            start_str = interaction.get("start", "00:00")
+            end_str = interaction.get("end", "00:00")
+            
+            # Convert MM:SS to seconds
+            try:
+                start_parts = start_str.split(":")
+                end_parts = end_str.split(":")
                 
-                # Convert MM:SS to seconds
-                try:
-                    start_parts = start_str.split(":")
-                    end_parts = end_str.split(":")
-                    
-                    start_seconds = int(start_parts[0]) * 60 + int(start_parts[1])
-                    end_seconds = int(end_parts[0]) * 60 + int(end_parts[1])
-                    
-                    # Ensure end time doesn't exceed chunk duration
-                    if end_seconds > chunk_duration:
-                        end_seconds = chunk_duration
-                        end_str = f"{int(end_seconds//60):02d}:{int(end_seconds%60):02d}"
-                    
-                    # Calculate global timestamps
-                    global_start = global_start_offset + start_seconds
-                    global_end = global_start_offset + end_seconds
-                    
-                    segment_json.append({
-                        "title": topic["title"],
-                        "start": start_str,
-                        "end": end_str,
-                        "parent_topic": topic.get("parent_topic"),
-                        "filename": audio_file["filename"],
-                        "start_time": global_start,
-                        "end_time": global_end,
-                        "chunk_start": chunk_start_time,
-                        "chunk_end": chunk_duration,
-                        "chunk_number": chunk_number,
-                        "segment_type": "topic"  # Mark as regular topic segment
-                    })
-                except (ValueError, IndexError) as e:
-                    print(f"Invalid timestamp format in topic '{topic['title']}': {start_str} - {end_str}")
-                    # Use fallback timestamps
-                    segment_json.append({
-                        "title": topic["title"],
-                        "start": "00:00",
-                        "end": f"{int(chunk_duration//60):02d}:{int(chunk_duration%60):02d}",
-                        "parent_topic": topic.get("parent_topic"),
-                        "filename": audio_file["filename"],
-                        "start_time": global_start_offset,
-                        "end_time": global_start_offset + chunk_duration,
-                        "chunk_start": chunk_start_time,
-                        "chunk_end": chunk_duration,
-                        "chunk_number": chunk_number,
-                        "segment_type": "topic"  # Mark as regular topic segment
-                    })
-        
-        # Add interaction segments to separate list
-        for interaction in interactions:
-            if isinstance(interaction, dict) and "title" in interaction:
-                # Parse and validate timestamps
-                start_str = interaction.get("start", "00:00")
-                end_str = interaction.get("end", "00:00")
+                start_seconds = int(start_parts[0]) * 60 + int(start_parts[1])
+                end_seconds = int(end_parts[0]) * 60 + int(end_parts[1])
                 
-                # Convert MM:SS to seconds
-                try:
-                    start_parts = start_str.split(":")
-                    end_parts = end_str.split(":")
-                    
-                    start_seconds = int(start_parts[0]) * 60 + int(start_parts[1])
-                    end_seconds = int(end_parts[0]) * 60 + int(end_parts[1])
-                    
-                    # Ensure end time doesn't exceed chunk duration
-                    if end_seconds > chunk_duration:
-                        end_seconds = chunk_duration
-                        end_str = f"{int(end_seconds//60):02d}:{int(end_seconds%60):02d}"
-                    
-                    # Calculate global timestamps
-                    global_start = global_start_offset + start_seconds
-                    global_end = global_start_offset + end_seconds
+                # Ensure end time doesn't exceed chunk duration
+                if end_seconds > chunk_duration:
+                    end_seconds = chunk_duration
+                    end_str = f"{int(end_seconds//60):02d}:{int(end_seconds%60):02d}"
+                
+                # Calculate global timestamps
+                global_start = global_start_offset + start_seconds
+                global_end = global_start_offset + end_seconds
+                
+                interaction_segments.append({
+                    "title": interaction["title"],
+                    "start": start_str,
+                    "end": end_str,
+                    "interaction_type": interaction.get("interaction_type", "Unknown"),
+                    "filename": audio_file["filename"],
+                    "start_time": global_start,
+                    "end_time": global_end,
+                    "chunk_start": chunk_start_time,
+                    "chunk_end": chunk_duration,
+                    "chunk_number": chunk_number,
+                    "segment_type": "interaction"  # Mark as interaction segment
+                })
+            except (ValueError, IndexError) as e:
+                print(f"Invalid timestamp format in interaction '{interaction['title']}': {start_str} - {end_str}")
+                # Use fallback timestamps
+                interaction_segments.append({
+                    "title": interaction["title"],
+                    "start": "00:00",
+                    "end": f"{int(chunk_duration//60):02d}:{int(chunk_duration%60):02d}",
+                    "interaction_type": interaction.get("interaction_type", "Unknown"),
+                    "filename": audio_file["filename"],
+                    "start_time": global_start_offset,
+                    "end_time": global_start_offset + chunk_duration,
+                    "chunk_start": chunk_start_time,
+                    "chunk_end": chunk_duration,
+                    "chunk_number": chunk_number,
+                    "segment_type": "interaction"  # Mark as interaction segment
+                })
+    
+    return interaction_segments
+
+def create_segment_json(audio_files, video_type="live", interaction_segments_path=INTERACTION_SEGMENTS_JSON, max_workers=ANALYSIS_CONCURRENCY, on_segment=None,
+                        combined_analysis=None, use_cache=True):
+    """
+    Analyse transcribed chunks into topic and interaction segments. audio_files can be any iterable,
+    including a generator that yields transcriptions as they finish: each chunk is analysed as soon
+    as it arrives, so analysis overlaps with transcription of the chunks after it.
+    on_segment(segment) is called from this thread with every segment once it is final (segments are
+    never merged across chunks, so that is as soon as its chunk's analysis returns), letting callers
+    cut and upload clips while later chunks are still being analysed.
+    combined_analysis (default COMBINED_ANALYSIS) detects a live session's topics and interactions
+    with one call per chunk (analyse_chunk_combined) instead of two. Successful analysis responses are
+    cached (LLM_CACHE_DIR) unless use_cache is False, so re-processing a lecture repeats no LLM calls.
+    """
+    segment_json = []
+    interaction_segments = []  # Separate list for speaker-student interactions
+    prev_topics = []
+    combined = (COMBINED_ANALYSIS if combined_analysis is None else combined_analysis) and video_type == "live"
+    
+    # Interaction detection has no cross-chunk state (and only runs for live sessions), so it runs on a
+    # worker pool as chunks arrive while topics, which depend on the previous chunk's topics, are analysed in order
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers)) if video_type == "live" and not combined else None
+    pending_interactions = []
+    
+    def add_interactions(chunk, interactions):
+        entries = _interaction_entries(chunk, interactions)
+        interaction_segments.extend(entries)
+        if on_segment:
+            for segment in entries:
+                on_segment(segment)
+    
+    def collect_interactions(wait):
+        # Collected in chunk order, so a slow chunk holds back the interactions after it
+        while pending_interactions and (wait or pending_interactions[0][1].done()):
+            chunk, future = pending_interactions.pop(0)
+            add_interactions(chunk, future.result())
+    
+    try:
+        for audio_file in tqdm(audio_files, desc="Analysing topics and interactions", unit="file"):
+            chunk = _prepare_chunk(audio_file)
+            if not chunk:
+                continue
+            if executor:
+                pending_interactions.append((chunk, executor.submit(
+                    contextvars.copy_context().run, detect_speaker_student_interactions, chunk["transcript"], chunk["chunk_duration"], video_type, use_cache
+                )))
+            
+            chunk_duration = chunk["chunk_duration"]
+            chunk_start_time = chunk["chunk_start_time"]
+            chunk_number = chunk["chunk_number"]
+            global_start_offset = chunk["global_start_offset"]
+            
+            # Analyze topics for the entire file with chunk duration constraint
+            if combined:
+                topics, interactions = analyse_chunk_combined(chunk["transcript"], prev_topics, chunk_duration, use_cache=use_cache)
+            else:
+                topics = analyse_topic_gpt(chunk["transcript"], prev_topics, chunk_duration, use_cache=use_cache)
+            first_new_segment = len(segment_json)
+            
+            # Add new topics to the list
+            for topic in topics:
+                if isinstance(topic, dict) and "title" in topic:
+                    # Parse and validate timestamps
+                    start_str = topic.get("start", "00:00")
+                    end_str = topic.get("end", "00:00")
                     
-                    interaction_segments.append({
-                        "title": interaction["title"],
-                        "start": start_str,
-                        "end": end_str,
-                        "interaction_type": interaction.get("interaction_type", "Unknown"),
-                        "filename": audio_file["filename"],
-                        "start_time": global_start,
-                        "end_time": global_end,
-                        "chunk_start": chunk_start_time,
-                        "chunk_end": chunk_duration,
-                        "chunk_number": chunk_number,
-                        "segment_type": "interaction"  # Mark as interaction segment
-                    })
-                except (ValueError, IndexError) as e:
-                    print(f"Invalid timestamp format in interaction '{interaction['title']}': {start_str} - {end_str}")
-                    # Use fallback timestamps
-                    interaction_segments.append({
-                        "title": interaction["title"],
-                        "start": "00:00",
-                        "end": f"{int(chunk_duration//60):02d}:{int(chunk_duration%60):02d}",
-                        "interaction_type": interaction.get("interaction_type", "Unknown"),
-                        "filename": audio_file["filename"],
-                        "start_time": global_start_offset,
-                        "end_time": global_start_offset + chunk_duration,
-                        "chunk_start": chunk_start_time,
-                        "chunk_end": chunk_duration,
-                        "chunk_number": chunk_number,
-                        "segment_type": "interaction"  # Mark as interaction segment
-                    })
+                    # Convert MM:SS to seconds
+                    try:
+                        start_parts = start_str.split(":")
+                        end_parts = end_str.split(":")
+                        
+                        start_seconds = int(start_parts[0]) * 60 + int(start_parts[1])
+                        end_seconds = int(end_parts[0]) * 60 + int(end_parts[1])
+                        
+                        # Ensure end time doesn't exceed chunk duration
+                        if end_seconds > chunk_duration:
+                            end_seconds = chunk_duration
+                            end_str = f"{int(end_seconds//60):02d}:{int(end_seconds%60):02d}"
+                        
+                        # Calculate global timestamps
+                        global_start = global_start_offset + start_seconds
+                        global_end = global_start_offset + end_seconds
+                        
+                        segment_json.append({
+                            "title": topic["title"],
+                            "start": start_str,
+                            "end": end_str,
+                            "parent_topic": topic.get("parent_topic"),
+                            "filename": audio_file["filename"],
+                            "start_time": global_start,
+                            "end_time": global_end,
+                            "chunk_start": chunk_start_time,
+                            "chunk_end": chunk_duration,
+                            "chunk_number": chunk_number,
+                            "segment_type": "topic"  # Mark as regular topic segment
+                        })
+                    except (ValueError, IndexError) as e:
+                        print(f"Invalid timestamp format in topic '{topic['title']}': {start_str} - {end_str}")
+                        # Use fallback timestamps
+                        segment_json.append({
+                            "title": topic["title"],
+                            "start": "00:00",
+                            "end": f"{int(chunk_duration//60):02d}:{int(chunk_duration%60):02d}",
+                            "parent_topic": topic.get("parent_topic"),
+                            "filename": audio_file["filename"],
+                            "start_time": global_start_offset,
+                            "end_time": global_start_offset + chunk_duration,
+                            "chunk_start": chunk_start_time,
+                            "chunk_end": chunk_duration,
+                            "chunk_number": chunk_number,
+                            "segment_type": "topic"  # Mark as regular topic segment
+                        })
+            
+            if on_segment:
+                for segment in segment_json[first_new_segment:]:
+                    on_segment(segment)
+            if combined:
+                add_interactions(chunk, interactions)
+            collect_interactions(wait=False)
+            
+            prev_topics = topics
         
-        prev_topics = topics
-        time.sleep(0.5)
+        # Speaker-student interactions were detected concurrently (skipped for recorded videos)
+        collect_interactions(wait=True)
+    finally:
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
     
     # Combine regular segments and interaction segments
     all_segments = segment_json + interaction_segments
     
     # Save interaction segments separately for easy access
     if interaction_segments:
-        with open("interaction_segments.json", "w") as f:
+        with open(interaction_segments_path, "w") as f:
             json.dump(interaction_segments, f, indent=2)
         print(f"💬 Found {len(interaction_segments)} speaker-student interaction segments")
     
     return all_segments
 
+def transcribe_and_analyse(output_dir=OUTPUT_DIR, language="en", video_type="live", max_workers=TRANSCRIPTION_CONCURRENCY, use_cache=True,
+                           transcriptions_path=TRANSCRIPTIONS_JSON, interaction_segments_path=INTERACTION_SEGMENTS_JSON, chunk_transcriber=None,
+                           on_segment=None, combined_analysis=None):
+    """
+    Transcribe and analyse the audio chunks in output_dir as one pipeline: each transcript is handed to
+    topic/interaction analysis as soon as it is ready, so the total time approaches the slower of the
+    two stages rather than their sum. on_segment and combined_analysis are passed on to create_segment_json. Returns
+    (transcriptions, segments) like transcribe_audio_segments followed by create_segment_json.
+    """
+    transcriptions = []
+    
+    def collect():
+        with closing(iter_transcriptions(output_dir, language, max_workers, use_cache, chunk_transcriber)) as results:
+            for result in results:
+                transcriptions.append(result)
+                yield result
+    
+    # Close the transcription stream right away if analysis fails, so pending chunks are cancelled
+    with closing(collect()) as results:
+        segments = create_segment_json(results, video_type, interaction_segments_path, on_segment=on_segment,
+                                       combined_analysis=combined_analysis, use_cache=use_cache)
+    # Save to transcriptions.json for inspection
+    with open(transcriptions_path, "w") as f:
+        json.dump(transcriptions, f, indent=2)
+    return transcriptions, segments
+
 if __name__ == "__main__":
     try:
-        audio_files = transcribe_audio_segments()
-        print("\n--- ANALYSING TOPICS ---\n")
-        segment_json = create_segment_json(audio_files)
+        print("\n--- TRANSCRIBING AND ANALYSING TOPICS ---\n")
+        audio_files, segment_json = transcribe_and_analyse()
         with open(SEGMENTS_JSON, "w") as f:
             json.dump(segment_json, f, indent=2)
         print(f"\nSegment topics saved to {SEGMENTS_JSON}")